@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark CLI start-up: cold in-process runs against warm daemon runs.
+
+A mock controller runs in its own process. Each CLI invocation is a fresh
+``python -m unifi_assist.cli`` process, timed end to end, so figures
+include interpreter start-up. Cold runs (``--no-daemon``) import the client
+stack, set up logging and connect to the controller; warm runs only import
+the thin entry point and ask a running daemon. The daemon round trip is
+also timed from inside this process, without interpreter start-up.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from unifi_assist.cli import ask_daemon
+from unifi_assist.mock_controller import MOCK_API_KEY, MockController
+
+
+def serve(devices: int, ready: Any) -> None:
+    """Run a mock controller until the process is terminated."""
+
+    async def run() -> None:
+        mock = MockController(sites=1, devices=devices, seed=0)
+        ready.put(await mock.start())
+        await asyncio.Event().wait()
+
+    asyncio.run(run())
+
+
+def timed(action: Callable[[], Any], runs: int) -> List[float]:
+    """Wall-clock durations of repeated runs, in seconds."""
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        action()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def cli(env: Dict[str, str], *args: str) -> Callable[[], Any]:
+    """Action running one CLI invocation in a new process."""
+    command = [sys.executable, "-m", "unifi_assist.cli", *args]
+    return lambda: subprocess.run(
+        command, env=env, check=True, stdout=subprocess.DEVNULL
+    )
+
+
+def wait_for(path: Path, timeout: float = 30) -> None:
+    """Wait for the daemon to create its socket."""
+    deadline = time.monotonic() + timeout
+    while not path.exists():
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Daemon did not start listening on {path}")
+        time.sleep(0.01)
+
+
+def report(name: str, durations: List[float]) -> None:
+    """Print the median and spread of a measurement."""
+    ordered = sorted(durations)
+    print(
+        f"  {name:<34} median {statistics.median(ordered) * 1000:8.1f} ms  "
+        f"min {ordered[0] * 1000:8.1f} ms  max {ordered[-1] * 1000:8.1f} ms"
+    )
+
+
+def main() -> None:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument(
+        "--command",
+        default="devices",
+        choices=("status", "sites", "info", "devices", "clients"),
+    )
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    ready = context.Queue()
+    server = context.Process(target=serve, args=(args.devices, ready), daemon=True)
+    server.start()
+    with tempfile.TemporaryDirectory() as directory:
+        socket_path = Path(directory) / "unifi-assist.sock"
+        env = {
+            **os.environ,
+            "UNIFI_HOST": ready.get(timeout=30),
+            "UNIFI_API_KEY": MOCK_API_KEY,
+            "UNIFI_SCHEME": "http",
+            "UNIFI_ASSIST_SOCKET": str(socket_path),
+        }
+        site = {"site": "site-0000"} if args.command in ("devices", "clients") else {}
+        command = [args.command, *site.values()]
+        print(f"{args.runs} runs of `unifi-assist {' '.join(command)}`:")
+        report(
+            "interpreter only",
+            timed(lambda: subprocess.run([sys.executable, "-c", "pass"]), args.runs),
+        )
+        report(
+            "cold (--no-daemon)", timed(cli(env, "--no-daemon", *command), args.runs)
+        )
+
+        daemon = subprocess.Popen(
+            [sys.executable, "-m", "unifi_assist.cli", "daemon"], env=env
+        )
+        try:
+            wait_for(socket_path)
+            report("warm (daemon)", timed(cli(env, *command), args.runs))
+            request = {"command": args.command, "args": site}
+            report(
+                "warm round trip, no interpreter",
+                timed(lambda: ask_daemon(str(socket_path), request), args.runs),
+            )
+        finally:
+            daemon.terminate()
+            daemon.wait()
+    server.terminate()
+    server.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Benchmark fleet crawls against the local mock controller.
+
+For each scale (total number of devices) a mock controller is started in
+its own process and a full ``crawl_inventory`` is run from a fresh client
+process, so memory figures cover the client alone. Reports crawl
+throughput, p50/p99 request latency and peak RSS, saves the results as JSON
+under ``benchmarks/results`` and compares them with the previous run.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import platform
+import resource
+import statistics
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import structlog
+
+from unifi_assist.client import UniFiClient
+from unifi_assist.crawl import DEFAULT_CRAWL_CONCURRENCY
+from unifi_assist.logging import setup_logging
+from unifi_assist.mock_controller import MOCK_API_KEY, MockController
+from unifi_assist.session import ConnectionPoolConfig
+
+RESULTS_DIR = Path(__file__).parent / "results"
+DEVICES_PER_SITE = 1_000
+
+
+def fleet_shape(devices: int, clients_per_device: int) -> Dict[str, int]:
+    """Split a total device count into sites of at most 1000 devices."""
+    sites = max(1, math.ceil(devices / DEVICES_PER_SITE))
+    per_site = math.ceil(devices / sites)
+    return {
+        "sites": sites,
+        "devices": per_site,
+        "clients": per_site * clients_per_device,
+    }
+
+
+def serve(shape: Dict[str, int], options: Dict[str, float], ready: Any) -> None:
+    """Run a mock controller until the process is terminated."""
+
+    async def run() -> None:
+        mock = MockController(**shape, **options, seed=0)  # type: ignore[arg-type]
+        ready.put(await mock.start())
+        await asyncio.Event().wait()
+
+    asyncio.run(run())
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Exact percentile by nearest rank."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def crawl(host: str, concurrency: int) -> Dict[str, Any]:
+    """Crawl the mock controller and measure the crawl."""
+    setup_logging("bench_crawl", log_level="WARNING", log_to_file=False)
+    client = UniFiClient(
+        host=host,
+        api_key=MOCK_API_KEY,
+        scheme="http",
+        logger=structlog.get_logger("bench_crawl"),
+        pool=ConnectionPoolConfig(limit=concurrency),
+    )
+    latencies: List[float] = []
+    errors = 0
+    async with client:
+        start = time.perf_counter()
+        async for record in client.crawl_inventory(concurrency=concurrency):
+            latencies.append(record.elapsed)
+            errors += not record.ok
+        duration = time.perf_counter() - start
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "duration_s": round(duration, 3),
+        "requests_per_s": round(len(latencies) / duration, 1),
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+    }
+
+
+def run_scale(devices: int, args: Dict[str, Any], results: Any) -> None:
+    """Benchmark one scale in this process against a mock server process."""
+    context = multiprocessing.get_context("spawn")
+    shape = fleet_shape(devices, args["clients_per_device"])
+    options = {
+        "latency": args["latency"],
+        "jitter": args["jitter"],
+        "error_rate": args["error_rate"],
+    }
+    ready = context.Queue()
+    server = context.Process(target=serve, args=(shape, options, ready), daemon=True)
+    server.start()
+    try:
+        host = ready.get(timeout=30)
+        baseline = peak_rss_mb()
+        measured = asyncio.run(crawl(host, args["concurrency"]))
+        measured["peak_rss_mb"] = round(peak_rss_mb(), 1)
+        measured["rss_growth_mb"] = round(peak_rss_mb() - baseline, 1)
+        results.put(
+            {
+                "devices": devices,
+                "sites": shape["sites"],
+                "devices_per_site": shape["devices"],
+                "clients_per_device": args["clients_per_device"],
+                **measured,
+            }
+        )
+    finally:
+        server.terminate()
+        server.join()
+
+
+def git_commit() -> Optional[str]:
+    """Current git commit, if available."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def previous_results(exclude: Path) -> Optional[Dict[str, Any]]:
+    """Most recent saved results other than ``exclude``."""
+    runs = sorted(path for path in RESULTS_DIR.glob("crawl-*.json") if path != exclude)
+    return json.loads(runs[-1].read_text()) if runs else None
+
+
+def print_comparison(current: Dict[str, Any], previous: Dict[str, Any]) -> None:
+    """Print throughput, latency and memory changes against a previous run."""
+    before = {scale["devices"]: scale for scale in previous["scales"]}
+    print(f"\nCompared with {previous['timestamp']} ({previous.get('commit')}):")
+    for scale in current["scales"]:
+        old = before.get(scale["devices"])
+        if old is None:
+            continue
+        changes = ", ".join(
+            f"{metric} {(scale[metric] / old[metric] - 1) * 100:+.1f}%"
+            for metric in ("requests_per_s", "p50_ms", "p99_ms", "peak_rss_mb")
+            if old.get(metric)
+        )
+        print(f"  {scale['devices']:>8} devices: {changes}")
+
+
+def main() -> None:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scales", default="10,1000,100000")
+    parser.add_argument("--clients-per-device", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CRAWL_CONCURRENCY)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    scales = []
+    for devices in (int(scale) for scale in args.scales.split(",")):
+        worker = context.Process(target=run_scale, args=(devices, vars(args), results))
+        worker.start()
+        scale = results.get()
+        worker.join()
+        scales.append(scale)
+        print(
+            f"  {devices:>8} devices {scale['requests']:>8} requests "
+            f"{scale['requests_per_s']:>9.1f} req/s  p50 {scale['p50_ms']:7.2f} ms  "
+            f"p99 {scale['p99_ms']:7.2f} ms  peak RSS {scale['peak_rss_mb']:7.1f} MB"
+        )
+
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    current = {
+        "timestamp": timestamp,
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "options": {
+            key: value for key, value in vars(args).items() if key != "no_save"
+        },
+        "scales": scales,
+    }
+    path = RESULTS_DIR / f"crawl-{timestamp}.json"
+    previous = previous_results(path)
+    if previous is not None:
+        print_comparison(current, previous)
+    if not args.no_save:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        path.write_text(json.dumps(current, indent=2) + "\n")
+        print(f"\nSaved results to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON decoding of large client lists.
+
+Compares the previous response path (text decode, stdlib ``json.loads`` and
+a ``dict`` copy) with the client's pluggable decoder and copy-free models,
+and with validating Pydantic models as planned in PLAN.md.
+"""
+
+import argparse
+import gc
+import json
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from pydantic import BaseModel, TypeAdapter
+
+from unifi_assist.decoding import default_json_loads
+from unifi_assist.models import Client
+
+
+class PydanticClient(BaseModel):
+    """Validating model equivalent to ``unifi_assist.models.Client``."""
+
+    id: str
+    name: Optional[str] = None
+    macAddress: Optional[str] = None
+    ipAddress: Optional[str] = None
+    type: Optional[str] = None
+    uplinkDeviceId: Optional[str] = None
+    connectedAt: Optional[str] = None
+
+
+class PydanticClientList(BaseModel):
+    """Validating list response."""
+
+    data: List[PydanticClient]
+
+
+def make_body(count: int) -> bytes:
+    """Build a ``{"data": [...]}`` client list response body."""
+    clients = [
+        {
+            "id": f"client-{i:08d}",
+            "name": f"Client {i}",
+            "macAddress": f"aa:bb:cc:{i >> 16 & 255:02x}:{i >> 8 & 255:02x}:{i & 255:02x}",
+            "ipAddress": f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}",
+            "type": "WIRELESS" if i % 3 else "WIRED",
+            "uplinkDeviceId": f"device-{i % 500:04d}",
+            "connectedAt": "2025-01-01T00:00:00Z",
+        }
+        for i in range(count)
+    ]
+    return json.dumps(
+        {
+            "offset": 0,
+            "limit": count,
+            "count": count,
+            "totalCount": count,
+            "data": clients,
+        }
+    ).encode()
+
+
+def previous_path(body: bytes) -> Dict[str, Any]:
+    """Decode like ``response.json()`` followed by ``dict(data)``."""
+    return dict(json.loads(body.decode("utf-8")))
+
+
+def model_path(body: bytes) -> Sequence[Client]:
+    """Decode with the default decoder into copy-free models."""
+    return Client.list_from_bytes(body, default_json_loads())
+
+
+def pydantic_path(body: bytes) -> PydanticClientList:
+    """Decode and validate with Pydantic straight from bytes."""
+    return TypeAdapter(PydanticClientList).validate_json(body)
+
+
+def best_of(repeat: int, func: Callable[[bytes], Any], body: bytes) -> float:
+    """Best wall-clock time of ``repeat`` runs in seconds."""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func(body)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    body = make_body(args.clients)
+    print(f"{args.clients} clients, {len(body) / 1e6:.1f} MB body")
+    print(f"decoder: {default_json_loads().__module__}")
+
+    paths = {
+        "previous (text + json + dict copy)": previous_path,
+        "decoder + copy-free models": model_path,
+        "pydantic validate_json": pydantic_path,
+    }
+    baseline = None
+    for name, func in paths.items():
+        seconds = best_of(args.repeat, func, body)
+        baseline = baseline or seconds
+        print(f"  {name:<36} {seconds * 1000:8.1f} ms  {baseline / seconds:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
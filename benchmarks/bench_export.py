@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark streaming export of statistics rows against building them in memory.
+
+Rows come from an async generator of synthetic device statistics, like
+``crawl_rows(client.crawl_inventory(), "device_statistics")`` yields
+them. Each format is streamed to a temporary file and timed. Peak RSS
+is read after the streaming runs and again after the baseline, which
+collects every row and dumps them with ``json.dump`` as
+``save_response`` did, so the second figure includes the baseline's
+memory.
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional
+
+from unifi_assist.export import CSV, NDJSON, export_records
+from unifi_assist.mock_controller import Fleet
+from unifi_assist.poller import STATISTIC_FIELDS
+
+COLUMNS = ["deviceId", *STATISTIC_FIELDS]
+
+
+async def rows(count: int, devices: int = 1000) -> AsyncIterator[Dict[str, Any]]:
+    """Synthetic statistics rows, as a crawl would yield them."""
+    fleet = Fleet(sites=1, devices=devices)
+    for index in range(count):
+        device = index % devices
+        yield {
+            "siteId": "site-0000",
+            "deviceId": f"site-0000-device-{device:06d}",
+            **fleet.device_statistics(0, device),
+        }
+        if index % 1000 == 0:
+            # Let other tasks run, as network reads would
+            await asyncio.sleep(0)
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def stream(
+    count: int, path: Path, format: str, compression: Optional[str]
+) -> None:
+    """Export rows to a file and print throughput."""
+    start = time.perf_counter()
+    stats = await export_records(
+        rows(count), path, format, COLUMNS, compression=compression
+    )
+    elapsed = time.perf_counter() - start
+    print(
+        f"  {format:<6} {compression or 'none':<5} {elapsed:7.2f} s  "
+        f"{stats.records / elapsed / 1000:7.0f} k rows/s  "
+        f"{stats.bytes_encoded / elapsed / 2**20:6.1f} MiB/s encoded  "
+        f"{stats.bytes_written / 2**20:7.1f} MiB written"
+    )
+
+
+async def materialise(count: int, path: Path) -> None:
+    """Baseline: collect every row, then dump them as one document."""
+    start = time.perf_counter()
+    collected = [row async for row in rows(count)]
+    with open(path, "w") as file:
+        json.dump(collected, file, indent=2)
+    print(f"  json.dump baseline  {time.perf_counter() - start:7.2f} s")
+
+
+def main() -> None:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    print(f"{args.rows} statistics rows (start RSS {peak_rss_mb():.0f} MiB):")
+    with tempfile.TemporaryDirectory() as directory:
+        base = Path(directory)
+        for format, compression in (
+            (NDJSON, None),
+            (NDJSON, "gzip"),
+            (CSV, None),
+            (CSV, "gzip"),
+        ):
+            asyncio.run(stream(args.rows, base / "export", format, compression))
+        print(f"  peak RSS after streaming exports   {peak_rss_mb():7.0f} MiB")
+        asyncio.run(materialise(args.rows, base / "baseline.json"))
+        print(f"  peak RSS after baseline            {peak_rss_mb():7.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark the columnar inventory against lists of client dictionaries.
+
+Measures memory held by each representation and the time of typical
+queries: filtering wireless clients, counting clients per access point and
+looking up a client by MAC address.
+"""
+
+import argparse
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from unifi_assist.inventory import Inventory
+
+
+def make_clients(count: int, access_points: int = 500) -> List[Dict[str, Any]]:
+    """Build synthetic client records like ``get_clients`` returns."""
+    return [
+        {
+            "id": f"client-{i:08d}",
+            "name": f"Client {i}",
+            "macAddress": f"aa:bb:cc:{i >> 16 & 255:02x}:{i >> 8 & 255:02x}:{i & 255:02x}",
+            "ipAddress": f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}",
+            "type": "WIRELESS" if i % 3 else "WIRED",
+            "uplinkDeviceId": f"device-{i % access_points:04d}",
+        }
+        for i in range(count)
+    ]
+
+
+def measure(build: Callable[[], Any]) -> Tuple[Any, int]:
+    """Build an object and return it with the memory it retained."""
+    tracemalloc.start()
+    result = build()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, retained
+
+
+def timed(func: Callable[[], Any], repeat: int = 5) -> float:
+    """Best wall-clock time of ``repeat`` runs in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main() -> None:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=100_000)
+    args = parser.parse_args()
+
+    records, dict_bytes = measure(lambda: make_clients(args.clients))
+    inventory, inventory_bytes = measure(lambda: Inventory.clients({"data": records}))
+    target_mac = records[-1]["macAddress"]
+
+    print(f"{args.clients} clients")
+    print(f"  list of dicts: {dict_bytes / 1e6:8.1f} MB")
+    print(
+        f"  inventory:     {inventory_bytes / 1e6:8.1f} MB "
+        f"({dict_bytes / inventory_bytes:.1f}x smaller)"
+    )
+
+    queries: Dict[str, Tuple[Callable[[], Any], Callable[[], Any]]] = {
+        "filter wireless": (
+            lambda: [r for r in records if r["type"] == "WIRELESS"],
+            lambda: inventory.equals("type", "WIRELESS"),
+        ),
+        "clients per AP": (
+            lambda: _count(records, "uplinkDeviceId"),
+            lambda: inventory.group_count("uplinkDeviceId"),
+        ),
+        "find by MAC": (
+            lambda: [r for r in records if r["macAddress"] == target_mac],
+            lambda: inventory.equals("macAddress", target_mac),
+        ),
+    }
+    for name, (baseline, columnar) in queries.items():
+        print(
+            f"  {name:<16} dicts {timed(baseline):7.2f} ms  "
+            f"inventory {timed(columnar):7.2f} ms"
+        )
+
+
+def _count(records: List[Dict[str, Any]], field: str) -> Dict[Any, int]:
+    """Count records per field value the way analysis code does today."""
+    counts: Dict[Any, int] = {}
+    for record in records:
+        counts[record[field]] = counts.get(record[field], 0) + 1
+    return counts
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-request logging overhead on the event-loop thread.
+
+Each simulated request logs the two debug events ``UniFiClient._send``
+emits. Compares the previous setup (synchronous file handlers, every event
+processed and written on the calling thread, request body included) with
+the queue-based pipeline at DEBUG and at INFO, where debug events are
+skipped before any arguments are built.
+"""
+
+import argparse
+import contextlib
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict, TextIO
+
+import structlog
+
+from unifi_assist.logging import is_debug_enabled, setup_logging, shutdown_logging
+
+URL = "https://unifi.example/proxy/network/integration/v1/sites/default/devices"
+PARAMS = {"offset": 0, "limit": 200}
+BODY: Dict[str, Any] = {"action": "RESTART", "options": {"force": False}}
+
+
+def previous_request(logger: Any) -> None:
+    """Log like the client did before: always, with the request body."""
+    event = "post"
+    logger.debug(f"making_{event}_request", url=URL, params=PARAMS, data=BODY)
+    logger.debug(f"{event}_request_complete", url=URL, status=200)
+
+
+def make_current_request(logger: Any) -> Callable[[Any], None]:
+    """Log like the client does now: level checked once, no body."""
+    enabled = is_debug_enabled(logger)
+
+    def request(logger: Any) -> None:
+        if enabled:
+            logger.debug("making_request", method="POST", url=URL, params=PARAMS)
+        if enabled:
+            logger.debug("request_complete", method="POST", url=URL, status=200)
+
+    return request
+
+
+def configure(
+    log_dir: str, level: str, non_blocking: bool, previous: bool, console: TextIO
+) -> Any:
+    """Configure logging with console output sent to ``console``."""
+    with contextlib.redirect_stdout(console):
+        logger = setup_logging(
+            "bench",
+            log_level=level,
+            log_to_file=True,
+            log_dir=log_dir,
+            non_blocking=non_blocking,
+            force=True,
+        )
+        if previous:
+            # The previous setup did not filter events in the bound logger
+            structlog.configure(wrapper_class=structlog.stdlib.BoundLogger)
+            logger = structlog.get_logger("bench")
+    return logger
+
+
+def measure(requests: int, logger: Any, request: Callable[[Any], None]) -> float:
+    """Calling-thread time per request in microseconds."""
+    start = time.perf_counter()
+    for _ in range(requests):
+        request(logger)
+    elapsed = time.perf_counter() - start
+    # Drain the queue so the next run starts from an idle writer thread
+    shutdown_logging()
+    return elapsed / requests * 1e6
+
+
+def main() -> None:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20_000)
+    args = parser.parse_args()
+
+    runs = {
+        "previous (sync files, DEBUG)": ("DEBUG", False, True),
+        "queued (DEBUG)": ("DEBUG", True, False),
+        "queued (INFO, debug skipped)": ("INFO", True, False),
+    }
+    baseline = None
+    with (
+        tempfile.TemporaryDirectory() as log_dir,
+        open(os.devnull, "w") as console,
+    ):
+        for name, (level, non_blocking, previous) in runs.items():
+            logger = configure(log_dir, level, non_blocking, previous, console)
+            request = previous_request if previous else make_current_request(logger)
+            micros = measure(args.requests, logger, request)
+            baseline = baseline or micros
+            print(f"  {name:<32} {micros:8.2f} us/request  {baseline / micros:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark event loop lag while fetching large client lists.
+
+A server in its own process answers with a pre-built client list from the
+mock controller's synthetic fleet, so serving costs little.
+The client fetches the full, unpaginated client list repeatedly while a
+``LoopLagMonitor`` samples the loop and a probe coroutine times small
+requests. Each mode decodes and analyzes the list differently: inline on
+the loop, in a thread pool, or in a process pool, which pickles the
+decoded list back and sends it out again to be reduced to counts.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import time
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import structlog
+from aiohttp import web
+
+from unifi_assist import endpoints
+from unifi_assist.client import UniFiClient
+from unifi_assist.decoding import DecodeOffload
+from unifi_assist.logging import setup_logging
+from unifi_assist.metrics import LoopLagMonitor
+from unifi_assist.mock_controller import MOCK_API_KEY, Fleet
+
+
+def serve(clients: int, ready: Any) -> None:
+    """Serve a fixed client list and system info until terminated."""
+    fleet = Fleet(sites=1, devices=100, clients=clients)
+    records = [fleet.client(0, index) for index in range(clients)]
+    body = json.dumps({"totalCount": clients, "data": records}).encode()
+
+    async def client_list(request: web.Request) -> web.Response:
+        return web.Response(body=body, content_type="application/json")
+
+    async def info(request: web.Request) -> web.Response:
+        return web.json_response({"applicationVersion": "9.0.0"})
+
+    async def run() -> None:
+        app = web.Application()
+        app.router.add_get(
+            "/" + endpoints.CLIENTS.format(siteId="site-0000"), client_list
+        )
+        app.router.add_get("/" + endpoints.INFO, info)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        ready.put(f"127.0.0.1:{port}")
+        await asyncio.Event().wait()
+
+    asyncio.run(run())
+
+
+def count_types(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Analyzer: reduce a client list to per-type counts."""
+    counts = Counter(client.get("type") for client in data.get("data", []))
+    return {"totalCount": data.get("totalCount"), "types": dict(counts)}
+
+
+async def probe(client: UniFiClient, done: asyncio.Event) -> List[float]:
+    """Time small requests until the large fetches are done."""
+    durations = []
+    while not done.is_set():
+        start = time.perf_counter()
+        await client.get_system_info()
+        durations.append(time.perf_counter() - start)
+        await asyncio.sleep(0.01)
+    return durations
+
+
+async def measure(
+    host: str, fetches: int, mode: str, executor: Optional[Executor]
+) -> None:
+    """Fetch the client list and report loop lag for one mode."""
+    offload = None
+    if mode != "inline":
+        offload = DecodeOffload(executor=executor)
+        offload.register(endpoints.CLIENTS, count_types)
+    client = UniFiClient(
+        host=host,
+        api_key=MOCK_API_KEY,
+        scheme="http",
+        logger=structlog.get_logger("bench_offload"),
+        offload=offload,
+    )
+    async with client:
+        await client.get_system_info()
+        done = asyncio.Event()
+        async with LoopLagMonitor() as lag:
+            prober = asyncio.create_task(probe(client, done))
+            start = time.perf_counter()
+            for _ in range(fetches):
+                data = await client.get_clients("site-0000")
+                if offload is None:
+                    data = count_types(data)
+                else:
+                    data = await offload.analyze(endpoints.CLIENTS, data)
+            elapsed = time.perf_counter() - start
+            done.set()
+            probes = sorted(await prober)
+    summary = lag.summary()
+    print(
+        f"  {mode:<8} {elapsed / fetches * 1000:8.1f} ms/fetch  "
+        f"lag p99 {summary['p99_ms']:7.1f} ms  max {summary['max_ms']:7.1f} ms  "
+        f"probe p99 {probes[int(len(probes) * 0.99)] * 1000:7.1f} ms"
+    )
+    if offload is not None:
+        offload.shutdown()
+
+
+def main() -> None:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=100_000)
+    parser.add_argument("--fetches", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    setup_logging("bench_offload", log_level="WARNING")
+    context = multiprocessing.get_context("spawn")
+    ready = context.Queue()
+    server = context.Process(target=serve, args=(args.clients, ready), daemon=True)
+    server.start()
+    host = ready.get(timeout=60)
+    print(f"{args.fetches} fetches of {args.clients} clients:")
+    asyncio.run(measure(host, args.fetches, "inline", None))
+    asyncio.run(measure(host, args.fetches, "thread", None))
+    with ProcessPoolExecutor(args.workers, mp_context=context) as executor:
+        asyncio.run(measure(host, args.fetches, "process", executor))
+    server.terminate()
+    server.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark a full recommendations run against the API fetches it needs.
+
+A mock controller serves many sites. The baseline only fetches what the
+default checks read: every device's details and every site's client list.
+The checker then runs cold, and again with nothing changed, when device
+details are not fetched again and every verdict comes from the cache.
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Awaitable, Callable
+
+import structlog
+
+from unifi_assist.logging import setup_logging
+from unifi_assist.mock_controller import MockController
+from unifi_assist.recommendations import (
+    DEFAULT_CHECK_CONCURRENCY,
+    RecommendationChecker,
+)
+
+
+async def timed(action: Callable[[], Awaitable[Any]]) -> float:
+    """Wall-clock time of one run in milliseconds."""
+    start = time.perf_counter()
+    await action()
+    return (time.perf_counter() - start) * 1000
+
+
+async def run(sites: int, devices: int, clients: int) -> None:
+    """Run the baseline and the checker against one mock controller."""
+    logger = structlog.get_logger("bench_recommendations")
+    async with MockController(sites=sites, devices=devices, clients=clients) as mock:
+        async with mock.client(logger=logger) as client:
+            semaphore = asyncio.Semaphore(DEFAULT_CHECK_CONCURRENCY)
+
+            async def list_clients(site_id: str) -> None:
+                async with semaphore:
+                    [record async for record in client.iter_clients(site_id)]
+
+            async def fetch_only() -> None:
+                await client.sync_devices(include_statistics=False)
+                await asyncio.gather(
+                    *(list_clients(f"site-{site:04d}") for site in range(sites))
+                )
+
+            baseline = await timed(fetch_only)
+        async with mock.client(logger=logger) as client:
+            checker = RecommendationChecker(client)
+            cold = await timed(checker.run)
+            warm = await timed(checker.run)
+
+    print(f"{sites} sites, {devices} devices and {clients} clients each:")
+    print(f"  fetches only             {baseline:8.1f} ms")
+    print(f"  checker, cold            {cold:8.1f} ms")
+    print(f"  checker, unchanged       {warm:8.1f} ms")
+
+
+def main() -> None:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sites", type=int, default=200)
+    parser.add_argument("--devices", type=int, default=20)
+    parser.add_argument("--clients", type=int, default=100)
+    args = parser.parse_args()
+
+    setup_logging("bench_recommendations", log_level="WARNING")
+    asyncio.run(run(args.sites, args.devices, args.clients))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark incremental rule evaluation against rescanning every device.
+
+Builds a fleet of devices with statistics and a rule set padded with
+threshold rules to the requested size. Times the initial evaluation of
+all rules, then single-device statistics and state updates, where the
+engine only re-runs rules depending on the changed fields. The baseline
+rescans every device record against every rule on each update.
+"""
+
+import argparse
+import random
+import time
+from typing import Any, Callable, Dict, List
+
+from unifi_assist.poller import STATISTIC_FIELDS
+from unifi_assist.rules import DEFAULT_RULES, WARNING, Rule, RuleEngine, at_least
+
+
+def make_devices(count: int) -> List[Dict[str, Any]]:
+    """Build synthetic device records like ``get_devices`` returns."""
+    return [
+        {
+            "id": f"device-{i:06d}",
+            "name": f"Device {i}",
+            "model": "U6-Pro",
+            "state": "ONLINE",
+            "firmwareVersion": "7.0.76",
+        }
+        for i in range(count)
+    ]
+
+
+def make_statistics(rng: random.Random) -> Dict[str, Any]:
+    """Build a synthetic ``statistics/latest`` response."""
+    return {
+        "uptimeSec": rng.randint(0, 10**6),
+        "cpuUtilizationPct": rng.uniform(0, 100),
+        "memoryUtilizationPct": rng.uniform(0, 100),
+        "loadAverage1Min": rng.uniform(0, 4),
+        "loadAverage5Min": rng.uniform(0, 4),
+        "loadAverage15Min": rng.uniform(0, 4),
+        "uplink": {"txRateBps": rng.randint(0, 10**9), "rxRateBps": 0},
+    }
+
+
+# Thresholds that about 2% of synthetic devices exceed
+THRESHOLDS = {
+    "uptimeSec": 980_000,
+    "cpuUtilizationPct": 98,
+    "memoryUtilizationPct": 98,
+    "loadAverage1Min": 3.92,
+    "loadAverage5Min": 3.92,
+    "loadAverage15Min": 3.92,
+    "uplink.txRateBps": 980_000_000,
+    "uplink.rxRateBps": 1,
+}
+
+
+def make_rules(count: int) -> List[Rule]:
+    """Default rules padded with threshold rules over the statistics."""
+    rules = list(DEFAULT_RULES)
+    for index in range(count - len(rules)):
+        name = STATISTIC_FIELDS[index % len(STATISTIC_FIELDS)]
+        threshold = THRESHOLDS[name] * (1 + index / 1000)
+        rules.append(
+            Rule(
+                f"threshold_{index}",
+                ((WARNING, at_least(name, threshold)),),
+                f"{{name}} {name} above {threshold}",
+            )
+        )
+    return rules
+
+
+def rescan(records: List[Dict[str, Any]], rules: int) -> int:
+    """Baseline: test every rule against every device record."""
+    found = 0
+    for _ in range(rules):
+        for record in records:
+            found += record.get("cpuUtilizationPct", 0) >= 90
+    return found
+
+
+def timed(func: Callable[[], Any], repeat: int) -> float:
+    """Median wall-clock time of ``repeat`` runs in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return sorted(timings)[len(timings) // 2] * 1000
+
+
+def main() -> None:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--devices", type=int, default=5_000)
+    parser.add_argument("--rules", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    records = make_devices(args.devices)
+    engine = RuleEngine(make_rules(args.rules))
+    engine.update_devices(records)
+    statistics = {record["id"]: make_statistics(rng) for record in records}
+    for record in records:
+        record.update(statistics[record["id"]])
+    engine.update_statistics(statistics)
+
+    targets = [rng.choice(records)["id"] for _ in range(args.repeat)]
+    states = iter(["OFFLINE", "ONLINE"] * args.repeat)
+
+    def statistics_update() -> None:
+        engine.update_statistics({rng.choice(targets): make_statistics(rng)})
+
+    def state_update() -> None:
+        engine.update_devices([{"id": targets[0], "state": next(states)}])
+
+    print(f"{args.devices} devices, {args.rules} rules:")
+    print(f"  full evaluation          {timed(engine.evaluate, 5):8.2f} ms")
+    print(f"  statistics update        {timed(statistics_update, args.repeat):8.2f} ms")
+    print(f"  state update             {timed(state_update, args.repeat):8.2f} ms")
+    baseline = timed(lambda: rescan(records, args.rules), 5)
+    print(f"  rescan baseline          {baseline:8.2f} ms")
+    print(f"  open issues              {engine.summary()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark change detection of adaptive polling against fixed-interval polling.
+
+A simulated fleet changes on a clock: a small share of busy devices change
+their statistics every ``--busy-period`` seconds, the rest every
+``--idle-period`` seconds, at staggered offsets. ``PollScheduler`` runs
+first under a request budget; ``StatisticsPoller`` then runs at the
+fixed interval that spends the same number of requests per second. For
+every poll the fleet records how long ago the first unseen change
+happened (detection delay) and how many changes were overwritten before
+any poll saw them (missed).
+"""
+
+import argparse
+import asyncio
+import math
+import time
+from typing import Any, AsyncGenerator, Dict, List
+
+import structlog
+
+from unifi_assist.logging import setup_logging
+from unifi_assist.poller import StatisticsPoller
+from unifi_assist.scheduler import PollScheduler
+
+
+class SimulatedFleet:
+    """Stand-in client whose device statistics change on a clock."""
+
+    def __init__(self, devices: int, busy: int, busy_period: float, idle: float):
+        self.logger = structlog.get_logger("bench_scheduler")
+        self.start = time.monotonic()
+        self.periods = [busy_period if i < busy else idle for i in range(devices)]
+        self.offsets = [(i * 0.618) % 1 * self.periods[i] for i in range(devices)]
+        self.busy = busy
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget what has been observed, keeping the change clock running."""
+        devices = len(self.periods)
+        self.seen = [self._version(i, time.monotonic()) for i in range(devices)]
+        self.delays: List[List[float]] = [[], []]
+        self.missed = [0, 0]
+        self.changes = [0, 0]
+        self.requests = 0
+        self.window = time.monotonic()
+
+    def _version(self, index: int, now: float) -> int:
+        """Number of changes of a device so far."""
+        return math.floor(
+            (now - self.start - self.offsets[index]) / self.periods[index]
+        )
+
+    async def get_sites(self) -> Dict[str, Any]:
+        return {"data": [{"id": "site"}]}
+
+    async def iter_devices(self, site_id: str) -> AsyncGenerator[Dict[str, Any], None]:
+        for index in range(len(self.periods)):
+            yield {"id": str(index)}
+
+    async def get_device_statistics(
+        self, site_id: str, device_id: str
+    ) -> Dict[str, Any]:
+        index = int(device_id)
+        now = time.monotonic()
+        version = self._version(index, now)
+        group = 0 if index < self.busy else 1
+        self.requests += 1
+        if version > self.seen[index]:
+            first = self.start + self.offsets[index]
+            first += (self.seen[index] + 1) * self.periods[index]
+            self.delays[group].append(now - first)
+            self.missed[group] += version - self.seen[index] - 1
+            self.seen[index] = version
+        return {"cpuUtilizationPct": float(version * 37 % 100)}
+
+    def report(self, name: str) -> float:
+        """Print detection results and return requests per second."""
+        rate = self.requests / (time.monotonic() - self.window)
+        columns = []
+        for group, label in enumerate(("busy", "idle")):
+            delays = sorted(self.delays[group])
+            mean = sum(delays) / len(delays) if delays else math.nan
+            p95 = delays[int(len(delays) * 0.95)] if delays else math.nan
+            seen = len(delays) + self.missed[group]
+            columns.append(
+                f"{label} delay mean {mean:5.2f} s p95 {p95:5.2f} s "
+                f"missed {self.missed[group] / max(seen, 1):4.0%}"
+            )
+        print(f"  {name:<9} {rate:6.1f} req/s  " + "  ".join(columns))
+        return rate
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Run both pollers against the same fleet."""
+    fleet = SimulatedFleet(args.devices, args.busy, args.busy_period, args.idle_period)
+    scheduler = PollScheduler(
+        fleet,  # type: ignore[arg-type]
+        budget=args.budget,
+        min_interval=args.busy_period,
+        max_interval=args.idle_period,
+        seed=1,
+    )
+    await scheduler.discover(include_clients=False)
+    async with scheduler:
+        # Let intervals settle before measuring
+        await asyncio.sleep(args.warmup)
+        fleet.reset()
+        await asyncio.sleep(args.duration)
+    rate = fleet.report("adaptive")
+
+    interval = args.devices / rate
+    fleet.reset()
+    poller = StatisticsPoller(fleet, interval=interval)  # type: ignore[arg-type]
+    async with poller:
+        await asyncio.sleep(args.duration)
+    fleet.report("fixed")
+    print(f"  (fixed interval {interval:.2f} s, {scheduler.stats.summary()})")
+
+
+def main() -> None:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--devices", type=int, default=500)
+    parser.add_argument("--busy", type=int, default=50)
+    parser.add_argument("--busy-period", type=float, default=0.2)
+    parser.add_argument("--idle-period", type=float, default=12.0)
+    parser.add_argument("--budget", type=float, default=300.0)
+    parser.add_argument("--warmup", type=float, default=40.0)
+    parser.add_argument("--duration", type=float, default=24.0)
+    args = parser.parse_args()
+
+    setup_logging("bench_scheduler", log_level="WARNING")
+    print(
+        f"{args.devices} devices, {args.busy} changing every {args.busy_period} s, "
+        f"the rest every {args.idle_period} s:"
+    )
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark streamed parsing of a large client list against buffered decoding.
+
+A server in its own process answers with a pre-built, unpaginated client
+list from the mock controller's synthetic fleet, ignoring ``offset`` and
+``limit`` like a controller without server-side paging. Each mode runs
+in a fresh process so its peak RSS is its own: ``buffered`` reads the
+whole body and decodes it, ``streamed`` passes ``stream=True`` and
+decodes clients as chunks arrive. Clients are counted by type, so none
+are kept after use.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import resource
+import time
+from collections import Counter
+from typing import Any
+
+import structlog
+from aiohttp import web
+
+from unifi_assist import endpoints
+from unifi_assist.client import UniFiClient
+from unifi_assist.logging import setup_logging
+from unifi_assist.mock_controller import MOCK_API_KEY, Fleet
+
+
+def serve(clients: int, ready: Any) -> None:
+    """Serve a fixed client list until terminated."""
+    fleet = Fleet(sites=1, devices=100, clients=clients)
+    records = [fleet.client(0, index) for index in range(clients)]
+    body = json.dumps({"data": records}).encode()
+    del records
+
+    async def client_list(request: web.Request) -> web.Response:
+        return web.Response(body=body, content_type="application/json")
+
+    async def run() -> None:
+        app = web.Application()
+        app.router.add_get(
+            "/" + endpoints.CLIENTS.format(siteId="site-0000"), client_list
+        )
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        ready.put((f"127.0.0.1:{runner.addresses[0][1]}", len(body)))
+        await asyncio.Event().wait()
+
+    asyncio.run(run())
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def measure(host: str, stream: bool) -> str:
+    """Iterate over the client list once and describe the run."""
+    client = UniFiClient(
+        host=host,
+        api_key=MOCK_API_KEY,
+        scheme="http",
+        logger=structlog.get_logger("bench_stream"),
+    )
+    types: Counter[Any] = Counter()
+    async with client:
+        baseline = peak_rss_mb()
+        start = time.perf_counter()
+        first = 0.0
+        async for record in client.iter_clients(
+            "site-0000", page_size=1_000_000, stream=stream
+        ):
+            if not first:
+                first = time.perf_counter() - start
+            types[record.get("type")] += 1
+        elapsed = time.perf_counter() - start
+    return (
+        f"  {'streamed' if stream else 'buffered':<8} {elapsed:6.2f} s  "
+        f"first client {first * 1000:7.1f} ms  "
+        f"{sum(types.values())} clients  "
+        f"peak RSS +{peak_rss_mb() - baseline:5.0f} MiB"
+    )
+
+
+def run_mode(host: str, stream: bool, results: Any) -> None:
+    """Measure one mode in this process."""
+    setup_logging("bench_stream", log_level="WARNING")
+    results.put(asyncio.run(measure(host, stream)))
+
+
+def main() -> None:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=200_000)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    ready = context.Queue()
+    server = context.Process(target=serve, args=(args.clients, ready), daemon=True)
+    server.start()
+    host, size = ready.get(timeout=120)
+    print(f"{args.clients} clients, {size / 2**20:.0f} MiB body:")
+    results = context.Queue()
+    for stream in (False, True):
+        worker = context.Process(target=run_mode, args=(host, stream, results))
+        worker.start()
+        print(results.get(timeout=600))
+        worker.join()
+    server.terminate()
+    server.join()
+
+
+if __name__ == "__main__":
+    main()
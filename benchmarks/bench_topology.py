@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark topology lookups against scanning the device and client lists.
+
+Builds a synthetic fleet from the mock controller's generator: device
+details carry their uplink, clients the device they are connected to.
+Times building the topology, lookups by MAC and IP, clients behind a
+device and uplink paths, and an incremental update of a client list.
+The baseline answers the same questions by scanning the lists, as
+callers did before.
+"""
+
+import argparse
+import random
+import time
+from typing import Any, Callable, Dict, List
+
+from unifi_assist.mock_controller import Fleet
+from unifi_assist.topology import Topology
+
+
+def timed(func: Callable[[], Any], repeat: int) -> float:
+    """Median wall-clock time of ``repeat`` runs in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return sorted(timings)[len(timings) // 2] * 1000
+
+
+def scan_behind(
+    devices: List[Dict[str, Any]], clients: List[Dict[str, Any]], device_id: str
+) -> List[Dict[str, Any]]:
+    """Baseline: clients behind a device, by walking uplinks of every client."""
+    uplinks = {device["id"]: device["uplink"]["deviceId"] for device in devices}
+    behind = []
+    for client in clients:
+        node = client["uplinkDeviceId"]
+        seen = set()
+        while node not in seen:
+            if node == device_id:
+                behind.append(client)
+                break
+            seen.add(node)
+            node = uplinks.get(node, node)
+    return behind
+
+
+def main() -> None:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sites", type=int, default=10)
+    parser.add_argument("--devices", type=int, default=200)
+    parser.add_argument("--clients", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    fleet = Fleet(args.sites, args.devices, args.clients)
+    sites = [fleet.site_id(site) for site in range(args.sites)]
+    devices = {
+        site_id: [fleet.device_details(site, i) for i in range(args.devices)]
+        for site, site_id in enumerate(sites)
+    }
+    clients = {
+        site_id: [fleet.client(site, i) for i in range(args.clients)]
+        for site, site_id in enumerate(sites)
+    }
+    all_devices = [device for site in devices.values() for device in site]
+    all_clients = [client for site in clients.values() for client in site]
+
+    def build() -> Topology:
+        topology = Topology()
+        for site_id in sites:
+            topology.update_devices(site_id, devices[site_id], complete=True)
+            topology.update_clients(site_id, clients[site_id], complete=True)
+        return topology
+
+    topology = build()
+    probe = rng.choice(all_clients)
+    switch = f"{sites[0]}-device-000001"
+    update = [
+        {**client, "uplinkDeviceId": rng.choice(devices[sites[0]])["id"]}
+        for client in rng.sample(clients[sites[0]], args.clients // 100)
+    ]
+
+    mac, ip = probe["macAddress"], probe["ipAddress"]
+    rows = [
+        (
+            "find_mac",
+            timed(lambda: topology.find_mac(mac), args.repeat),
+            timed(lambda: [c for c in all_clients if c["macAddress"] == mac], 5),
+        ),
+        (
+            "find_ip",
+            timed(lambda: topology.find_ip(ip), args.repeat),
+            timed(lambda: [c for c in all_clients if c["ipAddress"] == ip], 5),
+        ),
+        (
+            f"clients_behind ({len(topology.clients_behind(switch))})",
+            timed(lambda: topology.clients_behind(switch), args.repeat),
+            timed(lambda: scan_behind(all_devices, all_clients, switch), 3),
+        ),
+        (
+            "uplink_path",
+            timed(lambda: topology.uplink_path(probe["id"]), args.repeat),
+            None,
+        ),
+        (
+            f"update {len(update)} clients (vs. rebuild)",
+            timed(lambda: topology.update_clients(sites[0], update), args.repeat),
+            timed(build, 3),
+        ),
+    ]
+    print(f"{len(all_devices)} devices, {len(all_clients)} clients:")
+    print(f"  {'build':<36} {timed(build, 3):10.4f} ms")
+    for name, indexed, scan in rows:
+        baseline = f"   scan {scan:10.3f} ms" if scan is not None else ""
+        print(f"  {name:<36} {indexed:10.4f} ms{baseline}")
+
+
+if __name__ == "__main__":
+    main()
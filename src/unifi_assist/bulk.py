@@ -0,0 +1,323 @@
+"""Rolling bulk device actions with health checks between waves."""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Collection,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from .metrics import error_reason
+
+if TYPE_CHECKING:
+    from .client import UniFiClient
+
+DEFAULT_BULK_CONCURRENCY = 8
+DEFAULT_WAVE_SIZE = 32
+DEFAULT_SETTLE_TIME = 5.0
+DEFAULT_HEALTH_POLL_INTERVAL = 5.0
+DEFAULT_WAVE_TIMEOUT = 600.0
+HEALTHY_STATES = frozenset({"ONLINE"})
+
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+TIMED_OUT = "timed_out"
+SKIPPED = "skipped"
+
+# (site_id, device_id)
+Target = Tuple[str, str]
+Selector = Union[Iterable[Target], Callable[[Mapping[str, Any]], bool]]
+
+
+@dataclass
+class DeviceOutcome:
+    """What happened to one device of a bulk action.
+
+    Attributes:
+        site_id: Site the device belongs to
+        device_id: Device identifier
+        status: "succeeded", "failed" (the action was rejected),
+            "timed_out" (the device did not come back healthy) or
+            "skipped" (the run was aborted before its wave)
+        error: Failure reason, if any
+        state: Last device state seen while waiting, if any
+    """
+
+    site_id: str
+    device_id: str
+    status: str = SKIPPED
+    error: Optional[str] = None
+    state: Optional[str] = None
+
+
+@dataclass
+class BulkProgress:
+    """Progress reported after every wave."""
+
+    wave: int
+    wave_size: int
+    done: int
+    total: int
+    failed: int
+
+
+@dataclass
+class BulkResult:
+    """Outcome of a bulk action.
+
+    Attributes:
+        action: Action that was performed
+        outcomes: Per-device outcomes, in target order
+        waves: Number of waves started
+        aborted: Whether the run stopped early after too many failures
+        duration: Wall-clock time in seconds
+    """
+
+    action: Dict[str, Any]
+    outcomes: List[DeviceOutcome] = field(default_factory=list)
+    waves: int = 0
+    aborted: bool = False
+    duration: float = 0.0
+
+    @property
+    def failed(self) -> List[DeviceOutcome]:
+        """Devices the action failed for or that did not come back."""
+        return [o for o in self.outcomes if o.status in (FAILED, TIMED_OUT)]
+
+    @property
+    def ok(self) -> bool:
+        """Whether every device succeeded."""
+        return all(outcome.status == SUCCEEDED for outcome in self.outcomes)
+
+    def summary(self) -> Dict[str, Any]:
+        """Summarize the run as a plain dictionary suitable for logging."""
+        counts = {status: 0 for status in (SUCCEEDED, FAILED, TIMED_OUT, SKIPPED)}
+        for outcome in self.outcomes:
+            counts[outcome.status] += 1
+        return {
+            "action": self.action.get("action"),
+            "devices": len(self.outcomes),
+            "waves": self.waves,
+            "aborted": self.aborted,
+            "duration": round(self.duration, 3),
+            **counts,
+        }
+
+
+async def select_devices(
+    client: "UniFiClient",
+    predicate: Callable[[Mapping[str, Any]], bool],
+    site_ids: Optional[Iterable[str]] = None,
+) -> List[Target]:
+    """Find devices matching a predicate.
+
+    Args:
+        client: Client to list devices with
+        predicate: Called with each device record from the device list
+        site_ids: Sites to search; every site if not given
+
+    Returns:
+        Matching devices as (site_id, device_id) pairs
+    """
+    if site_ids is None:
+        site_ids = [site["id"] for site in (await client.get_sites()).get("data", [])]
+    targets = []
+    for site_id in site_ids:
+        async for device in client.iter_devices(site_id):
+            if predicate(device):
+                targets.append((site_id, device["id"]))
+    return targets
+
+
+class BulkAction:
+    """Runs one device action across many devices in rolling waves.
+
+    Targets are de-duplicated and split into waves. The first wave is a
+    canary; every wave in which all devices succeed doubles the size of
+    the next one, up to ``wave_size``, and a wave with failures drops back
+    to the canary size. Within a wave, actions are sent with bounded
+    concurrency. Unless ``wait_healthy`` is off, the next wave only starts
+    once every device of the current one reports a healthy state again,
+    or the wave times out. Once more than ``max_failures`` devices failed,
+    the remaining devices are skipped.
+
+    Example:
+        bulk = BulkAction(
+            client,
+            {"action": "RESTART"},
+            lambda device: device["model"] == "U6-Pro",
+        )
+        result = await bulk.run()
+        for outcome in result.failed:
+            ...
+    """
+
+    def __init__(
+        self,
+        client: "UniFiClient",
+        action: Dict[str, Any],
+        targets: Selector,
+        wave_size: int = DEFAULT_WAVE_SIZE,
+        canary: int = 1,
+        concurrency: int = DEFAULT_BULK_CONCURRENCY,
+        wait_healthy: bool = True,
+        settle_time: float = DEFAULT_SETTLE_TIME,
+        poll_interval: float = DEFAULT_HEALTH_POLL_INTERVAL,
+        wave_timeout: float = DEFAULT_WAVE_TIMEOUT,
+        max_failures: Optional[int] = None,
+        healthy_states: Collection[str] = HEALTHY_STATES,
+        progress: Optional[Callable[[BulkProgress], None]] = None,
+    ):
+        """Initialize the bulk action.
+
+        Args:
+            client: Client to send actions with
+            action: Action body, e.g. ``{"action": "RESTART"}``
+            targets: (site_id, device_id) pairs, or a predicate selecting
+                devices from every site's device list
+            wave_size: Largest number of devices acted on per wave
+            canary: Size of the first wave
+            concurrency: Maximum action and health requests in flight
+            wait_healthy: Whether to wait for devices to be healthy again
+                before starting the next wave
+            settle_time: Seconds to wait after a wave's actions before the
+                first health check, so devices have gone down
+            poll_interval: Seconds between health checks
+            wave_timeout: Seconds to wait for a wave to become healthy
+            max_failures: Abort once more devices than this failed; never
+                abort if not given
+            healthy_states: Device states that count as healthy
+            progress: Called after every wave
+        """
+        if not 1 <= canary <= wave_size:
+            raise ValueError("Wave sizes must satisfy 1 <= canary <= wave_size")
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1")
+
+        self.client = client
+        self.action = action
+        self.targets = targets
+        self.wave_size = wave_size
+        self.canary = canary
+        self.concurrency = concurrency
+        self.wait_healthy = wait_healthy
+        self.settle_time = settle_time
+        self.poll_interval = poll_interval
+        self.wave_timeout = wave_timeout
+        self.max_failures = max_failures
+        self.healthy_states = frozenset(healthy_states)
+        self.progress = progress
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(self) -> BulkResult:
+        """Act on every target.
+
+        Returns:
+            Per-device outcomes; failures are reported, not raised
+        """
+        start = time.monotonic()
+        targets = await self._resolve()
+        result = BulkResult(self.action, [DeviceOutcome(*t) for t in targets])
+        failures, size, done = 0, self.canary, 0
+        while done < len(targets):
+            if self.max_failures is not None and failures > self.max_failures:
+                result.aborted = True
+                break
+            wave = result.outcomes[done : done + size]
+            result.waves += 1
+            await self._run_wave(wave)
+            wave_failures = sum(o.status != SUCCEEDED for o in wave)
+            failures += wave_failures
+            done += len(wave)
+            size = self.canary if wave_failures else min(size * 2, self.wave_size)
+            self._report(result.waves, len(wave), done, len(targets), failures)
+        result.duration = time.monotonic() - start
+        self.client.logger.info("bulk_action_complete", **result.summary())
+        return result
+
+    async def _resolve(self) -> List[Target]:
+        """Targets to act on, de-duplicated in their original order."""
+        if callable(self.targets):
+            targets: Iterable[Target] = await select_devices(self.client, self.targets)
+        else:
+            targets = self.targets
+        return list(dict.fromkeys(targets))
+
+    async def _run_wave(self, wave: List[DeviceOutcome]) -> None:
+        """Send the action to a wave and wait for it to be healthy again."""
+        await asyncio.gather(*(self._act(outcome) for outcome in wave))
+        acted = [outcome for outcome in wave if outcome.status == SUCCEEDED]
+        if self.wait_healthy and acted:
+            await self._await_healthy(acted)
+
+    async def _act(self, outcome: DeviceOutcome) -> None:
+        """Send the action to one device."""
+        async with self._semaphore:
+            try:
+                await self.client.perform_device_action(
+                    outcome.site_id, outcome.device_id, self.action
+                )
+            except Exception as exc:
+                outcome.status, outcome.error = FAILED, error_reason(exc)
+                self.client.logger.warning(
+                    "bulk_action_failed",
+                    device_id=outcome.device_id,
+                    error=outcome.error,
+                )
+                return
+        outcome.status = SUCCEEDED
+
+    async def _await_healthy(self, outcomes: List[DeviceOutcome]) -> None:
+        """Poll device states until all are healthy or the wave times out."""
+        deadline = time.monotonic() + self.wave_timeout
+        await asyncio.sleep(self.settle_time)
+        pending = list(outcomes)
+        while pending:
+            await asyncio.gather(*(self._check(outcome) for outcome in pending))
+            pending = [o for o in pending if o.state not in self.healthy_states]
+            if not pending or time.monotonic() >= deadline:
+                break
+            await asyncio.sleep(min(self.poll_interval, deadline - time.monotonic()))
+        for outcome in pending:
+            outcome.status = TIMED_OUT
+            outcome.error = f"Not healthy after {self.wave_timeout}s: {outcome.state}"
+
+    async def _check(self, outcome: DeviceOutcome) -> None:
+        """Refresh the state of one device, bypassing the response cache."""
+        self.client.invalidate_cache(
+            f"proxy/network/integration/v1/sites/{outcome.site_id}"
+            f"/devices/{outcome.device_id}"
+        )
+        async with self._semaphore:
+            try:
+                details = await self.client.get_device_details(
+                    outcome.site_id, outcome.device_id
+                )
+            except Exception as exc:
+                # A restarting device may briefly be unknown to the controller
+                outcome.state = error_reason(exc)
+                return
+        outcome.state = details.get("state")
+
+    def _report(self, wave: int, size: int, done: int, total: int, failed: int) -> None:
+        """Log and report progress after a wave."""
+        self.client.logger.info(
+            "bulk_wave_complete",
+            wave=wave,
+            wave_size=size,
+            done=done,
+            total=total,
+            failed=failed,
+        )
+        if self.progress is not None:
+            self.progress(BulkProgress(wave, size, done, total, failed))
@@ -0,0 +1,230 @@
+"""TTL and LRU bounded response cache with conditional revalidation."""
+
+import copy
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from typing import Any, Callable, Dict, Mapping, Optional
+
+DEFAULT_TTL = 5.0
+DEFAULT_MAX_ENTRIES = 1024
+
+
+def cache_key(endpoint: str, params: Optional[Mapping[str, Any]] = None) -> str:
+    """Build the cache key for an endpoint and its query parameters.
+
+    Args:
+        endpoint: API endpoint path
+        params: Optional query parameters
+
+    Returns:
+        Cache key
+    """
+    if not params:
+        return endpoint
+    query = "&".join(f"{name}={params[name]}" for name in sorted(params))
+    return f"{endpoint}?{query}"
+
+
+@dataclass
+class CacheEntry:
+    """A cached response body and its validators."""
+
+    data: Dict[str, Any]
+    expires_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating this entry."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+@dataclass
+class CacheStats:
+    """Response cache counters."""
+
+    hits: int = 0
+    misses: int = 0
+    revalidations: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        """Fraction of lookups answered without a full response."""
+        lookups = self.hits + self.misses
+        if not lookups:
+            return 0.0
+        return (self.hits + self.revalidations) / lookups
+
+
+class ResponseCache:
+    """Opt-in response cache for ``UniFiClient`` GET requests.
+
+    Entries expire after a per-endpoint TTL, chosen from the first glob
+    pattern in ``ttls`` that matches the endpoint path, falling back to
+    ``default_ttl``. A TTL of zero disables caching for that endpoint. At
+    most ``max_entries`` responses are kept, evicting the least recently
+    used first. Expired entries that carry an ETag or Last-Modified header
+    are kept so the next request can be revalidated with a conditional GET.
+
+    Every invalidation starts a new ``generation``. A response fetched
+    during an older generation may predate the write that caused the
+    invalidation, so ``store`` drops it.
+
+    Example:
+        cache = ResponseCache(ttls={"*/info": 300, "*/sites": 60})
+        client = UniFiClient(cache=cache)
+    """
+
+    def __init__(
+        self,
+        default_ttl: float = DEFAULT_TTL,
+        ttls: Optional[Mapping[str, float]] = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the cache.
+
+        Args:
+            default_ttl: TTL in seconds for endpoints without a matching rule
+            ttls: Mapping of endpoint glob patterns to TTLs in seconds
+            max_entries: Maximum number of cached responses
+            clock: Monotonic time source
+        """
+        if max_entries < 1:
+            raise ValueError("Cache must hold at least one entry")
+
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls or {})
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._clock = clock
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.generation = 0
+
+    def __len__(self) -> int:
+        """Number of cached responses."""
+        return len(self._entries)
+
+    def ttl_for(self, endpoint: str) -> float:
+        """TTL in seconds for the given endpoint path."""
+        for pattern, ttl in self.ttls.items():
+            if fnmatchcase(endpoint, pattern):
+                return ttl
+        return self.default_ttl
+
+    def lookup(self, key: str) -> Optional[CacheEntry]:
+        """Look up a cached response.
+
+        Fresh entries count as hits. Stale entries count as misses and are
+        returned only if they can be revalidated; otherwise they are dropped.
+
+        Args:
+            key: Cache key from ``cache_key``
+
+        Returns:
+            Cached entry, or None if there is nothing usable
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        if self.is_fresh(entry):
+            self.stats.hits += 1
+            return entry
+
+        self.stats.misses += 1
+        if entry.etag or entry.last_modified:
+            return entry
+        del self._entries[key]
+        return None
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """Whether an entry can be served without contacting the controller."""
+        return self._clock() < entry.expires_at
+
+    def store(
+        self,
+        key: str,
+        endpoint: str,
+        data: Dict[str, Any],
+        headers: Optional[Mapping[str, str]] = None,
+        generation: Optional[int] = None,
+    ) -> None:
+        """Cache a response.
+
+        Args:
+            key: Cache key from ``cache_key``
+            endpoint: API endpoint path, used to pick the TTL
+            data: Response data; a private copy is stored
+            headers: Response headers carrying ETag/Last-Modified
+            generation: ``generation`` when the request was sent; the
+                response is not stored if the cache was invalidated since
+        """
+        ttl = self.ttl_for(endpoint)
+        if ttl <= 0 or generation not in (None, self.generation):
+            return
+
+        headers = headers or {}
+        self._entries[key] = CacheEntry(
+            data=copy.deepcopy(data),
+            expires_at=self._clock() + ttl,
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def revalidated(self, endpoint: str, entry: CacheEntry) -> Dict[str, Any]:
+        """Extend an entry after the controller answered 304 Not Modified.
+
+        Args:
+            endpoint: API endpoint path, used to pick the TTL
+            entry: Entry that was revalidated
+
+        Returns:
+            Copy of the cached response data
+        """
+        self.stats.revalidations += 1
+        entry.expires_at = self._clock() + self.ttl_for(endpoint)
+        return copy.deepcopy(entry.data)
+
+    def invalidate(self, prefix: Optional[str] = None) -> int:
+        """Drop cached responses.
+
+        Args:
+            prefix: Only drop the endpoint at this path and those below it,
+                matched on whole path segments; drop everything if not given
+
+        Returns:
+            Number of entries dropped
+        """
+        self.generation += 1
+        if prefix is None:
+            keys = list(self._entries)
+        else:
+            keys = [key for key in self._entries if _under(key, prefix)]
+        for key in keys:
+            del self._entries[key]
+        self.stats.invalidations += len(keys)
+        return len(keys)
+
+
+def _under(key: str, prefix: str) -> bool:
+    """Whether a cache key is the endpoint ``prefix`` or a path below it."""
+    if not key.startswith(prefix):
+        return False
+    rest = key[len(prefix) :]
+    return not rest or prefix.endswith("/") or rest[0] in "/?"
@@ -0,0 +1,180 @@
+"""Command line entry point.
+
+Only the standard library is imported up front. Commands are sent to a
+running daemon over its Unix socket when there is one; otherwise, or with
+``--no-daemon``, the client stack is imported and the command runs in this
+process.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import stat
+import sys
+
+# Importing typing costs milliseconds on every invocation; annotations are
+# only evaluated by type checkers
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Dict, List, Optional
+
+SOCKET_ENV = "UNIFI_ASSIST_SOCKET"
+
+# Command name, help and positional arguments; mirrors daemon.COMMANDS
+COMMANDS = (
+    ("status", "Device counts by state for every site", ()),
+    ("sites", "List sites", ()),
+    ("info", "Show controller information", ()),
+    ("devices", "List devices in a site", ("site",)),
+    ("clients", "List clients in a site", ("site",)),
+    ("device", "Show device details", ("site", "device")),
+    ("stats", "Show latest device statistics", ("site", "device")),
+)
+
+
+def _private_dir(path: str) -> str:
+    """Create a directory only this user can use, or check an existing one.
+
+    Raises:
+        RuntimeError: If the path is not a directory owned by this user and
+            closed to everyone else, e.g. one planted in a shared temp dir
+    """
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    info = os.lstat(path)
+    if (
+        not stat.S_ISDIR(info.st_mode)
+        or info.st_uid != os.getuid()
+        or stat.S_IMODE(info.st_mode) & 0o077
+    ):
+        raise RuntimeError(f"{path} is not a private directory owned by this user")
+    return path
+
+
+def default_socket_path() -> str:
+    """Daemon socket path, from the environment or the user's runtime dir.
+
+    Without a runtime dir, the socket goes in a private directory under the
+    temp dir rather than at a predictable path in it.
+
+    Raises:
+        RuntimeError: If that directory exists but is not private
+    """
+    configured = os.getenv(SOCKET_ENV)
+    if configured:
+        return configured
+    runtime_dir = os.getenv("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "unifi-assist.sock")
+    import tempfile
+
+    directory = os.path.join(tempfile.gettempdir(), f"unifi-assist-{os.getuid()}")
+    return os.path.join(_private_dir(directory), "unifi-assist.sock")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Argument parser for all commands."""
+    parser = argparse.ArgumentParser(
+        prog="unifi-assist", description="UniFi Network Application Assistant"
+    )
+    parser.add_argument(
+        "--socket",
+        help=f"Daemon socket path (default: ${SOCKET_ENV} or the runtime dir)",
+    )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Run in this process even if a daemon is running",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("daemon", help="Run the daemon in the foreground")
+    commands.add_parser("ping", help="Check whether the daemon is running")
+    commands.add_parser("stop", help="Stop the daemon")
+    for name, help_text, arguments in COMMANDS:
+        command = commands.add_parser(name, help=help_text)
+        for argument in arguments:
+            command.add_argument(argument)
+    return parser
+
+
+def ask_daemon(path: str, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Send a request to the daemon.
+
+    Args:
+        path: Daemon socket path
+        request: ``{"command": name, "args": {...}}``
+
+    Returns:
+        Daemon response, or None if no daemon is listening; an error
+        response if the daemon closed the connection before replying in full
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        try:
+            connection.connect(path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            return None
+        chunks = []
+        try:
+            connection.sendall(json.dumps(request).encode() + b"\n")
+            connection.shutdown(socket.SHUT_WR)
+            while chunk := connection.recv(1 << 16):
+                chunks.append(chunk)
+        except ConnectionError:
+            # The daemon died or dropped the connection mid-request
+            chunks.clear()
+    unavailable = {"ok": False, "error": f"Daemon on {path} closed without a reply"}
+    if not chunks:
+        return unavailable
+    try:
+        response: Dict[str, Any] = json.loads(b"".join(chunks))
+    except ValueError:
+        # Cut off part way through the reply
+        return unavailable
+    return response
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run a command and print its result as JSON.
+
+    Returns:
+        Process exit status
+    """
+    args = build_parser().parse_args(argv)
+    try:
+        path = args.socket or default_socket_path()
+    except RuntimeError as error:
+        print(error, file=sys.stderr)
+        return 1
+    if args.command == "daemon":
+        from .daemon import run_daemon
+
+        return run_daemon(path)
+
+    options = vars(args)
+    request = {
+        "command": args.command,
+        "args": {key: options[key] for key in ("site", "device") if key in options},
+    }
+    response = None if args.no_daemon else ask_daemon(path, request)
+    if response is None:
+        if args.command in ("ping", "stop"):
+            print(f"No daemon listening on {path}", file=sys.stderr)
+            return 1
+        from .daemon import run_once
+
+        response = run_once(request)
+
+    if not response["ok"]:
+        print(response["error"], file=sys.stderr)
+        return 1
+    print(json.dumps(response["result"], indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,55 @@
-from typing import Optional, Any, Dict
+from typing import (
+    Optional,
+    Any,
+    AsyncGenerator,
+    Awaitable,
+    Dict,
+    List,
+    Mapping,
+    Tuple,
+)
+import asyncio
+import copy
 import aiohttp
 import os
-import logging
 from dotenv import load_dotenv
 import structlog
-from .logging import setup_logging
+from .bulk import (
+    DEFAULT_BULK_CONCURRENCY,
+    DEFAULT_WAVE_SIZE,
+    BulkAction,
+    BulkResult,
+    Selector,
+)
+from .cache import CacheEntry, ResponseCache, cache_key
+from .crawl import DEFAULT_CRAWL_CONCURRENCY, DEFAULT_CRAWL_MAX_PENDING, FleetCrawl
+from .decoding import (
+    DataStreamParser,
+    DecodeOffload,
+    JsonLoads,
+    decode_object,
+    default_json_loads,
+)
+from .logging import is_debug_enabled, setup_logging
+from .metrics import (
+    ClientMetrics,
+    RequestTiming,
+    error_reason,
+    timing_trace_config,
+)
+from .session import ConnectionPoolConfig, PoolStats, SharedSession
+from .singleflight import SingleFlight
+from .sync import DEFAULT_SYNC_CONCURRENCY, DeviceSync, SyncResult
+from .traffic import TrafficController
+from .transport import HttpTransport, Transport
 
 # Load environment variables
 load_dotenv()
 
+DEFAULT_PAGE_SIZE = 200
+STREAM_CHUNK_SIZE = 64 * 1024
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
 
 class UniFiClient:
     """Client for interacting with the UniFi Network API."""
@@ -19,6 +60,15 @@ class UniFiClient:
         api_key: Optional[str] = None,
         verify_ssl: bool = True,
         logger: Optional[structlog.BoundLogger] = None,
+        pool: Optional[ConnectionPoolConfig] = None,
+        session: Optional[SharedSession] = None,
+        cache: Optional[ResponseCache] = None,
+        traffic: Optional[TrafficController] = None,
+        json_loads: Optional[JsonLoads] = None,
+        metrics: Optional[ClientMetrics] = None,
+        scheme: str = "https",
+        transport: Optional[Transport] = None,
+        offload: Optional[DecodeOffload] = None,
     ):
         """Initialize the UniFi client.
 
@@ -27,6 +77,22 @@ class UniFiClient:
             api_key: API key for authentication
             verify_ssl: Whether to verify SSL certificates
             logger: Structured logger instance
+            pool: Connection pool settings, ignored when ``session`` is given
+            session: Shared session to borrow instead of creating one; the
+                client will not close it
+            cache: Response cache for GET requests; caching is off if not given
+            traffic: Rate limiting, adaptive concurrency and retry control; requests
+                are sent unshaped if not given
+            json_loads: JSON decoder for response bodies, defaults to the fastest
+                one installed (orjson, msgspec, then the standard library)
+            metrics: Per-endpoint latency, byte and error metrics to record
+                into; requests are not instrumented if not given
+            scheme: URL scheme, "http" only for local test controllers
+            transport: Sends requests; live HTTP if not given. Use
+                ``ReplayTransport`` to answer from captured responses and
+                ``RecordTransport`` to capture while talking to a controller
+            offload: Decodes large response bodies in an executor;
+                everything is decoded on the event loop if not given
         """
         self.host = host or os.getenv("UNIFI_HOST")
         if not self.host:
@@ -41,39 +107,226 @@ class UniFiClient:
             )
 
         self.verify_ssl = verify_ssl
-
-        # Reset logging handlers to ensure we get a fresh logger
-        root_logger = logging.getLogger()
-        for handler in root_logger.handlers[:]:
-            root_logger.removeHandler(handler)
+        self.scheme = scheme
 
         self.logger = logger or setup_logging("unifi_client", log_to_file=True)
+        self._log_requests = is_debug_enabled(self.logger)
         self.logger.debug("initializing_client", host=self.host)
 
-        self.session = aiohttp.ClientSession(
-            headers={"Accept": "application/json", "X-API-KEY": self.api_key}
-        )
+        self._owns_session = session is None
+        self.shared_session = session or SharedSession(pool)
+        self._ssl = self.shared_session.config.ssl_for(verify_ssl)
+        self._headers = {"Accept": "application/json", "X-API-KEY": self.api_key}
+        self.cache = cache
+        self.single_flight = SingleFlight()
+        self.traffic = traffic
+        self.json_loads = json_loads or default_json_loads()
+        self.offload = offload
+        self.metrics = metrics
+        if metrics is not None and not self.shared_session.add_trace_config(
+            timing_trace_config()
+        ):
+            self.logger.warning("connection_phases_not_traced")
+        self.transport = transport or HttpTransport()
+        self.transport.bind(self)
+        self.device_sync = DeviceSync(self)
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """The pooled aiohttp session, created on first use."""
+        return self.shared_session.session
+
+    @property
+    def pool_stats(self) -> PoolStats:
+        """Connection pool usage counters for sizing the pool."""
+        return self.shared_session.stats
 
     async def close(self) -> None:
-        """Close the client session."""
-        await self.session.close()
+        """Close the client session unless it is shared."""
+        if self._owns_session:
+            await self.shared_session.close()
+
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Tuple[int, Dict[str, Any], Mapping[str, str]]:
+        """Send a request to the UniFi API.
+
+        When a traffic controller is configured the request is rate limited,
+        concurrency limited and, for idempotent methods, retried.
+
+        Args:
+            method: HTTP method
+            endpoint: API endpoint path
+            params: Optional query parameters
+            json: Optional request body
+            headers: Extra request headers
+
+        Returns:
+            Response status, data (empty for 304 Not Modified) and headers
+        """
+
+        def send() -> Awaitable[Tuple[int, Dict[str, Any], Mapping[str, str]]]:
+            return self.transport.send(method, endpoint, params, json, headers)
+
+        if self.traffic is None:
+            return await send()
+        return await self.traffic.run(send, idempotent=method in IDEMPOTENT_METHODS)
 
-    async def _get(self, endpoint: str) -> Dict[str, Any]:
+    async def _send(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        json: Optional[Dict[str, Any]],
+        headers: Optional[Dict[str, str]],
+    ) -> Tuple[int, Dict[str, Any], Mapping[str, str]]:
+        """Send a single HTTP request; used by ``HttpTransport``.
+
+        Args:
+            method: HTTP method
+            endpoint: API endpoint path
+            params: Optional query parameters
+            json: Optional request body
+            headers: Extra request headers
+
+        Returns:
+            Response status, data (empty for 304 Not Modified) and headers
+        """
+        url = f"{self.scheme}://{self.host}/{endpoint}"
+        if self._log_requests:
+            # The request body is not logged; it can be large or sensitive
+            self.logger.debug("making_request", method=method, url=url, params=params)
+        timing = RequestTiming() if self.metrics is not None else None
+        error: Optional[str] = None
+        self.pool_stats.request_started()
+        try:
+            async with self.session.request(
+                method,
+                url,
+                params=params,
+                json=json,
+                headers={**self._headers, **(headers or {})},
+                ssl=self._ssl,
+                trace_request_ctx=timing,
+            ) as response:
+                response.raise_for_status()
+                data: Dict[str, Any] = {}
+                if response.status != 304:
+                    data = await self._read_json(response, timing)
+                if self._log_requests:
+                    self.logger.debug(
+                        "request_complete",
+                        method=method,
+                        url=url,
+                        status=response.status,
+                    )
+                return response.status, data, response.headers
+        except BaseException as exc:
+            error = error_reason(exc)
+            raise
+        finally:
+            self.pool_stats.request_finished()
+            if self.metrics is not None and timing is not None:
+                self.metrics.observe(method, endpoint, timing, error)
+
+    async def _read_json(
+        self,
+        response: aiohttp.ClientResponse,
+        timing: Optional[RequestTiming],
+    ) -> Dict[str, Any]:
+        """Read and decode a response body, timing both steps if requested."""
+        body = await response.read()
+        if timing is not None:
+            timing.download = timing.lap()
+            timing.bytes_received = len(body)
+        data = await self.decode(body)
+        if timing is not None:
+            timing.decode = timing.lap()
+        return data
+
+    async def decode(self, body: bytes) -> Dict[str, Any]:
+        """Decode a JSON object response body with the client's decoder.
+
+        Transports that produce raw bodies decode them through this, so
+        large bodies go through the offload like live responses.
+
+        Args:
+            body: Raw response body
+
+        Returns:
+            Decoded response data, used without copying
+        """
+        if self.offload is None:
+            return decode_object(self.json_loads, body)
+        return await self.offload.decode(self.json_loads, body)
+
+    async def _get(
+        self, endpoint: str, params: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         """Make a GET request to the UniFi API.
 
+        When a response cache is configured, fresh cached responses are
+        returned without a request and stale ones are revalidated with a
+        conditional GET where the controller supplied validators. Identical
+        concurrent requests are coalesced into one.
+
+        Args:
+            endpoint: API endpoint path
+            params: Optional query parameters
+
+        Returns:
+            Response data as a dictionary
+        """
+        key = cache_key(endpoint, params)
+        entry = self.cache.lookup(key) if self.cache is not None else None
+        if entry is not None and self.cache is not None:
+            if self.cache.is_fresh(entry):
+                return copy.deepcopy(entry.data)
+
+        # Requests sent before an invalidation are not joined after it
+        generation = self.cache.generation if self.cache is not None else 0
+        return await self.single_flight.do(
+            ("GET", key, generation),
+            lambda: self._fetch(endpoint, params, key, entry, generation),
+        )
+
+    async def _fetch(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        key: str,
+        entry: Optional[CacheEntry],
+        generation: int,
+    ) -> Dict[str, Any]:
+        """Fetch a GET response from the controller and update the cache.
+
         Args:
             endpoint: API endpoint path
+            params: Optional query parameters
+            key: Cache key for the request
+            entry: Stale cache entry to revalidate, if any
+            generation: Cache generation when the request was made
 
         Returns:
             Response data as a dictionary
         """
-        url = f"https://{self.host}/{endpoint}"
-        self.logger.debug("making_get_request", url=url)
-        async with self.session.get(url, ssl=self.verify_ssl) as response:
-            response.raise_for_status()
-            data = await response.json()
-            self.logger.debug("get_request_complete", url=url, status=response.status)
-            return dict(data)
+        status, data, headers = await self._request(
+            "GET",
+            endpoint,
+            params=params,
+            headers=entry.validators() if entry is not None else None,
+        )
+        if self.cache is None:
+            return data
+        if status == 304 and entry is not None:
+            return self.cache.revalidated(endpoint, entry)
+        self.cache.store(key, endpoint, data, headers, generation)
+        return data
 
     async def _post(self, endpoint: str, data: dict) -> Dict[str, Any]:
         """Make a POST request to the UniFi API.
@@ -85,13 +338,24 @@ class UniFiClient:
         Returns:
             Response data as a dictionary
         """
-        url = f"https://{self.host}/{endpoint}"
-        self.logger.debug("making_post_request", url=url, data=data)
-        async with self.session.post(url, json=data, ssl=self.verify_ssl) as response:
-            response.raise_for_status()
-            resp_data = await response.json()
-            self.logger.debug("post_request_complete", url=url, status=response.status)
-            return dict(resp_data)
+        _, resp_data, _ = await self._request("POST", endpoint, json=data)
+        return resp_data
+
+    def invalidate_cache(self, prefix: Optional[str] = None) -> int:
+        """Drop cached responses.
+
+        Args:
+            prefix: Only drop the endpoint at this path and those below it;
+                drop everything if not given
+
+        Returns:
+            Number of cached responses dropped
+        """
+        if self.cache is None:
+            return 0
+        dropped = self.cache.invalidate(prefix)
+        self.logger.debug("cache_invalidated", prefix=prefix, dropped=dropped)
+        return dropped
 
     async def get_sites(self) -> Dict[str, Any]:
         """Get list of all sites.
@@ -155,10 +419,12 @@ class UniFiClient:
         Returns:
             Response from the action
         """
-        return await self._post(
+        response = await self._post(
             f"proxy/network/integration/v1/sites/{site_id}/devices/{device_id}/actions",
             action,
         )
+        self.invalidate_cache(f"proxy/network/integration/v1/sites/{site_id}/devices")
+        return response
 
     async def get_clients(self, site_id: str) -> Dict[str, Any]:
         """Get list of all clients in a site.
@@ -171,6 +437,183 @@ class UniFiClient:
         """
         return await self._get(f"proxy/network/integration/v1/sites/{site_id}/clients")
 
+    async def _iter_pages(
+        self, endpoint: str, page_size: int, stream: bool = False
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Iterate over the items of a paginated list endpoint.
+
+        The next page is requested while the current one is being consumed,
+        so at most two pages are held in memory at a time. Responses without
+        pagination metadata are treated as a single page.
+
+        When streaming, each page is parsed while it downloads instead, see
+        ``_stream_page``. Pages are then requested one after another, as
+        the pagination fields of a page are only known once it has been
+        read. Controllers that ignore ``offset``/``limit`` answer with one
+        page holding every item, which is still parsed incrementally.
+
+        Args:
+            endpoint: API endpoint path
+            page_size: Number of items to request per page
+            stream: Parse each page as it downloads
+
+        Yields:
+            Items from the response ``data`` lists
+        """
+        if page_size < 1:
+            raise ValueError("Page size must be at least 1")
+
+        offset = 0
+        while stream:
+            page: Dict[str, Any] = {}
+            count = 0
+            params = {"offset": offset, "limit": page_size}
+            async for batch in self._stream_page(endpoint, params, page):
+                count += len(batch)
+                for item in batch:
+                    yield item
+            offset += count
+            if not _has_more_pages(page, offset, count, page_size):
+                return
+
+        pending: Optional[asyncio.Task[Dict[str, Any]]] = asyncio.create_task(
+            self._get(endpoint, params={"offset": offset, "limit": page_size})
+        )
+        try:
+            while pending is not None:
+                page = await pending
+                pending = None
+                items = page.get("data", [])
+                offset += len(items)
+                if _has_more_pages(page, offset, len(items), page_size):
+                    pending = asyncio.create_task(
+                        self._get(
+                            endpoint, params={"offset": offset, "limit": page_size}
+                        )
+                    )
+                del page
+                for item in items:
+                    yield item
+        finally:
+            if pending is not None:
+                pending.cancel()
+                await asyncio.gather(pending, return_exceptions=True)
+
+    async def _stream_page(
+        self, endpoint: str, params: Dict[str, Any], fields: Dict[str, Any]
+    ) -> AsyncGenerator[List[Dict[str, Any]], None]:
+        """Yield the ``data`` items of a GET response while it downloads.
+
+        The body is read from ``response.content`` in chunks and fed to a
+        ``DataStreamParser``, so decoding overlaps with the download and
+        memory is bounded by a chunk and one item rather than the whole
+        body. The response cache, request coalescing and the offload are
+        bypassed. With a traffic controller, opening the response is rate
+        limited and retried; a failure while reading the body is not
+        retried, since items have already been yielded. Transports other
+        than live HTTP answer from a whole response instead.
+
+        Args:
+            endpoint: API endpoint path
+            params: Query parameters
+            fields: Filled with the response fields other than ``data``
+
+        Yields:
+            Items of the response ``data`` list decoded from each chunk
+        """
+        if not isinstance(self.transport, HttpTransport):
+            data = await self._get(endpoint, params)
+            fields.update((k, v) for k, v in data.items() if k != "data")
+            yield data.get("data", [])
+            return
+
+        url = f"{self.scheme}://{self.host}/{endpoint}"
+        if self._log_requests:
+            self.logger.debug("streaming_request", url=url, params=params)
+        timing = RequestTiming() if self.metrics is not None else None
+
+        async def open_response() -> aiohttp.ClientResponse:
+            response = await self.session.get(
+                url,
+                params=params,
+                headers=self._headers,
+                ssl=self._ssl,
+                trace_request_ctx=timing,
+            )
+            try:
+                response.raise_for_status()
+            except aiohttp.ClientResponseError:
+                response.release()
+                raise
+            return response
+
+        error: Optional[str] = None
+        self.pool_stats.request_started()
+        try:
+            if self.traffic is None:
+                response = await open_response()
+            else:
+                response = await self.traffic.run(open_response, idempotent=True)
+            async with response:
+                parser = DataStreamParser()
+                async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                    if timing is not None:
+                        timing.bytes_received += len(chunk)
+                    items = parser.feed(chunk)
+                    if items:
+                        yield items
+                parser.close()
+                fields.update(parser.fields)
+            if timing is not None:
+                # Decoding overlaps with the download and is counted in it
+                timing.download = timing.lap()
+        except GeneratorExit:
+            # The caller stopped iterating early
+            raise
+        except BaseException as exc:
+            error = error_reason(exc)
+            raise
+        finally:
+            self.pool_stats.request_finished()
+            if self.metrics is not None and timing is not None:
+                self.metrics.observe("GET", endpoint, timing, error)
+
+    def iter_devices(
+        self, site_id: str, page_size: int = DEFAULT_PAGE_SIZE, stream: bool = False
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Iterate over all devices in a site, one page at a time.
+
+        Args:
+            site_id: Site identifier
+            page_size: Number of devices to request per page
+            stream: Parse each page while it downloads and yield devices as
+                they are decoded, instead of buffering whole pages
+
+        Returns:
+            Async generator yielding devices
+        """
+        return self._iter_pages(
+            f"proxy/network/integration/v1/sites/{site_id}/devices", page_size, stream
+        )
+
+    def iter_clients(
+        self, site_id: str, page_size: int = DEFAULT_PAGE_SIZE, stream: bool = False
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Iterate over all clients in a site, one page at a time.
+
+        Args:
+            site_id: Site identifier
+            page_size: Number of clients to request per page
+            stream: Parse each page while it downloads and yield clients as
+                they are decoded, instead of buffering whole pages
+
+        Returns:
+            Async generator yielding clients
+        """
+        return self._iter_pages(
+            f"proxy/network/integration/v1/sites/{site_id}/clients", page_size, stream
+        )
+
     async def get_system_info(self) -> Dict[str, Any]:
         """Get system information.
 
@@ -179,6 +622,90 @@ class UniFiClient:
         """
         return await self._get("proxy/network/integration/v1/info")
 
+    def crawl_inventory(
+        self,
+        concurrency: int = DEFAULT_CRAWL_CONCURRENCY,
+        include_clients: bool = True,
+        include_details: bool = True,
+        include_statistics: bool = True,
+        max_pending: int = DEFAULT_CRAWL_MAX_PENDING,
+    ) -> FleetCrawl:
+        """Crawl all sites and devices with bounded concurrency.
+
+        Args:
+            concurrency: Maximum number of requests in flight
+            include_clients: Whether to fetch per-site client lists
+            include_details: Whether to fetch per-device details
+            include_statistics: Whether to fetch per-device statistics
+            max_pending: Records buffered for a slow consumer
+
+        Returns:
+            Async iterable yielding crawl records as they complete
+        """
+        return FleetCrawl(
+            self,
+            concurrency=concurrency,
+            include_clients=include_clients,
+            include_details=include_details,
+            include_statistics=include_statistics,
+            max_pending=max_pending,
+        )
+
+    async def sync_devices(
+        self,
+        concurrency: int = DEFAULT_SYNC_CONCURRENCY,
+        include_statistics: bool = True,
+    ) -> SyncResult:
+        """Fetch details only for devices that changed since the last sync.
+
+        The client remembers a fingerprint of every device summary, so the
+        first call fetches every device and later calls cost one device
+        listing per site plus one fetch per added or modified device.
+
+        Args:
+            concurrency: Maximum detail and statistics requests in flight
+            include_statistics: Whether to fetch statistics for changed devices
+
+        Returns:
+            Added, modified and removed devices
+        """
+        return await self.device_sync.run(concurrency, include_statistics)
+
+    async def bulk_device_action(
+        self,
+        action: Dict[str, Any],
+        targets: Selector,
+        wave_size: int = DEFAULT_WAVE_SIZE,
+        concurrency: int = DEFAULT_BULK_CONCURRENCY,
+        wait_healthy: bool = True,
+        max_failures: Optional[int] = None,
+    ) -> BulkResult:
+        """Perform an action on many devices in rolling waves.
+
+        See ``BulkAction`` for wave sizing, health checks and further options.
+
+        Args:
+            action: Action body, e.g. ``{"action": "RESTART"}``
+            targets: (site_id, device_id) pairs, or a predicate selecting
+                devices from every site's device list
+            wave_size: Largest number of devices acted on per wave
+            concurrency: Maximum requests in flight
+            wait_healthy: Whether to wait for each wave to be healthy again
+            max_failures: Abort once more devices than this failed
+
+        Returns:
+            Per-device outcomes and wave counts
+        """
+        return await BulkAction(
+            self,
+            action,
+            targets,
+            wave_size=wave_size,
+            concurrency=concurrency,
+            wait_healthy=wait_healthy,
+            max_failures=max_failures,
+        ).run()
+
     async def __aenter__(self) -> "UniFiClient":
         """Async context manager entry."""
         self.logger.debug("entering_async_context")
@@ -193,3 +720,27 @@ class UniFiClient:
         """Async context manager exit."""
         self.logger.debug("exiting_async_context")
         await self.close()
+
+
+def _has_more_pages(
+    page: Dict[str, Any], offset: int, count: int, page_size: int
+) -> bool:
+    """Whether another page should be requested after the given one.
+
+    Args:
+        page: Response for the current page
+        offset: Number of items received so far
+        count: Number of items in the current page
+        page_size: Requested page size
+
+    Returns:
+        True if more items are available
+    """
+    if count == 0:
+        return False
+    if "totalCount" in page:
+        return offset < int(page["totalCount"])
+    if "offset" in page:
+        return count >= page_size
+    # Plain {"data": [...]} responses are not paginated
+    return False
@@ -0,0 +1,313 @@
+"""Concurrent fleet crawl across sites and devices."""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+)
+
+if TYPE_CHECKING:
+    from .client import UniFiClient
+
+DEFAULT_CRAWL_CONCURRENCY = 16
+DEFAULT_CRAWL_MAX_PENDING = 1024
+
+
+@dataclass
+class CrawlRecord:
+    """A single response produced by a fleet crawl.
+
+    Attributes:
+        kind: Response kind (sites, info, devices, clients, device_details,
+            device_statistics)
+        phase: Crawl phase the request belonged to
+        data: Response data, empty if the request failed
+        site_id: Site the response belongs to, if any
+        device_id: Device the response belongs to, if any
+        elapsed: Request duration in seconds
+        error: Exception raised by the request, if it failed
+    """
+
+    kind: str
+    phase: str
+    data: Dict[str, Any]
+    site_id: Optional[str] = None
+    device_id: Optional[str] = None
+    elapsed: float = 0.0
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the request succeeded."""
+        return self.error is None
+
+
+@dataclass
+class PhaseTiming:
+    """Timing and request counters for one crawl phase."""
+
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    requests: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0
+
+    @property
+    def duration(self) -> float:
+        """Wall-clock time between the first request start and last finish."""
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+    def record(self, start: float, end: float, failed: bool) -> None:
+        """Account for one finished request."""
+        self.started = start if self.started is None else min(self.started, start)
+        self.finished = end if self.finished is None else max(self.finished, end)
+        self.requests += 1
+        self.errors += int(failed)
+        self.busy_seconds += end - start
+
+
+@dataclass
+class CrawlStats:
+    """Per-phase timing for a fleet crawl."""
+
+    phases: Dict[str, PhaseTiming] = field(default_factory=dict)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+
+    @property
+    def duration(self) -> float:
+        """Total crawl wall-clock time in seconds."""
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+    @property
+    def requests(self) -> int:
+        """Total number of requests issued."""
+        return sum(phase.requests for phase in self.phases.values())
+
+    @property
+    def errors(self) -> int:
+        """Total number of failed requests."""
+        return sum(phase.errors for phase in self.phases.values())
+
+    def record(self, phase: str, start: float, end: float, failed: bool) -> None:
+        """Account for one finished request in the given phase."""
+        self.phases.setdefault(phase, PhaseTiming()).record(start, end, failed)
+
+    def summary(self) -> Dict[str, Any]:
+        """Summarize the crawl as a plain dictionary suitable for logging."""
+        return {
+            "duration": round(self.duration, 3),
+            "requests": self.requests,
+            "errors": self.errors,
+            "phases": {
+                name: {
+                    "duration": round(phase.duration, 3),
+                    "requests": phase.requests,
+                    "errors": phase.errors,
+                    "busy_seconds": round(phase.busy_seconds, 3),
+                }
+                for name, phase in self.phases.items()
+            },
+        }
+
+
+class FleetCrawl:
+    """Async iterable that crawls a controller with bounded concurrency.
+
+    Sites, per-site device and client lists, and per-device details and
+    statistics are fetched concurrently, with at most ``concurrency``
+    requests in flight. Records are yielded as soon as each request
+    finishes, and ``stats`` holds per-phase timing once iteration completes.
+    At most ``max_pending`` records wait for the consumer; when it falls
+    behind, the crawl pauses instead of buffering the fleet in memory. A
+    crawl can be iterated once.
+
+    Example:
+        crawl = client.crawl_inventory(concurrency=32)
+        async for record in crawl:
+            ...
+        print(crawl.stats.summary())
+    """
+
+    def __init__(
+        self,
+        client: "UniFiClient",
+        concurrency: int = DEFAULT_CRAWL_CONCURRENCY,
+        include_clients: bool = True,
+        include_details: bool = True,
+        include_statistics: bool = True,
+        max_pending: int = DEFAULT_CRAWL_MAX_PENDING,
+    ):
+        """Initialize the crawl.
+
+        Args:
+            client: Client to crawl with
+            concurrency: Maximum number of requests in flight
+            include_clients: Whether to fetch per-site client lists
+            include_details: Whether to fetch per-device details
+            include_statistics: Whether to fetch per-device statistics
+            max_pending: Records buffered for a slow consumer
+        """
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1")
+        if max_pending < 1:
+            raise ValueError("Max pending must be at least 1")
+
+        self.client = client
+        self.concurrency = concurrency
+        self.include_clients = include_clients
+        self.include_details = include_details
+        self.include_statistics = include_statistics
+        self.stats = CrawlStats()
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._queue: asyncio.Queue[Optional[CrawlRecord]] = asyncio.Queue(max_pending)
+        self._iterated = False
+
+    async def __aiter__(self) -> AsyncGenerator[CrawlRecord, None]:
+        """Run the crawl, yielding records as requests complete.
+
+        Raises:
+            RuntimeError: If the crawl was already iterated
+        """
+        if self._iterated:
+            raise RuntimeError("A fleet crawl can only be iterated once")
+        self._iterated = True
+        self.stats.started = time.perf_counter()
+        runner = asyncio.create_task(self._run())
+        try:
+            while True:
+                record = await self._queue.get()
+                if record is None:
+                    break
+                yield record
+            await runner
+        finally:
+            if not runner.done():
+                runner.cancel()
+                await asyncio.gather(runner, return_exceptions=True)
+            self.stats.finished = time.perf_counter()
+            self.client.logger.info("crawl_complete", **self.stats.summary())
+
+    async def _run(self) -> None:
+        """Fan out over all sites and signal completion."""
+        try:
+            sites = await self._fetch("sites", "sites", self.client.get_sites)
+            await self._fetch("sites", "info", self.client.get_system_info)
+            await asyncio.gather(
+                *(
+                    self._crawl_site(site["id"])
+                    for site in sites.data.get("data", [])
+                    if site.get("id")
+                )
+            )
+        finally:
+            # When cancelled the consumer has stopped and the queue may be full
+            task = asyncio.current_task()
+            if task is None or not task.cancelling():
+                await self._queue.put(None)
+
+    async def _crawl_site(self, site_id: str) -> None:
+        """Fetch a site's device and client lists and fan out over devices."""
+        fetches: List[Awaitable[Any]] = [
+            self._fetch(
+                "site_inventory",
+                "devices",
+                lambda: self.client.get_devices(site_id),
+                site_id,
+            )
+        ]
+        if self.include_clients:
+            fetches.append(
+                self._fetch(
+                    "site_inventory",
+                    "clients",
+                    lambda: self.client.get_clients(site_id),
+                    site_id,
+                )
+            )
+        devices, *_ = await asyncio.gather(*fetches)
+        await asyncio.gather(
+            *(
+                self._crawl_device(site_id, device["id"])
+                for device in devices.data.get("data", [])
+                if device.get("id")
+            )
+        )
+
+    async def _crawl_device(self, site_id: str, device_id: str) -> None:
+        """Fetch details and statistics for a single device."""
+        fetches: List[Awaitable[Any]] = []
+        if self.include_details:
+            fetches.append(
+                self._fetch(
+                    "device_details",
+                    "device_details",
+                    lambda: self.client.get_device_details(site_id, device_id),
+                    site_id,
+                    device_id,
+                )
+            )
+        if self.include_statistics:
+            fetches.append(
+                self._fetch(
+                    "device_details",
+                    "device_statistics",
+                    lambda: self.client.get_device_statistics(site_id, device_id),
+                    site_id,
+                    device_id,
+                )
+            )
+        await asyncio.gather(*fetches)
+
+    async def _fetch(
+        self,
+        phase: str,
+        kind: str,
+        request: Callable[[], Awaitable[Dict[str, Any]]],
+        site_id: Optional[str] = None,
+        device_id: Optional[str] = None,
+    ) -> CrawlRecord:
+        """Run one request under the concurrency limit and publish its record."""
+        data: Dict[str, Any] = {}
+        error: Optional[BaseException] = None
+        async with self._semaphore:
+            start = time.perf_counter()
+            try:
+                data = await request()
+            except Exception as exc:
+                error = exc
+                self.client.logger.warning(
+                    "crawl_request_failed",
+                    kind=kind,
+                    site_id=site_id,
+                    device_id=device_id,
+                    error=str(exc),
+                )
+            end = time.perf_counter()
+
+            self.stats.record(phase, start, end, error is not None)
+            record = CrawlRecord(
+                kind=kind,
+                phase=phase,
+                data=data,
+                site_id=site_id,
+                device_id=device_id,
+                elapsed=end - start,
+                error=error,
+            )
+            # Hold the slot until the record is queued, so a slow consumer
+            # stops new requests instead of piling up finished ones
+            await self._queue.put(record)
+        return record
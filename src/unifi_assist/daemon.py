@@ -0,0 +1,226 @@
+"""Long-running daemon serving CLI commands from a warm client."""
+
+import asyncio
+import json
+import os
+import signal
+import socket
+import stat
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+import aiohttp
+import structlog
+
+from .cache import ResponseCache
+from .client import UniFiClient
+from .logging import setup_logging
+
+Command = Callable[..., Awaitable[Any]]
+
+
+async def _status(client: UniFiClient) -> Dict[str, Any]:
+    """Device counts by state for every site."""
+    sites = (await client.get_sites()).get("data", [])
+    status: Dict[str, Any] = {}
+    for site in sites:
+        states: Counter[str] = Counter()
+        async for device in client.iter_devices(site["id"]):
+            states[device.get("state", "UNKNOWN")] += 1
+        status[site["id"]] = {"devices": sum(states.values()), "states": states}
+    return status
+
+
+COMMANDS: Dict[str, Command] = {
+    "sites": lambda client: client.get_sites(),
+    "info": lambda client: client.get_system_info(),
+    "devices": lambda client, site: client.get_devices(site),
+    "clients": lambda client, site: client.get_clients(site),
+    "device": lambda client, site, device: client.get_device_details(site, device),
+    "stats": lambda client, site, device: client.get_device_statistics(site, device),
+    "status": _status,
+}
+
+
+def build_client() -> UniFiClient:
+    """Client configured from the environment, as the CLI uses it.
+
+    Besides ``UNIFI_HOST`` and ``UNIFI_API_KEY``, ``UNIFI_VERIFY_SSL=0``
+    accepts self-signed controller certificates and ``UNIFI_SCHEME`` selects
+    plain HTTP for local test controllers. Logs go to the console at
+    WARNING unless ``UNIFI_ASSIST_LOG_LEVEL`` says otherwise.
+    """
+    setup_logging(
+        "unifi_assist", log_level=os.getenv("UNIFI_ASSIST_LOG_LEVEL") or "WARNING"
+    )
+    return UniFiClient(
+        verify_ssl=os.getenv("UNIFI_VERIFY_SSL", "1") != "0",
+        scheme=os.getenv("UNIFI_SCHEME", "https"),
+        logger=structlog.get_logger("unifi_assist"),
+        cache=ResponseCache(),
+    )
+
+
+async def run_command(client: UniFiClient, request: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one CLI request against a client.
+
+    Args:
+        client: Client to run the command with
+        request: ``{"command": name, "args": {...}}``
+
+    Returns:
+        ``{"ok": True, "result": ...}`` or ``{"ok": False, "error": message}``
+    """
+    command = COMMANDS.get(request.get("command", ""))
+    if command is None:
+        return {"ok": False, "error": f"Unknown command: {request.get('command')}"}
+    try:
+        result = await command(client, **request.get("args", {}))
+    except aiohttp.ClientResponseError as exc:
+        return {"ok": False, "error": f"HTTP {exc.status}: {exc.message}"}
+    except Exception as exc:
+        return {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+    return {"ok": True, "result": result}
+
+
+def run_once(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one CLI request in this process, without a daemon."""
+
+    async def run() -> Dict[str, Any]:
+        async with build_client() as client:
+            return await run_command(client, request)
+
+    return asyncio.run(run())
+
+
+class Daemon:
+    """Serves CLI requests over a Unix socket from one warm client.
+
+    The client's connection pool, TLS sessions and response cache outlive
+    individual commands, so a CLI invocation costs a local socket round
+    trip plus whatever requests its command actually needs. Each connection
+    carries one JSON request line and receives one JSON response line. The
+    socket is only accessible to its owner.
+
+    Example:
+        async with build_client() as client:
+            await Daemon(client, "/run/user/1000/unifi-assist.sock").serve()
+    """
+
+    def __init__(self, client: UniFiClient, path: Union[str, Path]):
+        """Initialize the daemon.
+
+        Args:
+            client: Warm client to run commands with
+            path: Unix socket path to listen on
+        """
+        self.client = client
+        self.path = Path(path)
+        self.started = time.monotonic()
+        self.served = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._stopped = asyncio.Event()
+
+    async def start(self) -> None:
+        """Listen on the socket, replacing a stale one left by a dead daemon.
+
+        Raises:
+            RuntimeError: If a daemon is already listening, or the path
+                exists and is not a socket
+        """
+        if self.path.exists():
+            if not stat.S_ISSOCK(self.path.stat().st_mode):
+                raise RuntimeError(f"{self.path} exists and is not a socket")
+            try:
+                _, writer = await asyncio.open_unix_connection(self.path)
+            except OSError:
+                self.path.unlink()
+            else:
+                writer.close()
+                raise RuntimeError(f"A daemon is already listening on {self.path}")
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Bind under a umask that leaves the socket to its owner from the start
+        umask = os.umask(0o177)
+        try:
+            listener.bind(str(self.path))
+        except OSError:
+            listener.close()
+            raise
+        finally:
+            os.umask(umask)
+        self._server = await asyncio.start_unix_server(self._handle, sock=listener)
+        self.client.logger.info("daemon_started", socket=str(self.path))
+
+    async def serve(self) -> None:
+        """Serve requests until ``stop`` is called or a shutdown is requested."""
+        await self.start()
+        try:
+            await self._stopped.wait()
+        finally:
+            await self.close()
+
+    def stop(self) -> None:
+        """Ask ``serve`` to return."""
+        self._stopped.set()
+
+    async def close(self) -> None:
+        """Stop listening and remove the socket."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+            self.path.unlink(missing_ok=True)
+            self.client.logger.info("daemon_stopped", served=self.served)
+
+    async def execute(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a request, handling the daemon's own commands."""
+        command = request.get("command")
+        if command == "ping":
+            uptime = time.monotonic() - self.started
+            return {
+                "ok": True,
+                "result": {"pid": os.getpid(), "uptime": uptime, "served": self.served},
+            }
+        if command == "stop":
+            self.stop()
+            return {"ok": True, "result": "stopping"}
+        return await run_command(self.client, request)
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Answer the single request sent over a connection."""
+        try:
+            line = await reader.readline()
+            try:
+                response = await self.execute(json.loads(line))
+            except json.JSONDecodeError as exc:
+                response = {"ok": False, "error": f"Invalid request: {exc}"}
+            except Exception as exc:
+                # Always answer, so the CLI is not left with an empty reply
+                self.client.logger.warning("daemon_request_failed", error=repr(exc))
+                response = {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+            self.served += 1
+            writer.write(json.dumps(response).encode() + b"\n")
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def run_daemon(path: Union[str, Path]) -> int:
+    """Run a daemon in the foreground until SIGINT, SIGTERM or ``stop``."""
+
+    async def run() -> None:
+        async with build_client() as client:
+            daemon = Daemon(client, path)
+            loop = asyncio.get_running_loop()
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                loop.add_signal_handler(signum, daemon.stop)
+            await daemon.serve()
+
+    asyncio.run(run())
+    return 0
@@ -0,0 +1,405 @@
+"""Pluggable JSON decoding for API responses."""
+
+import asyncio
+import codecs
+import importlib
+import json
+import re
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union, cast
+
+from .endpoints import template_for
+
+JsonLoads = Callable[[Union[str, bytes]], Any]
+Analyzer = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+# Bodies at least this large are decoded off the event loop
+DEFAULT_OFFLOAD_THRESHOLD = 256 * 1024
+
+# Field of list responses holding the records
+DATA_FIELD = "data"
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# Optional fast decoders, in order of preference
+FAST_DECODERS = (("orjson", "loads"), ("msgspec.json", "decode"))
+
+
+def stdlib_loads(body: Union[str, bytes]) -> Any:
+    """Decode JSON with the standard library decoder."""
+    if isinstance(body, bytes):
+        # Faster than letting json sniff the encoding and decode with surrogatepass
+        body = body.decode("utf-8")
+    return json.loads(body)
+
+
+def default_json_loads() -> JsonLoads:
+    """Pick the fastest available JSON decoder.
+
+    orjson is preferred, then msgspec, falling back to the standard library.
+    The fast decoders parse raw response bytes without building an
+    intermediate ``str``.
+
+    Returns:
+        Function decoding JSON bytes or text
+    """
+    for module_name, attribute in FAST_DECODERS:
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError:
+            continue
+        return cast(JsonLoads, getattr(module, attribute))
+    return stdlib_loads
+
+
+def decode_object(loads: JsonLoads, body: bytes) -> Dict[str, Any]:
+    """Decode a JSON object response body.
+
+    Args:
+        loads: JSON decoder
+        body: Raw response body
+
+    Returns:
+        Decoded response data
+    """
+    data = loads(body)
+    if not isinstance(data, dict):
+        raise ValueError(f"Expected a JSON object, got {type(data).__name__}")
+    return data
+
+
+def run_analyzers(
+    data: Dict[str, Any], analyzers: Sequence[Analyzer]
+) -> Dict[str, Any]:
+    """Pass decoded response data through analyzers in order."""
+    for analyzer in analyzers:
+        data = analyzer(data)
+    return data
+
+
+def _skip_whitespace(text: str, position: int) -> int:
+    """Position of the first non-whitespace character from a position on."""
+    match = _WHITESPACE.match(text, position)
+    assert match is not None  # The pattern matches the empty string
+    return match.end()
+
+
+class DataStreamParser:
+    """Parses the ``data`` array of a JSON object response as it arrives.
+
+    Chunks of the body are fed in as they are received and each complete
+    record of the array is returned as soon as its closing bracket has
+    been seen, so only the record being parsed and the unparsed tail of
+    the last chunk are held. The other fields of the object, such as
+    ``totalCount``, are collected into ``fields``.
+
+    Records are decoded with the standard library's ``raw_decode``. Input
+    that cannot be decoded is retained until more arrives, so malformed
+    bodies are reported by ``close()``.
+
+    Example:
+        parser = DataStreamParser()
+        async for chunk in response.content.iter_any():
+            for record in parser.feed(chunk):
+                handle(record)
+        parser.close()
+    """
+
+    # Parser states: what is expected next
+    _OBJECT = "object"
+    _KEY = "key"
+    _COLON = "colon"
+    _VALUE = "value"
+    _FIELD_END = "field_end"
+    _ITEM = "item"
+    _ITEM_END = "item_end"
+    _DONE = "done"
+
+    def __init__(self, field: str = DATA_FIELD):
+        """Initialize the parser.
+
+        Args:
+            field: Name of the array field to stream
+        """
+        self.field = field
+        self.fields: Dict[str, Any] = {}
+        self.records = 0
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._state = self._OBJECT
+        self._key = ""
+        self._first = True
+
+    @property
+    def done(self) -> bool:
+        """Whether the whole object has been parsed."""
+        return self._state == self._DONE
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """Parse a chunk of the body.
+
+        Args:
+            chunk: Next bytes of the body
+
+        Returns:
+            Records of the array completed by this chunk
+
+        Raises:
+            ValueError: If the body is not a JSON object
+        """
+        self._buffer += self._utf8.decode(chunk)
+        records: List[Any] = []
+        position = self._parse(records)
+        self._buffer = self._buffer[position:]
+        self.records += len(records)
+        return records
+
+    def close(self) -> None:
+        """Check that the body was a complete JSON object.
+
+        Raises:
+            ValueError: If the body ended early or was malformed
+        """
+        self._buffer += self._utf8.decode(b"", final=True)
+        position = _skip_whitespace(self._buffer, self._parse([]))
+        if not self.done or position < len(self._buffer):
+            raise ValueError(
+                f"Malformed or truncated JSON object after {self.records} records"
+            )
+
+    def _parse(self, records: List[Any]) -> int:
+        """Consume as much of the buffer as possible.
+
+        Returns:
+            Position of the first unconsumed character
+        """
+        buffer, end = self._buffer, len(self._buffer)
+        position = 0
+        while True:
+            position = _skip_whitespace(buffer, position)
+            if position == end or self._state == self._DONE:
+                return position
+            char = buffer[position]
+            state = self._state
+            if state == self._OBJECT:
+                if char != "{":
+                    raise ValueError("Expected a JSON object")
+                position += 1
+                self._state = self._KEY
+            elif state == self._KEY:
+                if char == "}" and self._first:
+                    position += 1
+                    self._state = self._DONE
+                    continue
+                decoded = self._decode(position, ":")
+                if decoded is None:
+                    return position
+                self._key, position = decoded
+                if not isinstance(self._key, str):
+                    raise ValueError("Expected a string key in JSON object")
+                self._first = False
+                self._state = self._COLON
+            elif state == self._COLON:
+                if char != ":":
+                    raise ValueError("Expected ':' in JSON object")
+                position += 1
+                self._state = self._VALUE
+            elif state == self._VALUE:
+                if self._key == self.field and char == "[":
+                    position += 1
+                    self._first = True
+                    self._state = self._ITEM
+                    continue
+                decoded = self._decode(position, ",}")
+                if decoded is None:
+                    return position
+                self.fields[self._key], position = decoded
+                self._state = self._FIELD_END
+            elif state == self._FIELD_END:
+                position += 1
+                if char == ",":
+                    self._state = self._KEY
+                elif char == "}":
+                    self._state = self._DONE
+                else:
+                    raise ValueError("Expected ',' or '}' in JSON object")
+            elif state == self._ITEM:
+                if char == "]" and self._first:
+                    position += 1
+                    self._state = self._FIELD_END
+                    continue
+                position, complete = self._items(position, records)
+                if not complete:
+                    return position
+            else:
+                position += 1
+                if char == ",":
+                    self._state = self._ITEM
+                elif char == "]":
+                    self._state = self._FIELD_END
+                else:
+                    raise ValueError("Expected ',' or ']' in JSON array")
+
+    def _items(self, position: int, records: List[Any]) -> Tuple[int, bool]:
+        """Decode consecutive records of the array; the hot path of parsing.
+
+        Returns:
+            Position after the last record consumed, and False if parsing
+            has to wait for more input
+        """
+        buffer, end = self._buffer, len(self._buffer)
+        # raw_decode without its wrapper; it fails with StopIteration
+        scan_once = self._decoder.scan_once  # type: ignore[attr-defined]
+        append = records.append
+        while True:
+            try:
+                record, stop = scan_once(buffer, position)
+            except (StopIteration, json.JSONDecodeError):
+                return position, False
+            # Only a delimiter ends a record: "1." may continue as "1.5"
+            if stop < end and buffer[stop] in " \t\n\r":
+                stop = _skip_whitespace(buffer, stop)
+            if stop == end or buffer[stop] not in ",]":
+                return position, False
+            append(record)
+            self._first = False
+            if buffer[stop] == "]":
+                self._state = self._ITEM_END
+                return stop, True
+            position = stop + 1
+            if position < end and buffer[position] in " \t\n\r":
+                position = _skip_whitespace(buffer, position)
+            if position == end:
+                return position, False
+
+    def _decode(self, position: int, delimiters: str) -> Optional[Tuple[Any, int]]:
+        """Decode the value at a position, or None if it is not complete yet.
+
+        A value is only complete once one of ``delimiters`` follows it: a
+        number such as ``1.`` or ``2e`` at the end of a chunk may continue
+        in the next one.
+        """
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, position)
+        except json.JSONDecodeError:
+            return None
+        following = _skip_whitespace(self._buffer, end)
+        if following == len(self._buffer) or self._buffer[following] not in delimiters:
+            return None
+        return value, end
+
+
+class DecodeOffload:
+    """Decodes large response bodies and runs analyzers in an executor.
+
+    Decoding a response of many megabytes blocks the event loop, stalling
+    every other request in flight. Bodies of at least ``threshold`` bytes
+    are decoded in the executor instead, and the result is handed back to
+    the awaiting coroutine. Smaller bodies are cheaper to handle inline.
+    Responses are decoded as sent, so the response cache, pagination and
+    coalesced requests always see the controller's data. Analyzers
+    registered for an endpoint are only run by ``analyze``, on a response
+    the caller already has.
+
+    The default executor is a thread pool. It keeps the loop responsive
+    when analyzers are Python code, but decoders hold the GIL while they
+    run. A ``ProcessPoolExecutor`` decodes in parallel at the cost of
+    pickling the result back, and needs a picklable decoder and
+    module-level analyzers.
+
+    Example:
+        offload = DecodeOffload()
+        offload.register(endpoints.CLIENTS, index_by_mac)
+        client = UniFiClient(offload=offload)
+        by_mac = await offload.analyze(
+            endpoints.CLIENTS, await client.get_clients(site_id)
+        )
+    """
+
+    def __init__(
+        self,
+        threshold: int = DEFAULT_OFFLOAD_THRESHOLD,
+        executor: Optional[Executor] = None,
+        max_workers: Optional[int] = None,
+    ):
+        """Initialize the offload.
+
+        Args:
+            threshold: Smallest body size in bytes to decode in the executor
+            executor: Executor to run in; the offload does not shut it down.
+                A thread pool is created on first use if not given
+            max_workers: Size of the created thread pool
+        """
+        self.threshold = threshold
+        self.max_workers = max_workers
+        self.offloaded = 0
+        self.inline = 0
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._analyzers: Dict[str, List[Analyzer]] = {}
+
+    @property
+    def executor(self) -> Executor:
+        """The executor, created on first access if not given."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                self.max_workers, thread_name_prefix="unifi-decode"
+            )
+        return self._executor
+
+    def register(self, template: str, analyzer: Analyzer) -> None:
+        """Run an analyzer on the responses of an endpoint passed to ``analyze``.
+
+        Args:
+            template: Endpoint template, e.g. ``endpoints.CLIENTS``
+            analyzer: Takes the decoded response and returns the data to
+                hand to the caller. The response may be shared with the
+                response cache, so it must not be modified.
+        """
+        self._analyzers.setdefault(template, []).append(analyzer)
+
+    def analyzers_for(self, endpoint: str) -> Tuple[Analyzer, ...]:
+        """Analyzers registered for the template of a request path."""
+        return tuple(self._analyzers.get(template_for(endpoint), ()))
+
+    async def decode(self, loads: JsonLoads, body: bytes) -> Dict[str, Any]:
+        """Decode a response body, off the loop if it is large.
+
+        Args:
+            loads: JSON decoder
+            body: Raw response body
+
+        Returns:
+            Decoded response data
+        """
+        if len(body) < self.threshold:
+            self.inline += 1
+            return decode_object(loads, body)
+        self.offloaded += 1
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, decode_object, loads, body
+        )
+
+    async def analyze(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the analyzers registered for an endpoint in the executor.
+
+        Args:
+            endpoint: Request path or template of the response
+            data: Decoded response, e.g. from ``client.get_clients``
+
+        Returns:
+            Output of the last analyzer; the data itself if there are none
+        """
+        analyzers = self.analyzers_for(endpoint)
+        if not analyzers:
+            return data
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, run_analyzers, data, analyzers
+        )
+
+    def shutdown(self) -> None:
+        """Shut down the executor if the offload created it."""
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
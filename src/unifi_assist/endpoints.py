@@ -0,0 +1,61 @@
+"""Path templates of the UniFi Network integration API."""
+
+from functools import lru_cache
+from typing import Tuple
+
+API_PREFIX = "proxy/network/integration/v1"
+
+# Same templates as the paths in api_spec/network_api.json, without the
+# leading slash
+SITES = f"{API_PREFIX}/sites"
+DEVICES = f"{API_PREFIX}/sites/{{siteId}}/devices"
+DEVICE = f"{API_PREFIX}/sites/{{siteId}}/devices/{{deviceId}}"
+DEVICE_STATISTICS = (
+    f"{API_PREFIX}/sites/{{siteId}}/devices/{{deviceId}}/statistics/latest"
+)
+DEVICE_ACTIONS = f"{API_PREFIX}/sites/{{siteId}}/devices/{{deviceId}}/actions"
+CLIENTS = f"{API_PREFIX}/sites/{{siteId}}/clients"
+INFO = f"{API_PREFIX}/info"
+
+TEMPLATES: Tuple[str, ...] = (
+    SITES,
+    DEVICES,
+    DEVICE,
+    DEVICE_STATISTICS,
+    DEVICE_ACTIONS,
+    CLIENTS,
+    INFO,
+)
+
+_SPLIT_TEMPLATES = tuple((template, template.split("/")) for template in TEMPLATES)
+
+
+def _matches(parts: list, template_parts: list) -> bool:
+    """Whether path segments match template segments."""
+    if len(parts) != len(template_parts):
+        return False
+    return all(
+        expected.startswith("{") or part == expected
+        for part, expected in zip(parts, template_parts)
+    )
+
+
+@lru_cache(maxsize=8192)
+def template_for(path: str) -> str:
+    """Map a concrete API path to its template.
+
+    Metrics and mocks group requests by template, so that every device's
+    statistics count towards one endpoint instead of thousands.
+
+    Args:
+        path: Request path, with or without a leading slash or query string
+
+    Returns:
+        Matching template, or the path itself if it matches none
+    """
+    path = path.partition("?")[0].strip("/")
+    parts = path.split("/")
+    for template, template_parts in _SPLIT_TEMPLATES:
+        if _matches(parts, template_parts):
+            return template
+    return path
@@ -0,0 +1,407 @@
+"""Streaming export of records to JSON Lines or CSV files."""
+
+import asyncio
+import csv
+import gzip
+import importlib
+import io
+import json
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Union,
+)
+
+from .crawl import CrawlRecord
+from .poller import Sample
+
+NDJSON = "ndjson"
+CSV = "csv"
+FORMATS = (NDJSON, CSV)
+
+GZIP = "gzip"
+ZSTD = "zstd"
+COMPRESSIONS = (GZIP, ZSTD)
+SUFFIXES = {".gz": GZIP, ".zst": ZSTD}
+
+DEFAULT_BUFFER_SIZE = 256 * 1024
+
+Record = Mapping[str, Any]
+Records = Union[AsyncIterable[Record], Iterable[Record]]
+
+
+@lru_cache(maxsize=1)
+def _zstd() -> Any:
+    """Return a zstd module if one is installed, preferring the stdlib one."""
+    for name in ("compression.zstd", "zstandard"):
+        try:
+            return importlib.import_module(name)
+        except ImportError:
+            continue
+    return None
+
+
+def getter(path: str) -> Callable[[Record], Any]:
+    """Build a reader for a dotted path, e.g. ``uplink.txRateBps``.
+
+    The reader returns None where the path is missing. Building it once
+    per column keeps per-row work to dictionary lookups.
+    """
+    keys = path.split(".")
+    if len(keys) == 1:
+        return lambda record: record.get(path)
+
+    def get(record: Record) -> Any:
+        value: Any = record
+        for key in keys:
+            try:
+                value = value.get(key)
+            except AttributeError:
+                return None
+        return value
+
+    return get
+
+
+@dataclass
+class ExportStats:
+    """Outcome of an export.
+
+    Attributes:
+        records: Number of records written
+        bytes_encoded: Size of the encoded output before compression
+        bytes_written: Size written to the destination
+        duration: Wall-clock time in seconds
+    """
+
+    records: int = 0
+    bytes_encoded: int = 0
+    bytes_written: int = 0
+    duration: float = 0.0
+
+
+class _CountingWriter(io.RawIOBase):
+    """Write-only file object counting the bytes passed to another one."""
+
+    def __init__(self, target: BinaryIO):
+        self.target = target
+        self.written = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        count = self.target.write(data)
+        self.written += len(data)
+        return count if count is not None else len(data)
+
+
+def _compressor(stream: _CountingWriter, compression: Optional[str]) -> Any:
+    """Wrap a stream in a compressing writer."""
+    if compression is None:
+        return stream
+    if compression == GZIP:
+        return gzip.GzipFile(fileobj=stream, mode="wb", compresslevel=6)
+    zstd = _zstd()
+    if hasattr(zstd, "ZstdFile"):
+        return zstd.ZstdFile(stream, "wb")
+    return zstd.ZstdCompressor().stream_writer(stream, closefd=False)
+
+
+class RecordExporter:
+    """Writes records to a file as they arrive, never holding all of them.
+
+    Records are encoded into a buffer. Whenever the buffer reaches
+    ``buffer_size`` bytes it is compressed and written in a worker thread
+    while the next one fills; gzip and zstd release the GIL while
+    compressing, so that work overlaps with fetching. At most one buffer
+    is being written while another fills, so memory stays flat however
+    many records pass through.
+
+    CSV columns default to the fields of the first record. Nested values
+    are written as JSON.
+
+    Example:
+        async with RecordExporter("clients.csv.gz", CSV, columns) as export:
+            async for client_record in client.iter_clients(site_id):
+                await export.write(client_record)
+    """
+
+    def __init__(
+        self,
+        destination: Union[str, Path, BinaryIO],
+        format: str = NDJSON,
+        columns: Optional[Sequence[str]] = None,
+        compression: Optional[str] = None,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+    ):
+        """Initialize the exporter.
+
+        Args:
+            destination: File path, or binary file object the caller closes
+            format: "ndjson" or "csv"
+            columns: Columns to keep, by dotted path; everything if not given
+                for JSON Lines, the first record's fields for CSV
+            compression: "gzip" or "zstd"; taken from a ``.gz`` or ``.zst``
+                suffix of a destination path if not given
+            buffer_size: Encoded bytes to collect before each write
+        """
+        if format not in FORMATS:
+            raise ValueError(f"Unknown format {format!r}, expected one of {FORMATS}")
+        if compression is None and isinstance(destination, (str, Path)):
+            compression = SUFFIXES.get(Path(destination).suffix)
+        if compression is not None and compression not in COMPRESSIONS:
+            raise ValueError(
+                f"Unknown compression {compression!r}, expected one of {COMPRESSIONS}"
+            )
+        if compression == ZSTD and _zstd() is None:
+            raise ValueError("zstd compression needs Python 3.14+ or zstandard")
+        if buffer_size < 1:
+            raise ValueError("Buffer size must be at least 1")
+
+        self.destination = destination
+        self.format = format
+        self.columns = list(columns) if columns is not None else None
+        self._getters = [getter(column) for column in self.columns or ()]
+        self.compression = compression
+        self.buffer_size = buffer_size
+        self.stats = ExportStats()
+        self._file: Optional[BinaryIO] = None
+        self._stream: Optional[_CountingWriter] = None
+        self._sink: Any = None
+        self._text = io.StringIO()
+        self._csv: Any = None
+        self._pending: Optional["asyncio.Future[None]"] = None
+        self._start = 0.0
+
+    async def open(self) -> None:
+        """Open the destination; called on first write if not called."""
+        if self._sink is not None:
+            return
+        self._start = time.perf_counter()
+        if isinstance(self.destination, (str, Path)):
+            self._file = await asyncio.to_thread(open, self.destination, "wb")
+            target: BinaryIO = self._file
+        else:
+            target = self.destination
+        self._stream = _CountingWriter(target)
+        try:
+            self._sink = _compressor(self._stream, self.compression)
+        except BaseException:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            raise
+
+    async def write(self, record: Record) -> None:
+        """Encode one record, flushing the buffer when it is full."""
+        if self._sink is None:
+            await self.open()
+        if self.format == NDJSON:
+            row = (
+                {c: get(record) for c, get in zip(self.columns, self._getters)}
+                if self.columns
+                else record
+            )
+            self._text.write(json.dumps(row, separators=(",", ":"), default=str))
+            self._text.write("\n")
+        else:
+            self._write_csv(record)
+        self.stats.records += 1
+        if self._text.tell() >= self.buffer_size:
+            await self._flush()
+
+    async def write_all(self, records: Records) -> ExportStats:
+        """Write every record of a sync or async iterable.
+
+        Returns:
+            Export counters so far
+        """
+        if isinstance(records, AsyncIterable):
+            async for record in records:
+                await self.write(record)
+        else:
+            for record in records:
+                await self.write(record)
+        return self.stats
+
+    async def close(self) -> ExportStats:
+        """Flush what is buffered and finish the compressed stream.
+
+        Returns:
+            Export counters
+        """
+        if self._sink is None:
+            await self.open()
+        await self._flush()
+        await self._wait()
+        await asyncio.to_thread(self._finish)
+        self.stats.duration = time.perf_counter() - self._start
+        return self.stats
+
+    def _write_csv(self, record: Record) -> None:
+        """Encode one record as a CSV row."""
+        if self._csv is None:
+            if self.columns is None:
+                self.columns = list(record)
+                self._getters = [getter(column) for column in self.columns]
+            self._csv = csv.writer(self._text)
+            self._csv.writerow(self.columns)
+        assert self.columns is not None
+        self._csv.writerow(
+            [
+                json.dumps(value, separators=(",", ":"))
+                if isinstance(value, (dict, list))
+                else value
+                for value in (get(record) for get in self._getters)
+            ]
+        )
+
+    async def _flush(self) -> None:
+        """Hand the buffer to a worker thread once the previous write is done."""
+        data = self._text.getvalue().encode()
+        if not data:
+            return
+        self._text.seek(0)
+        self._text.truncate()
+        self.stats.bytes_encoded += len(data)
+        await self._wait()
+        self._pending = asyncio.ensure_future(asyncio.to_thread(self._sink.write, data))
+
+    async def _wait(self) -> None:
+        """Wait for the write in flight, if any."""
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            await pending
+
+    def _finish(self) -> None:
+        """Close the compressor and the file, if the exporter opened it."""
+        if self._sink is not self._stream:
+            self._sink.close()
+        assert self._stream is not None
+        if self._file is not None:
+            self._file.close()
+        else:
+            self._stream.target.flush()
+        self.stats.bytes_written = self._stream.written
+
+    async def __aenter__(self) -> "RecordExporter":
+        """Open the destination on context entry."""
+        await self.open()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[type],
+        exc_val: Optional[Exception],
+        exc_tb: Optional[Any],
+    ) -> None:
+        """Finish the export on context exit.
+
+        If the body raised, the export is abandoned instead: buffered
+        records are dropped, the compressed stream is left unfinished, a
+        file the exporter opened is closed and the exception propagates.
+        """
+        if exc_type is None:
+            await self.close()
+        else:
+            await self._abandon()
+
+    async def _abandon(self) -> None:
+        """Stop the export without flushing or finishing what was written."""
+        self._text = io.StringIO()
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            await asyncio.gather(pending, return_exceptions=True)
+        if self._sink is not None:
+            await asyncio.to_thread(self._discard)
+
+    def _discard(self) -> None:
+        """Close the compressor, dropping its trailer, and the exporter's file."""
+        assert self._stream is not None
+        self._stream.target = io.BytesIO()
+        if self._sink is not self._stream:
+            self._sink.close()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+async def export_records(
+    records: Records,
+    destination: Union[str, Path, BinaryIO],
+    format: str = NDJSON,
+    columns: Optional[Sequence[str]] = None,
+    compression: Optional[str] = None,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+) -> ExportStats:
+    """Stream records to a JSON Lines or CSV file.
+
+    Args:
+        records: Sync or async iterable of records, e.g. ``iter_clients()``
+        destination: File path, or binary file object the caller closes
+        format: "ndjson" or "csv"
+        columns: Columns to keep, by dotted path
+        compression: "gzip" or "zstd"; taken from the path suffix if not given
+        buffer_size: Encoded bytes to collect before each write
+
+    Returns:
+        Export counters
+    """
+    exporter = RecordExporter(destination, format, columns, compression, buffer_size)
+    async with exporter:
+        await exporter.write_all(records)
+    return exporter.stats
+
+
+async def crawl_rows(
+    records: AsyncIterable[CrawlRecord], kind: str
+) -> AsyncIterator[Dict[str, Any]]:
+    """Rows of one kind from a fleet crawl, tagged with site and device.
+
+    Args:
+        records: Fleet crawl, e.g. ``client.crawl_inventory()``
+        kind: Record kind to keep, e.g. "device_statistics"; list responses
+            such as "clients" yield one row per item
+    """
+    async for record in records:
+        if record.kind != kind or not record.ok:
+            continue
+        tags = {"siteId": record.site_id}
+        if record.device_id is not None:
+            tags["deviceId"] = record.device_id
+        items: List[Any] = (
+            record.data["data"] if "data" in record.data else [record.data]
+        )
+        for item in items:
+            yield {**tags, **item}
+
+
+async def sample_rows(
+    samples: AsyncIterable[Sample], fields: Sequence[str]
+) -> AsyncIterator[Dict[str, Any]]:
+    """Rows from statistics samples, e.g. ``StatisticsPoller.subscribe()``.
+
+    Args:
+        samples: Samples to convert
+        fields: Field names of the sampled values, in order
+    """
+    async for sample in samples:
+        yield {
+            "deviceId": sample.device_id,
+            "timestamp": sample.timestamp,
+            **dict(zip(fields, sample.values)),
+        }
@@ -0,0 +1,367 @@
+"""Federated queries across many UniFi controllers."""
+
+import asyncio
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Union,
+)
+
+import structlog
+
+from .client import UniFiClient
+from .logging import setup_logging
+from .metrics import error_reason
+from .session import ConnectionPoolConfig, SharedSession
+
+DEFAULT_FEDERATION_CONCURRENCY = 16
+SOURCE_FIELD = "controller"
+QUERIES = ("sites", "devices", "clients")
+
+Record = Dict[str, Any]
+Query = Callable[[UniFiClient], Awaitable[List[Record]]]
+Analyze = Callable[[List[Record]], List[Record]]
+
+
+@dataclass(frozen=True)
+class ControllerConfig:
+    """Connection settings for one controller of a federation.
+
+    Attributes:
+        name: Unique name, used to tag records from this controller
+        host: Controller host (e.g. 192.168.1.1)
+        api_key: API key for the controller
+        verify_ssl: Whether to verify SSL certificates
+        scheme: URL scheme, "http" only for local test controllers
+    """
+
+    name: str
+    host: str
+    api_key: str
+    verify_ssl: bool = True
+    scheme: str = "https"
+
+
+def load_controllers(path: Union[str, Path]) -> List[ControllerConfig]:
+    """Read a controller list from a JSON file.
+
+    The file holds an array of objects with the fields of
+    ``ControllerConfig``.
+
+    Args:
+        path: Path to the JSON file
+
+    Returns:
+        Controller configurations in file order
+    """
+    entries = json.loads(Path(path).read_text())
+    return [ControllerConfig(**entry) for entry in entries]
+
+
+@dataclass
+class FederatedResult:
+    """Merged result of a query across controllers.
+
+    Attributes:
+        records: Records from every controller that answered, each tagged
+            with the controller name under ``SOURCE_FIELD``
+        errors: Failure reason per controller that did not answer
+    """
+
+    records: List[Record] = field(default_factory=list)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        """Whether every controller answered."""
+        return not self.errors
+
+    def by_controller(self) -> Dict[str, List[Record]]:
+        """Group the merged records by their source controller."""
+        grouped: Dict[str, List[Record]] = {}
+        for record in self.records:
+            grouped.setdefault(record[SOURCE_FIELD], []).append(record)
+        return grouped
+
+    def merge(self, other: "FederatedResult") -> None:
+        """Add the records and errors of another result to this one."""
+        self.records.extend(other.records)
+        self.errors.update(other.errors)
+
+
+async def query_sites(client: UniFiClient) -> List[Record]:
+    """All sites of one controller."""
+    return list((await client.get_sites()).get("data", []))
+
+
+async def query_devices(client: UniFiClient) -> List[Record]:
+    """All devices of one controller, tagged with their site."""
+    return await _per_site(client, client.iter_devices)
+
+
+async def query_clients(client: UniFiClient) -> List[Record]:
+    """All connected clients of one controller, tagged with their site."""
+    return await _per_site(client, client.iter_clients)
+
+
+async def _per_site(client: UniFiClient, iterate: Callable[..., Any]) -> List[Record]:
+    """Collect a paginated listing from every site concurrently."""
+
+    async def collect(site_id: str) -> List[Record]:
+        return [{**record, "siteId": site_id} async for record in iterate(site_id)]
+
+    sites = await query_sites(client)
+    pages = await asyncio.gather(*(collect(site["id"]) for site in sites))
+    return [record for page in pages for record in page]
+
+
+_QUERIES: Dict[str, Query] = {
+    "sites": query_sites,
+    "devices": query_devices,
+    "clients": query_clients,
+}
+
+
+class Federation:
+    """Pool of clients for a list of controllers, queried as one.
+
+    One client per controller is kept in ``members``, and all of them
+    share one connection pool. Queries run against every
+    controller at once, up to ``concurrency`` controllers at a time, and
+    their records are merged with the controller name added. A controller
+    that fails is reported in the result instead of failing the query.
+    For estates too large for one core, ``sharded`` splits the controllers
+    across worker processes, which decode and optionally analyze their
+    share before sending it back.
+
+    Example:
+        async with Federation(load_controllers("controllers.json")) as fed:
+            devices = await fed.devices()
+            for name, reason in devices.errors.items():
+                ...
+    """
+
+    def __init__(
+        self,
+        controllers: Iterable[ControllerConfig],
+        logger: Optional[structlog.BoundLogger] = None,
+        pool: Optional[ConnectionPoolConfig] = None,
+        concurrency: int = DEFAULT_FEDERATION_CONCURRENCY,
+        **client_kwargs: Any,
+    ):
+        """Initialize the federation.
+
+        Args:
+            controllers: Controllers to federate; names must be unique
+            logger: Structured logger instance, shared by all clients
+            pool: Connection pool settings for the shared session
+            concurrency: Maximum number of controllers queried at once
+            **client_kwargs: Extra ``UniFiClient`` arguments for every client,
+                except ``cache``, whose keys do not include the host, and
+                ``traffic``, whose rate limits and backoff are per controller
+        """
+        self.controllers = list(controllers)
+        names = [controller.name for controller in self.controllers]
+        if len(set(names)) != len(names):
+            raise ValueError("Controller names must be unique")
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1")
+        if "cache" in client_kwargs:
+            raise ValueError("Federated clients cannot share a response cache")
+        if "traffic" in client_kwargs:
+            raise ValueError("Federated clients cannot share a traffic controller")
+
+        if logger is None:
+            setup_logging("unifi_federation", log_to_file=True)
+            logger = structlog.get_logger("unifi_federation")
+        self.logger = logger
+        self.concurrency = concurrency
+        self.pool = pool
+        self.client_kwargs = client_kwargs
+        self.shared_session = SharedSession(pool)
+        self.members: Dict[str, UniFiClient] = {
+            controller.name: UniFiClient(
+                host=controller.host,
+                api_key=controller.api_key,
+                verify_ssl=controller.verify_ssl,
+                scheme=controller.scheme,
+                logger=self.logger.bind(controller=controller.name),
+                session=self.shared_session,
+                **client_kwargs,
+            )
+            for controller in self.controllers
+        }
+
+    async def query(self, query: Query) -> FederatedResult:
+        """Run a query against every controller and merge the records.
+
+        Args:
+            query: Coroutine function returning records for one client
+
+        Returns:
+            Tagged records and per-controller failures
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        result = FederatedResult()
+
+        async def run(name: str, client: UniFiClient) -> List[Record]:
+            async with semaphore:
+                try:
+                    return await query(client)
+                except Exception as exc:
+                    result.errors[name] = error_reason(exc)
+                    self.logger.warning(
+                        "controller_query_failed", controller=name, error=str(exc)
+                    )
+                    return []
+
+        answers = await asyncio.gather(*(run(*item) for item in self.members.items()))
+        for name, records in zip(self.members, answers):
+            result.records.extend({**record, SOURCE_FIELD: name} for record in records)
+        return result
+
+    async def sites(self) -> FederatedResult:
+        """Sites of every controller."""
+        return await self.query(query_sites)
+
+    async def devices(self) -> FederatedResult:
+        """Devices of every controller, tagged with controller and site."""
+        return await self.query(query_devices)
+
+    async def clients(self) -> FederatedResult:
+        """Connected clients of every controller, tagged with controller and site."""
+        return await self.query(query_clients)
+
+    async def sharded(
+        self,
+        query: str,
+        workers: int,
+        analyze: Optional[Analyze] = None,
+        log_level: str = "WARNING",
+    ) -> FederatedResult:
+        """Run a query in worker processes, each serving a shard of controllers.
+
+        Every worker opens its own clients, with this federation's pool
+        settings and client arguments, so response decoding and ``analyze``
+        run in parallel. Those settings are copied into each worker and must
+        be picklable. ``metrics`` are rejected, as they would be recorded in
+        the workers and never sent back. Only the records a worker returns are
+        sent back to this process, so analyses that reduce records also
+        reduce what has to be copied between processes.
+
+        Args:
+            query: Name of the query, one of "sites", "devices" or "clients"
+            workers: Number of worker processes
+            analyze: Applied in the worker to each shard's merged records;
+                must be a module-level function so it can be pickled
+            log_level: Log level for the workers
+
+        Returns:
+            Merged records and failures of all shards
+        """
+        if query not in _QUERIES:
+            raise ValueError(f"Unknown query {query!r}, expected one of {QUERIES}")
+        if "metrics" in self.client_kwargs:
+            raise ValueError("Metrics cannot be collected from worker processes")
+        shards = [s for s in shard_controllers(self.controllers, workers) if s]
+        result = FederatedResult()
+        if not shards:
+            return result
+        loop = asyncio.get_running_loop()
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(len(shards), mp_context=context) as executor:
+            parts = await asyncio.gather(
+                *(
+                    loop.run_in_executor(
+                        executor,
+                        _run_shard,
+                        shard,
+                        query,
+                        analyze,
+                        log_level,
+                        self.pool,
+                        self.client_kwargs,
+                    )
+                    for shard in shards
+                )
+            )
+        for part in parts:
+            result.merge(part)
+        self.logger.info(
+            "sharded_query_complete",
+            query=query,
+            shards=len(shards),
+            records=len(result.records),
+            errors=len(result.errors),
+        )
+        return result
+
+    async def close(self) -> None:
+        """Close the shared session of all clients."""
+        await self.shared_session.close()
+
+    async def __aenter__(self) -> "Federation":
+        """Async context manager entry."""
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[type],
+        exc_val: Optional[Exception],
+        exc_tb: Optional[Any],
+    ) -> None:
+        """Async context manager exit."""
+        await self.close()
+
+
+def shard_controllers(
+    controllers: Sequence[ControllerConfig], shards: int
+) -> List[List[ControllerConfig]]:
+    """Split controllers round-robin into the given number of shards.
+
+    Args:
+        controllers: Controllers to split
+        shards: Number of shards
+
+    Returns:
+        ``shards`` lists of controllers; some are empty if there are fewer
+        controllers than shards
+    """
+    if shards < 1:
+        raise ValueError("Shard count must be at least 1")
+    return [list(controllers[index::shards]) for index in range(shards)]
+
+
+def _run_shard(
+    controllers: List[ControllerConfig],
+    query: str,
+    analyze: Optional[Analyze],
+    log_level: str,
+    pool: Optional[ConnectionPoolConfig],
+    client_kwargs: Dict[str, Any],
+) -> FederatedResult:
+    """Worker process entry point: query one shard and analyze its records."""
+
+    async def run() -> FederatedResult:
+        setup_logging("unifi_federation", log_level=log_level)
+        logger = structlog.get_logger("unifi_federation")
+        async with Federation(
+            controllers, logger=logger, pool=pool, **client_kwargs
+        ) as federation:
+            result = await federation.query(_QUERIES[query])
+        if analyze is not None:
+            result.records = analyze(result.records)
+        return result
+
+    return asyncio.run(run())
@@ -0,0 +1,645 @@
+"""Columnar in-memory inventory of devices and clients."""
+
+import importlib
+import math
+from array import array
+from collections import Counter
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
+
+CATEGORY = "category"
+STRING = "string"
+MAC = "mac"
+IP = "ip"
+NUMBER = "number"
+
+DEVICE_SCHEMA: Dict[str, str] = {
+    "id": STRING,
+    "name": STRING,
+    "model": CATEGORY,
+    "macAddress": MAC,
+    "ipAddress": IP,
+    "state": CATEGORY,
+    "firmwareVersion": CATEGORY,
+}
+
+CLIENT_SCHEMA: Dict[str, str] = {
+    "id": STRING,
+    "name": STRING,
+    "macAddress": MAC,
+    "ipAddress": IP,
+    "type": CATEGORY,
+    "uplinkDeviceId": CATEGORY,
+}
+
+_NO_MAC = 2**64 - 1
+_OTHER_MAC = 2**64 - 2
+_HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
+_NO_IP = 0
+_MISSING_LENGTH = 0xFFFF
+_OTHER_IP = 2**32 - 1
+
+
+@lru_cache(maxsize=1)
+def _numpy() -> Any:
+    """Return the numpy module if it is installed."""
+    try:
+        return importlib.import_module("numpy")
+    except ImportError:
+        return None
+
+
+class Mask:
+    """Row selection over an inventory, one byte per row."""
+
+    __slots__ = ("bits",)
+
+    def __init__(self, bits: Union[bytes, bytearray]):
+        """Wrap a selection.
+
+        Args:
+            bits: One byte per row, 1 for selected rows and 0 otherwise
+        """
+        self.bits = bytes(bits)
+
+    def __len__(self) -> int:
+        """Number of rows the mask covers."""
+        return len(self.bits)
+
+    def __and__(self, other: "Mask") -> "Mask":
+        """Rows selected by both masks."""
+        return Mask(_combine(self.bits, other.bits, "and"))
+
+    def __or__(self, other: "Mask") -> "Mask":
+        """Rows selected by either mask."""
+        return Mask(_combine(self.bits, other.bits, "or"))
+
+    def __invert__(self) -> "Mask":
+        """Rows not selected by this mask."""
+        return Mask(self.bits.translate(_INVERT))
+
+    def count(self) -> int:
+        """Number of selected rows."""
+        return len(self.bits) - self.bits.count(0)
+
+    def indices(self) -> Iterator[int]:
+        """Indices of the selected rows."""
+        find = self.bits.find
+        index = find(1)
+        while index != -1:
+            yield index
+            index = find(1, index + 1)
+
+
+_INVERT = bytes([1] + [0] * 255)
+
+
+def _combine(left: bytes, right: bytes, op: str) -> bytes:
+    """Combine two masks bytewise using big-integer arithmetic."""
+    if len(left) != len(right):
+        raise ValueError("Masks cover different numbers of rows")
+    a, b = int.from_bytes(left, "little"), int.from_bytes(right, "little")
+    combined = a & b if op == "and" else a | b
+    return combined.to_bytes(len(left), "little")
+
+
+class CategoryColumn:
+    """Dictionary-encoded string column for low-cardinality values."""
+
+    kind = CATEGORY
+
+    def __init__(self) -> None:
+        """Initialize an empty column."""
+        self.codes = array("i")
+        self.values: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        """Number of rows."""
+        return len(self.codes)
+
+    def append(self, value: Any) -> None:
+        """Append a value, None for missing."""
+        self.codes.append(self.encode(value, add=True))
+
+    def set(self, row: int, value: Any) -> None:
+        """Overwrite the value at a row."""
+        self.codes[row] = self.encode(value, add=True)
+
+    def encode(self, value: Any, add: bool = False) -> int:
+        """Dictionary code for a value, -1 for missing or unknown values."""
+        if value is None:
+            return -1
+        value = str(value)
+        code = self._index.get(value)
+        if code is None:
+            if not add:
+                return -1
+            code = self._index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def __getitem__(self, row: int) -> Optional[str]:
+        """Value at a row."""
+        code = self.codes[row]
+        return None if code < 0 else self.values[code]
+
+    def equals(self, value: Any) -> Mask:
+        """Rows holding the given value."""
+        code = self.encode(value)
+        if code < 0 and value is not None:
+            return Mask(bytes(len(self)))
+        numpy = _numpy()
+        if numpy is not None:
+            codes = numpy.frombuffer(self.codes, dtype=numpy.int32)
+            return Mask((codes == code).view(numpy.uint8).tobytes())
+        return Mask(bytes(c == code for c in self.codes))
+
+    def isin(self, values: Iterable[Any]) -> Mask:
+        """Rows holding any of the given values."""
+        codes = {self.encode(value) for value in values} - {-1}
+        return Mask(bytes(c in codes for c in self.codes))
+
+    def counts(self, mask: Optional[Mask] = None) -> Dict[Optional[str], int]:
+        """Number of rows per value."""
+        numpy = _numpy()
+        if numpy is not None:
+            tally = self._bincount(numpy, mask)
+        elif mask is None:
+            tally = Counter(self.codes)
+        else:
+            tally = Counter(self.codes[row] for row in mask.indices())
+        return {
+            (None if code < 0 else self.values[code]): count
+            for code, count in tally.items()
+        }
+
+    def _bincount(self, numpy: Any, mask: Optional[Mask]) -> Dict[int, int]:
+        """Count codes with NumPy, keeping missing values under code -1."""
+        codes = numpy.frombuffer(self.codes, dtype=numpy.int32)
+        if mask is not None:
+            codes = codes[numpy.frombuffer(mask.bits, dtype=numpy.bool_)]
+        counts = numpy.bincount(codes + 1, minlength=len(self.values) + 1)
+        return {
+            code - 1: int(count) for code, count in enumerate(counts.tolist()) if count
+        }
+
+    def nbytes(self) -> int:
+        """Approximate memory used by the column."""
+        return (
+            self.codes.itemsize * len(self.codes)
+            + sum(len(value) + 49 for value in self.values) * 2
+        )
+
+
+class StringColumn:
+    """UTF-8 string column packed into one shared buffer."""
+
+    kind = STRING
+
+    def __init__(self) -> None:
+        """Initialize an empty column."""
+        self.data = bytearray()
+        self.starts = array("I")
+        # Byte lengths, 0xFFFF for missing values
+        self.lengths = array("H")
+
+    def __len__(self) -> int:
+        """Number of rows."""
+        return len(self.starts)
+
+    def _pack(self, value: Any) -> Tuple[int, int]:
+        """Append a value to the buffer and return its start and length."""
+        start = len(self.data)
+        if value is None:
+            return start, _MISSING_LENGTH
+        encoded = str(value).encode()
+        if len(encoded) >= _MISSING_LENGTH:
+            # Cut on a character boundary, dropping a partial sequence
+            encoded = encoded[: _MISSING_LENGTH - 1].decode(errors="ignore").encode()
+        self.data += encoded
+        return start, len(encoded)
+
+    def append(self, value: Any) -> None:
+        """Append a value, None for missing."""
+        start, length = self._pack(value)
+        self.starts.append(start)
+        self.lengths.append(length)
+
+    def set(self, row: int, value: Any) -> None:
+        """Overwrite the value at a row; the old bytes are left unused."""
+        self.starts[row], self.lengths[row] = self._pack(value)
+
+    def __getitem__(self, row: int) -> Optional[str]:
+        """Value at a row."""
+        length = self.lengths[row]
+        if length == _MISSING_LENGTH:
+            return None
+        start = self.starts[row]
+        return self.data[start : start + length].decode()
+
+    def equals(self, value: Any) -> Mask:
+        """Rows holding the given value."""
+        if value is None:
+            return Mask(bytes(length == _MISSING_LENGTH for length in self.lengths))
+        wanted = str(value).encode()
+        size = len(wanted)
+        with memoryview(self.data) as data:
+            return Mask(
+                bytes(
+                    length == size and data[start : start + size] == wanted
+                    for start, length in zip(self.starts, self.lengths)
+                )
+            )
+
+    def nbytes(self) -> int:
+        """Approximate memory used by the column."""
+        return len(self.data) + 6 * len(self)
+
+
+class IPColumn:
+    """IP address column packing IPv4 addresses into 32-bit integers.
+
+    Addresses that are not dotted-quad IPv4 (such as IPv6) are kept in a
+    side table keyed by row.
+    """
+
+    kind = IP
+
+    def __init__(self) -> None:
+        """Initialize an empty column."""
+        self.values = array("I")
+        self.other: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        """Number of rows."""
+        return len(self.values)
+
+    @staticmethod
+    def pack(value: Any) -> int:
+        """Pack an IPv4 address, or return a missing/other marker."""
+        if value is None:
+            return _NO_IP
+        parts = str(value).split(".")
+        if len(parts) != 4 or not all(part.isdigit() for part in parts):
+            return _OTHER_IP
+        packed = 0
+        for part in parts:
+            octet = int(part)
+            if octet > 255:
+                return _OTHER_IP
+            packed = packed << 8 | octet
+        return packed if packed not in (_NO_IP, _OTHER_IP) else _OTHER_IP
+
+    def append(self, value: Any) -> None:
+        """Append a value, None for missing."""
+        self.values.append(_NO_IP)
+        self.set(len(self.values) - 1, value)
+
+    def set(self, row: int, value: Any) -> None:
+        """Overwrite the value at a row."""
+        packed = self.pack(value)
+        self.values[row] = packed
+        if packed == _OTHER_IP:
+            self.other[row] = str(value)
+        else:
+            self.other.pop(row, None)
+
+    def __getitem__(self, row: int) -> Optional[str]:
+        """Value at a row."""
+        packed = self.values[row]
+        if packed == _NO_IP:
+            return None
+        if packed == _OTHER_IP:
+            return self.other[row]
+        return ".".join(str(packed >> shift & 0xFF) for shift in (24, 16, 8, 0))
+
+    def equals(self, value: Any) -> Mask:
+        """Rows holding the given address."""
+        packed = self.pack(value)
+        if packed == _OTHER_IP:
+            bits = bytearray(len(self))
+            for row, other in self.other.items():
+                bits[row] = other == str(value)
+            return Mask(bits)
+        numpy = _numpy()
+        if numpy is not None:
+            values = numpy.frombuffer(self.values, dtype=numpy.uint32)
+            return Mask((values == packed).view(numpy.uint8).tobytes())
+        return Mask(bytes(v == packed for v in self.values))
+
+    def nbytes(self) -> int:
+        """Approximate memory used by the column."""
+        return self.values.itemsize * len(self.values) + 80 * len(self.other)
+
+
+class MacColumn:
+    """MAC address column packed into 48-bit integers.
+
+    Values that are not six colon- or dash-separated hex octets are kept
+    in a side table keyed by row.
+    """
+
+    kind = MAC
+
+    def __init__(self) -> None:
+        """Initialize an empty column."""
+        self.values = array("Q")
+        self.other: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        """Number of rows."""
+        return len(self.values)
+
+    @staticmethod
+    def pack(value: Any) -> int:
+        """Pack a MAC address string, or return a missing/other marker."""
+        if value is None:
+            return _NO_MAC
+        text = str(value)
+        digits = text.replace(":", "").replace("-", "")
+        if (
+            len(text) != 17
+            or len(digits) != 12
+            or not _HEX_DIGITS.issuperset(digits)
+            or any(text[i] not in ":-" for i in range(2, 17, 3))
+        ):
+            return _OTHER_MAC
+        return int(digits, 16)
+
+    def append(self, value: Any) -> None:
+        """Append a value, None for missing."""
+        self.values.append(_NO_MAC)
+        self.set(len(self.values) - 1, value)
+
+    def set(self, row: int, value: Any) -> None:
+        """Overwrite the value at a row."""
+        packed = self.pack(value)
+        self.values[row] = packed
+        if packed == _OTHER_MAC:
+            self.other[row] = str(value)
+        else:
+            self.other.pop(row, None)
+
+    def __getitem__(self, row: int) -> Optional[str]:
+        """Value at a row."""
+        packed = self.values[row]
+        if packed == _NO_MAC:
+            return None
+        if packed == _OTHER_MAC:
+            return self.other[row]
+        return ":".join(f"{packed >> shift & 0xFF:02x}" for shift in range(40, -8, -8))
+
+    def equals(self, value: Any) -> Mask:
+        """Rows holding the given MAC address."""
+        packed = self.pack(value)
+        if packed == _OTHER_MAC:
+            bits = bytearray(len(self))
+            for row, other in self.other.items():
+                bits[row] = other == str(value)
+            return Mask(bits)
+        numpy = _numpy()
+        if numpy is not None:
+            values = numpy.frombuffer(self.values, dtype=numpy.uint64)
+            return Mask((values == packed).view(numpy.uint8).tobytes())
+        return Mask(bytes(v == packed for v in self.values))
+
+    def nbytes(self) -> int:
+        """Approximate memory used by the column."""
+        return self.values.itemsize * len(self.values) + 80 * len(self.other)
+
+
+class NumberColumn:
+    """Float column with NaN for missing values."""
+
+    kind = NUMBER
+
+    def __init__(self) -> None:
+        """Initialize an empty column."""
+        self.values = array("d")
+
+    def __len__(self) -> int:
+        """Number of rows."""
+        return len(self.values)
+
+    def append(self, value: Any) -> None:
+        """Append a value, None for missing."""
+        self.values.append(math.nan if value is None else float(value))
+
+    def set(self, row: int, value: Any) -> None:
+        """Overwrite the value at a row."""
+        self.values[row] = math.nan if value is None else float(value)
+
+    def __getitem__(self, row: int) -> Optional[float]:
+        """Value at a row."""
+        value = self.values[row]
+        return None if math.isnan(value) else value
+
+    def equals(self, value: Any) -> Mask:
+        """Rows holding the given number."""
+        target = float(value)
+        numpy = _numpy()
+        if numpy is not None:
+            values = numpy.frombuffer(self.values, dtype=numpy.float64)
+            return Mask((values == target).view(numpy.uint8).tobytes())
+        return Mask(bytes(v == target for v in self.values))
+
+    def between(self, low: float, high: float) -> Mask:
+        """Rows with values in the closed range [low, high]."""
+        numpy = _numpy()
+        if numpy is not None:
+            values = numpy.frombuffer(self.values, dtype=numpy.float64)
+            selected = (values >= low) & (values <= high)
+            return Mask(selected.view(numpy.uint8).tobytes())
+        return Mask(bytes(low <= v <= high for v in self.values))
+
+    def nbytes(self) -> int:
+        """Approximate memory used by the column."""
+        return self.values.itemsize * len(self.values)
+
+
+Column = Union[CategoryColumn, StringColumn, MacColumn, IPColumn, NumberColumn]
+
+_COLUMN_TYPES: Dict[str, Callable[[], Column]] = {
+    CATEGORY: CategoryColumn,
+    STRING: StringColumn,
+    MAC: MacColumn,
+    IP: IPColumn,
+    NUMBER: NumberColumn,
+}
+
+
+class Inventory:
+    """Column-oriented store for device or client records.
+
+    Each field of the schema lives in a compact column: low-cardinality
+    strings (model, firmware, uplink) are dictionary-encoded, MAC and IPv4
+    addresses are packed into integers, free-form strings share one UTF-8
+    buffer and numbers are stored as doubles. Filters return ``Mask`` objects that can
+    be combined with ``&``, ``|`` and ``~``. Equality filters on category
+    and MAC columns are vectorized with NumPy when it is installed.
+
+    Example:
+        clients = Inventory.from_response(await client.get_clients(site_id))
+        wireless = clients.equals("type", "WIRELESS")
+        per_ap = clients.group_count("uplinkDeviceId", where=wireless)
+    """
+
+    def __init__(self, schema: Mapping[str, str]):
+        """Initialize an empty inventory.
+
+        Args:
+            schema: Mapping of record keys to column kinds
+        """
+        unknown = set(schema.values()) - set(_COLUMN_TYPES)
+        if unknown:
+            raise ValueError(f"Unknown column kinds: {', '.join(sorted(unknown))}")
+
+        self.schema = dict(schema)
+        self.columns: Dict[str, Column] = {
+            name: _COLUMN_TYPES[kind]() for name, kind in self.schema.items()
+        }
+        self._rows = 0
+
+    @classmethod
+    def from_records(
+        cls, records: Iterable[Mapping[str, Any]], schema: Mapping[str, str]
+    ) -> "Inventory":
+        """Build an inventory from records.
+
+        Args:
+            records: API records
+            schema: Mapping of record keys to column kinds
+
+        Returns:
+            Populated inventory
+        """
+        inventory = cls(schema)
+        inventory.extend(records)
+        return inventory
+
+    @classmethod
+    def devices(cls, response: Mapping[str, Any]) -> "Inventory":
+        """Build a device inventory from a ``get_devices`` response."""
+        return cls.from_records(response.get("data", []), DEVICE_SCHEMA)
+
+    @classmethod
+    def clients(cls, response: Mapping[str, Any]) -> "Inventory":
+        """Build a client inventory from a ``get_clients`` response."""
+        return cls.from_records(response.get("data", []), CLIENT_SCHEMA)
+
+    def __len__(self) -> int:
+        """Number of rows."""
+        return self._rows
+
+    def append(self, record: Mapping[str, Any]) -> int:
+        """Append a record.
+
+        Args:
+            record: API record
+
+        Returns:
+            Index of the new row
+        """
+        for name, column in self.columns.items():
+            column.append(record.get(name))
+        self._rows += 1
+        return self._rows - 1
+
+    def extend(self, records: Iterable[Mapping[str, Any]]) -> None:
+        """Append several records."""
+        for record in records:
+            self.append(record)
+
+    def update(self, row: int, record: Mapping[str, Any]) -> None:
+        """Overwrite the fields present in ``record`` at a row."""
+        for name, value in record.items():
+            column = self.columns.get(name)
+            if column is not None:
+                column.set(row, value)
+
+    def column(self, name: str) -> Column:
+        """Column for a field."""
+        try:
+            return self.columns[name]
+        except KeyError:
+            raise KeyError(f"Unknown field: {name}") from None
+
+    def equals(self, name: str, value: Any) -> Mask:
+        """Rows where a field equals a value."""
+        return self.column(name).equals(value)
+
+    def isin(self, name: str, values: Iterable[Any]) -> Mask:
+        """Rows where a category field holds any of the given values."""
+        column = self.column(name)
+        if not isinstance(column, CategoryColumn):
+            values = list(values)
+            mask = Mask(bytes(len(self)))
+            for value in values:
+                mask = mask | column.equals(value)
+            return mask
+        return column.isin(values)
+
+    def select(self, where: Optional[Mask] = None, **equals: Any) -> Mask:
+        """Rows matching all keyword equality filters and an optional mask."""
+        mask = where if where is not None else Mask(b"\x01" * len(self))
+        for name, value in equals.items():
+            mask = mask & self.equals(name, value)
+        return mask
+
+    def group_count(self, *names: str, where: Optional[Mask] = None) -> Dict[Any, int]:
+        """Count rows per value of one or more fields.
+
+        Args:
+            names: Fields to group by
+            where: Only count rows selected by this mask
+
+        Returns:
+            Mapping of value (or tuple of values) to row count
+        """
+        if len(names) == 1:
+            column = self.column(names[0])
+            if isinstance(column, CategoryColumn):
+                return dict(column.counts(where))
+
+        columns = [self.column(name) for name in names]
+        rows = where.indices() if where is not None else iter(range(len(self)))
+        tally: Counter[Any] = Counter()
+        for row in rows:
+            key = tuple(column[row] for column in columns)
+            tally[key if len(key) > 1 else key[0]] += 1
+        return dict(tally)
+
+    def row(self, index: int) -> Dict[str, Any]:
+        """Rebuild the record at a row."""
+        if not -self._rows <= index < self._rows:
+            raise IndexError("Inventory row out of range")
+        index %= self._rows
+        return {name: column[index] for name, column in self.columns.items()}
+
+    def rows(self, where: Optional[Mask] = None) -> Iterator[Dict[str, Any]]:
+        """Rebuild records, optionally only for selected rows."""
+        indices = where.indices() if where is not None else iter(range(len(self)))
+        for index in indices:
+            yield self.row(index)
+
+    def values(self, name: str, where: Optional[Mask] = None) -> List[Any]:
+        """Values of one field, optionally only for selected rows."""
+        column = self.column(name)
+        indices = where.indices() if where is not None else range(len(self))
+        return [column[index] for index in indices]
+
+    def nbytes(self) -> int:
+        """Approximate memory used by all columns."""
+        return sum(column.nbytes() for column in self.columns.values())
@@ -1,41 +1,169 @@
+import atexit
 import os
+import queue
 from pathlib import Path
-from typing import Optional
+from typing import Any, List, Optional
 import structlog
 import logging
+import logging.handlers
 import sys
 from structlog.stdlib import BoundLogger
 from structlog.processors import JSONRenderer
 
+# Handlers and queue listener installed by the last setup_logging() call
+_handlers: List[logging.Handler] = []
+_listener: Optional[logging.handlers.QueueListener] = None
+_configured = False
+
+
+def _env_flag(name: str, default: str) -> bool:
+    """Read a 0/1 flag from the environment."""
+    return bool(int(os.getenv(name, default)))
+
+
+def _file_handler(
+    path: Path,
+    max_bytes: int,
+    rotate_when: Optional[str],
+    backup_count: int,
+) -> logging.Handler:
+    """Create a log file handler, rotating by size or time if requested."""
+    if max_bytes > 0:
+        return logging.handlers.RotatingFileHandler(
+            path,
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+            encoding="utf-8",
+            delay=True,
+        )
+    if rotate_when:
+        return logging.handlers.TimedRotatingFileHandler(
+            path,
+            when=rotate_when,
+            backupCount=backup_count,
+            encoding="utf-8",
+            delay=True,
+        )
+    return logging.FileHandler(path, encoding="utf-8", delay=True)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that leaves formatting to the listener's handlers."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Enqueue the record as is; its event dict is rendered off-thread."""
+        return record
+
+
+def _install(handlers: List[logging.Handler], level: str, non_blocking: bool) -> None:
+    """Attach handlers to the root logger, behind a queue if non-blocking."""
+    global _listener
+    root = logging.getLogger()
+    root.setLevel(level)
+    if non_blocking:
+        # Records are only enqueued on the calling thread; rendering and
+        # I/O happen on the listener's background thread
+        records: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(
+            records, *handlers, respect_handler_level=True
+        )
+        _listener.start()
+        handlers = [_QueueHandler(records)]
+    for handler in handlers:
+        root.addHandler(handler)
+    _handlers.extend(handlers)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and remove the handlers installed by setup_logging."""
+    global _listener, _configured
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+    root = logging.getLogger()
+    for handler in _handlers:
+        root.removeHandler(handler)
+        handler.close()
+    _handlers.clear()
+    _configured = False
+
+
+atexit.register(shutdown_logging)
+
+
+def is_debug_enabled(logger: Any) -> bool:
+    """Whether a logger would emit debug events.
+
+    Lets hot paths skip building event arguments altogether. Loggers that
+    cannot tell are assumed to be enabled.
+    """
+    check = getattr(logger, "is_enabled_for", None) or getattr(
+        logger, "isEnabledFor", None
+    )
+    if check is None:
+        return True
+    return bool(check(logging.DEBUG))
+
 
 def setup_logging(
     name: str = "unifi_assist",
     log_level: Optional[str] = None,
     log_to_file: Optional[bool] = None,
     log_dir: str = "logs",
+    non_blocking: Optional[bool] = None,
+    max_bytes: Optional[int] = None,
+    rotate_when: Optional[str] = None,
+    backup_count: Optional[int] = None,
+    force: bool = False,
 ) -> BoundLogger:
     """Setup structured logging configuration.
 
+    Logging is configured once per process; later calls return a logger
+    without touching handlers unless ``force`` is set. Loggers are cached
+    on first use, so a logger already used keeps the configuration it was
+    first used with; get a new one after forcing a reconfiguration. Events
+    below the configured level are dropped by the bound logger before any
+    processor runs. Timestamps and exception info are added on the calling
+    thread, but events are rendered by the handlers, so in non-blocking mode
+    the root logger only enqueues them and a background thread renders and
+    writes them.
+
     Args:
         name: Logger name
         log_level: Override log level from env
         log_to_file: Override file logging from env
         log_dir: Directory for log files
+        non_blocking: Override queue-based logging from env (default on)
+        max_bytes: Rotate log files at this size; 0 disables size rotation
+        rotate_when: Rotate log files at this interval, e.g. "midnight" or
+            "H", when not rotating by size
+        backup_count: Number of rotated log files to keep
+        force: Reconfigure even if logging was already set up
     """
+    global _configured
+    if _configured and not force:
+        return structlog.get_logger(name)  # type: ignore[no-any-return]
+    shutdown_logging()
+
     # Get settings from environment or use defaults
-    level = log_level or os.getenv("UNIFI_ASSIST_LOG_LEVEL", "INFO").upper()
+    level = (log_level or os.getenv("UNIFI_ASSIST_LOG_LEVEL") or "INFO").upper()
     to_file = (
         log_to_file
         if log_to_file is not None
-        else bool(int(os.getenv("UNIFI_ASSIST_LOG_TO_FILE", "0")))
+        else _env_flag("UNIFI_ASSIST_LOG_TO_FILE", "0")
     )
-
-    # Configure standard logging for console
-    logging.basicConfig(
-        format="%(message)s",
-        stream=sys.stdout,
-        level=level,
+    queued = (
+        non_blocking
+        if non_blocking is not None
+        else _env_flag("UNIFI_ASSIST_LOG_NON_BLOCKING", "1")
     )
+    if max_bytes is None:
+        max_bytes = int(os.getenv("UNIFI_ASSIST_LOG_MAX_BYTES", "0"))
+    rotate_when = rotate_when or os.getenv("UNIFI_ASSIST_LOG_ROTATE_WHEN")
+    if backup_count is None:
+        backup_count = int(os.getenv("UNIFI_ASSIST_LOG_BACKUP_COUNT", "5"))
 
     # Base processors for all outputs
     shared_processors = [
@@ -46,12 +174,19 @@ def setup_logging(
         structlog.processors.format_exc_info,
     ]
 
-    # Console-specific processors
-    console_processors = shared_processors.copy()
-    if sys.stdout.isatty():
-        console_processors.append(structlog.dev.ConsoleRenderer())
-    else:
-        console_processors.append(JSONRenderer())
+    # Console handler, rendering like the rest in the handler's formatter
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(
+        structlog.stdlib.ProcessorFormatter(
+            processor=(
+                structlog.dev.ConsoleRenderer()
+                if sys.stdout.isatty()
+                else JSONRenderer()
+            ),
+            foreign_pre_chain=shared_processors,  # type: ignore
+        )
+    )
+    handlers: List[logging.Handler] = [console_handler]
 
     # File handlers if enabled
     if to_file:
@@ -59,8 +194,8 @@ def setup_logging(
         log_path.mkdir(exist_ok=True)
 
         # JSON log file handler
-        json_handler = logging.FileHandler(
-            log_path / f"{name}.json.log", encoding="utf-8"
+        json_handler = _file_handler(
+            log_path / f"{name}.json.log", max_bytes, rotate_when, backup_count
         )
         json_handler.setLevel(level)
         json_handler.setFormatter(
@@ -71,8 +206,8 @@ def setup_logging(
         )
 
         # Human-readable log file handler
-        readable_handler = logging.FileHandler(
-            log_path / f"{name}.readable.log", encoding="utf-8"
+        readable_handler = _file_handler(
+            log_path / f"{name}.readable.log", max_bytes, rotate_when, backup_count
         )
         readable_handler.setLevel(level)
         readable_handler.setFormatter(
@@ -82,17 +217,25 @@ def setup_logging(
             )
         )
 
-        # Add both handlers
-        logging.getLogger().addHandler(json_handler)
-        logging.getLogger().addHandler(readable_handler)
+        handlers.extend([json_handler, readable_handler])
+
+    _install(handlers, level, queued)
 
     # Configure structlog
+    # Rendering is left to the handlers' formatters
+    processors: List[Any] = [
+        *shared_processors,
+        structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
+    ]
     structlog.configure(
-        processors=console_processors,  # type: ignore
+        processors=processors,
         context_class=dict,
         logger_factory=structlog.stdlib.LoggerFactory(),
-        wrapper_class=structlog.stdlib.BoundLogger,
+        wrapper_class=structlog.make_filtering_bound_logger(
+            logging.getLevelNamesMapping()[level]
+        ),
         cache_logger_on_first_use=True,
     )
+    _configured = True
 
     return structlog.get_logger(name)  # type: ignore[no-any-return]
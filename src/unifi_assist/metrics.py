@@ -0,0 +1,474 @@
+"""Per-endpoint request latency, throughput and error metrics."""
+
+import asyncio
+import bisect
+import contextlib
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import aiohttp
+
+from .endpoints import TEMPLATES, template_for
+
+# Latency bucket upper bounds in seconds, roughly log-spaced
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# Label for requests to paths outside the known templates, which would
+# otherwise carry site and device IDs into the metric labels
+OTHER_ENDPOINT = "other"
+_KNOWN_TEMPLATES = frozenset(TEMPLATES)
+
+# Request phases, in the order they happen
+PHASES: Tuple[str, ...] = (
+    "pool_wait",
+    "dns",
+    "connect",
+    "ttfb",
+    "download",
+    "decode",
+    "total",
+)
+
+
+class RequestTiming:
+    """Phase timings of a single request.
+
+    Passed to aiohttp as ``trace_request_ctx`` so the trace callbacks of
+    ``timing_trace_config()`` can fill in the connection phases; the client
+    fills in the rest. ``connect`` covers TCP and TLS setup, and ``ttfb``
+    runs from the request start until the response headers arrive.
+    """
+
+    __slots__ = (
+        "start",
+        "mark",
+        "pool_wait",
+        "dns",
+        "connect",
+        "ttfb",
+        "download",
+        "decode",
+        "total",
+        "bytes_received",
+    )
+
+    def __init__(self) -> None:
+        """Start timing a request now."""
+        self.start = self.mark = time.perf_counter()
+        self.pool_wait = self.dns = self.connect = self.ttfb = 0.0
+        self.download = self.decode = self.total = 0.0
+        self.bytes_received = 0
+
+    def lap(self) -> float:
+        """Seconds since the previous lap, or since the start."""
+        now = time.perf_counter()
+        elapsed, self.mark = now - self.mark, now
+        return elapsed
+
+
+def error_reason(exc: BaseException) -> str:
+    """Short failure reason for metrics: the HTTP status or exception type."""
+    if isinstance(exc, aiohttp.ClientResponseError):
+        return str(exc.status)
+    return type(exc).__name__
+
+
+def _timing(ctx: SimpleNamespace) -> Optional[RequestTiming]:
+    """Timing object of a traced request, if the caller supplied one."""
+    timing = ctx.trace_request_ctx
+    return timing if isinstance(timing, RequestTiming) else None
+
+
+@lru_cache(maxsize=1)
+def timing_trace_config() -> aiohttp.TraceConfig:
+    """Trace config recording connection phases into ``RequestTiming``.
+
+    Requests sent without a ``RequestTiming`` are ignored, so the config
+    can be installed on a session shared with uninstrumented clients.
+    """
+    trace_config = aiohttp.TraceConfig()
+
+    def phase_start(name: str) -> Any:
+        async def callback(
+            session: aiohttp.ClientSession, ctx: SimpleNamespace, params: Any
+        ) -> None:
+            setattr(ctx, name, time.perf_counter())
+
+        return callback
+
+    def phase_end(name: str) -> Any:
+        async def callback(
+            session: aiohttp.ClientSession, ctx: SimpleNamespace, params: Any
+        ) -> None:
+            timing = _timing(ctx)
+            if timing is not None:
+                elapsed = time.perf_counter() - getattr(ctx, name)
+                setattr(timing, name, getattr(timing, name) + elapsed)
+
+        return callback
+
+    async def on_request_end(
+        session: aiohttp.ClientSession,
+        ctx: SimpleNamespace,
+        params: aiohttp.TraceRequestEndParams,
+    ) -> None:
+        timing = _timing(ctx)
+        if timing is not None:
+            timing.ttfb = timing.lap()
+
+    trace_config.on_connection_queued_start.append(phase_start("pool_wait"))
+    trace_config.on_connection_queued_end.append(phase_end("pool_wait"))
+    trace_config.on_dns_resolvehost_start.append(phase_start("dns"))
+    trace_config.on_dns_resolvehost_end.append(phase_end("dns"))
+    trace_config.on_connection_create_start.append(phase_start("connect"))
+    trace_config.on_connection_create_end.append(phase_end("connect"))
+    trace_config.on_request_end.append(on_request_end)
+    trace_config.freeze()
+    return trace_config
+
+
+class Histogram:
+    """Latency histogram with fixed bucket bounds."""
+
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """Initialize an empty histogram.
+
+        Args:
+            buckets: Increasing bucket upper bounds in seconds
+        """
+        self.buckets = tuple(buckets)
+        # One extra slot for values above the last bound (+Inf)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record a value."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by interpolating within its bucket.
+
+        Args:
+            q: Quantile between 0 and 1
+
+        Returns:
+            Estimated value, 0 if nothing was recorded
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[index - 1] if index else 0.0
+                if index == len(self.buckets):
+                    return lower
+                fraction = (rank - seen) / count
+                return lower + (self.buckets[index] - lower) * fraction
+            seen += count
+        return self.buckets[-1]
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Bucket bounds and cumulative counts, as exported to Prometheus."""
+        total = 0
+        result = []
+        for bound, count in zip((*self.buckets, float("inf")), self.counts):
+            total += count
+            result.append(("+Inf" if bound == float("inf") else repr(bound), total))
+        return result
+
+
+@dataclass
+class EndpointMetrics:
+    """Metrics for one method and endpoint template.
+
+    Attributes:
+        requests: Number of requests sent
+        errors: Failed requests by reason (HTTP status or exception type)
+        bytes_received: Response body bytes received
+        phases: Latency histogram per request phase
+    """
+
+    buckets: Sequence[float] = DEFAULT_BUCKETS
+    requests: int = 0
+    errors: Dict[str, int] = field(default_factory=dict)
+    bytes_received: int = 0
+    phases: Dict[str, Histogram] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        """Create a histogram for every phase."""
+        self.phases = {phase: Histogram(self.buckets) for phase in PHASES}
+
+    @property
+    def error_count(self) -> int:
+        """Total number of failed requests."""
+        return sum(self.errors.values())
+
+    @property
+    def pool_wait_seconds(self) -> float:
+        """Total time spent waiting for a pooled connection."""
+        return self.phases["pool_wait"].sum
+
+    def observe(self, timing: RequestTiming, error: Optional[str]) -> None:
+        """Record a finished request."""
+        self.requests += 1
+        self.bytes_received += timing.bytes_received
+        if error is not None:
+            self.errors[error] = self.errors.get(error, 0) + 1
+        phases = self.phases
+        for phase in PHASES:
+            phases[phase].observe(getattr(timing, phase))
+
+    def summary(self) -> Dict[str, Any]:
+        """Summarize as a plain dictionary suitable for logging."""
+        total = self.phases["total"]
+        return {
+            "requests": self.requests,
+            "errors": self.error_count,
+            "bytes_received": self.bytes_received,
+            "p50_ms": round(total.quantile(0.5) * 1000, 2),
+            "p95_ms": round(total.quantile(0.95) * 1000, 2),
+            "p99_ms": round(total.quantile(0.99) * 1000, 2),
+            "mean_ms": round(total.sum / total.count * 1000, 2) if total.count else 0,
+            "phase_seconds": {
+                phase: round(histogram.sum, 4)
+                for phase, histogram in self.phases.items()
+            },
+        }
+
+
+def _labels(**labels: str) -> str:
+    """Render Prometheus labels."""
+    escaped = (
+        key + '="' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+        for key, value in labels.items()
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _family(
+    name: str, kind: str, help_text: str, samples: Iterable[Tuple[str, float]]
+) -> List[str]:
+    """Render a Prometheus metric family from label strings and values."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    lines.extend(f"{name}{labels} {value}" for labels, value in samples)
+    return lines
+
+
+def _histogram_samples(
+    histogram: Histogram, **labels: str
+) -> Iterator[Tuple[str, float]]:
+    """Bucket, sum and count samples of a histogram, keyed by label string."""
+    for bound, count in histogram.cumulative():
+        yield "_bucket" + _labels(**labels, le=bound), count
+    yield "_sum" + _labels(**labels), histogram.sum
+    yield "_count" + _labels(**labels), histogram.count
+
+
+class ClientMetrics:
+    """Request metrics grouped by method and endpoint template.
+
+    The client records one observation per request; connection phases come
+    from ``timing_trace_config()``. Recording is a handful of list
+    increments, cheap enough to leave on in production.
+
+    Example:
+        metrics = ClientMetrics()
+        client = UniFiClient(metrics=metrics)
+        ...
+        print(metrics.to_prometheus())
+        metrics.log_summary(client.logger)
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """Initialize empty metrics.
+
+        Args:
+            buckets: Latency histogram bucket upper bounds in seconds
+        """
+        self.buckets = tuple(buckets)
+        self.endpoints: Dict[Tuple[str, str], EndpointMetrics] = {}
+
+    def endpoint(self, method: str, template: str) -> EndpointMetrics:
+        """Metrics for a method and endpoint template, created on first use."""
+        key = (method, template)
+        metrics = self.endpoints.get(key)
+        if metrics is None:
+            metrics = self.endpoints[key] = EndpointMetrics(self.buckets)
+        return metrics
+
+    def observe(
+        self,
+        method: str,
+        path: str,
+        timing: RequestTiming,
+        error: Optional[str] = None,
+    ) -> None:
+        """Record a finished request.
+
+        Args:
+            method: HTTP method
+            path: Request path, grouped by its endpoint template, or under
+                ``OTHER_ENDPOINT`` if it matches none
+            timing: Phase timings of the request
+            error: Failure reason, if the request failed
+        """
+        timing.total = time.perf_counter() - timing.start
+        template = template_for(path)
+        if template not in _KNOWN_TEMPLATES:
+            template = OTHER_ENDPOINT
+        self.endpoint(method, template).observe(timing, error)
+
+    def summary(self) -> Dict[str, Any]:
+        """Summarize all endpoints as a plain dictionary suitable for logging."""
+        return {
+            f"{method} {template}": metrics.summary()
+            for (method, template), metrics in sorted(self.endpoints.items())
+        }
+
+    def log_summary(self, logger: Any) -> None:
+        """Log a summary of all endpoints."""
+        logger.info("request_metrics", endpoints=self.summary())
+
+    def to_prometheus(self, prefix: str = "unifi_client") -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        items = [
+            (_labels(method=method, endpoint=template), method, template, metrics)
+            for (method, template), metrics in sorted(self.endpoints.items())
+        ]
+        lines = _family(
+            f"{prefix}_requests_total",
+            "counter",
+            "Requests sent.",
+            ((labels, metrics.requests) for labels, _, _, metrics in items),
+        )
+        lines += _family(
+            f"{prefix}_request_errors_total",
+            "counter",
+            "Failed requests by reason.",
+            (
+                (_labels(method=method, endpoint=template, reason=reason), count)
+                for _, method, template, metrics in items
+                for reason, count in sorted(metrics.errors.items())
+            ),
+        )
+        lines += _family(
+            f"{prefix}_response_bytes_total",
+            "counter",
+            "Response body bytes received.",
+            ((labels, metrics.bytes_received) for labels, _, _, metrics in items),
+        )
+        lines += _family(
+            f"{prefix}_request_phase_seconds",
+            "histogram",
+            "Request latency by phase.",
+            (
+                sample
+                for _, method, template, metrics in items
+                for phase, histogram in metrics.phases.items()
+                for sample in _histogram_samples(
+                    histogram, method=method, endpoint=template, phase=phase
+                )
+            ),
+        )
+        return "\n".join(lines) + "\n"
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop runs scheduled callbacks.
+
+    A background task sleeps for ``interval`` and records how much later
+    than requested it woke up. Lag is time the loop spent in synchronous
+    work, such as decoding a large response, when every other coroutine
+    was stalled.
+
+    Example:
+        async with LoopLagMonitor() as lag:
+            await crawl()
+        print(lag.summary())
+    """
+
+    def __init__(
+        self, interval: float = 0.005, buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        """Initialize the monitor.
+
+        Args:
+            interval: Seconds between samples
+            buckets: Lag histogram bucket upper bounds in seconds
+        """
+        self.interval = interval
+        self.histogram = Histogram(buckets)
+        self.max_lag = 0.0
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def start(self) -> None:
+        """Start sampling on the running loop."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._sample())
+
+    async def stop(self) -> None:
+        """Stop sampling."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _sample(self) -> None:
+        """Sleep repeatedly and record the overshoot."""
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - start - self.interval)
+            self.histogram.observe(lag)
+            self.max_lag = max(self.max_lag, lag)
+
+    def summary(self) -> Dict[str, Any]:
+        """Summarize the lag as a plain dictionary suitable for logging."""
+        # Bucket interpolation can overshoot the largest lag actually seen
+        p99 = min(self.histogram.quantile(0.99), self.max_lag)
+        return {
+            "samples": self.histogram.count,
+            "mean_ms": round(
+                self.histogram.sum / max(self.histogram.count, 1) * 1000, 3
+            ),
+            "p99_ms": round(p99 * 1000, 3),
+            "max_ms": round(self.max_lag * 1000, 3),
+        }
+
+    async def __aenter__(self) -> "LoopLagMonitor":
+        """Start sampling on context entry."""
+        self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[type],
+        exc_val: Optional[Exception],
+        exc_tb: Optional[Any],
+    ) -> None:
+        """Stop sampling on context exit."""
+        await self.stop()
@@ -0,0 +1,471 @@
+"""Local mock UniFi controller generated from the OpenAPI spec."""
+
+import asyncio
+import hashlib
+import json
+import random
+from dataclasses import dataclass, field
+from importlib import resources
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import structlog
+from aiohttp import web
+
+from . import endpoints
+
+if TYPE_CHECKING:
+    from .client import UniFiClient
+
+# Packaged into the wheel from api_spec/, see pyproject.toml
+SPEC_RESOURCE = "network_api.json"
+SOURCE_SPEC = Path(__file__).parents[2] / "api_spec" / SPEC_RESOURCE
+MOCK_API_KEY = "mock-api-key"
+
+Handler = Callable[[web.Request], Awaitable[web.StreamResponse]]
+
+DEVICE_MODELS = ("U6-Pro", "U6-LR", "USW-24-PoE", "USW-Lite-8-PoE", "UDM-Pro")
+CLIENT_TYPES = ("WIRELESS", "WIRELESS", "WIRED")
+
+
+@dataclass
+class MockStats:
+    """Requests served by the mock controller.
+
+    Attributes:
+        requests: Requests per endpoint template
+        errors: Injected errors per endpoint template
+        not_modified: Conditional requests answered with 304 Not Modified
+        actions: Device actions received, as (device ID, body) pairs
+    """
+
+    requests: Dict[str, int] = field(default_factory=dict)
+    errors: Dict[str, int] = field(default_factory=dict)
+    not_modified: int = 0
+    actions: List[Any] = field(default_factory=list)
+
+    @property
+    def total(self) -> int:
+        """Total number of requests served."""
+        return sum(self.requests.values())
+
+
+def default_spec() -> Dict[str, Any]:
+    """The bundled UniFi Network API spec.
+
+    Installed packages carry it as package data; a source checkout reads
+    it from ``api_spec/``.
+    """
+    resource = resources.files(__package__) / SPEC_RESOURCE
+    if resource.is_file():
+        return json.loads(resource.read_text())  # type: ignore[no-any-return]
+    return json.loads(SOURCE_SPEC.read_text())  # type: ignore[no-any-return]
+
+
+def _mac(index: int, prefix: str) -> str:
+    """Deterministic MAC address for a synthetic record."""
+    octets = [index >> shift & 255 for shift in (16, 8, 0)]
+    return prefix + ":" + ":".join(f"{octet:02x}" for octet in octets)
+
+
+class Fleet:
+    """Deterministic synthetic fleet of sites, devices and clients.
+
+    Records are generated on demand from their index, so a fleet of any
+    size costs no memory until it is served. The properties of each record
+    are the ones the spec declares for the endpoint, plus the extra fields
+    the client's models read.
+    """
+
+    def __init__(self, sites: int = 1, devices: int = 10, clients: int = 100):
+        """Initialize the fleet.
+
+        Args:
+            sites: Number of sites
+            devices: Devices per site
+            clients: Clients per site
+        """
+        self.sites = sites
+        self.devices = devices
+        self.clients = clients
+        self.states: Dict[str, str] = {}
+
+    def site_id(self, site: int) -> str:
+        """ID of the site with the given index."""
+        return f"site-{site:04d}"
+
+    def site_index(self, site_id: str) -> Optional[int]:
+        """Index of a site, or None if the site does not exist."""
+        index = _index(site_id, "site-")
+        return index if index is not None and index < self.sites else None
+
+    def device_index(self, site: int, device_id: str) -> Optional[int]:
+        """Index of a device within a site, or None if it does not exist."""
+        index = _index(device_id, f"{self.site_id(site)}-device-")
+        return index if index is not None and index < self.devices else None
+
+    def site(self, site: int) -> Dict[str, Any]:
+        """Site record."""
+        return {"id": self.site_id(site), "name": f"Site {site}"}
+
+    def device(self, site: int, index: int) -> Dict[str, Any]:
+        """Device summary record."""
+        device_id = f"{self.site_id(site)}-device-{index:06d}"
+        number = site * self.devices + index
+        return {
+            "id": device_id,
+            "name": f"Device {index}",
+            "model": DEVICE_MODELS[index % len(DEVICE_MODELS)],
+            "macAddress": _mac(number, "f4:e2:c6"),
+            "ipAddress": f"10.{site % 256}.{index >> 8 & 255}.{index & 255}",
+            "state": self.states.get(device_id, "ONLINE"),
+            "firmwareVersion": "7.0.76",
+        }
+
+    def device_details(self, site: int, index: int) -> Dict[str, Any]:
+        """Device details record."""
+        return {
+            **self.device(site, index),
+            "supported": True,
+            "firmwareUpdatable": index % 7 == 0,
+            "provisionedAt": "2025-01-01T00:00:00Z",
+            "configurationId": f"config-{index % 16}",
+            "uplink": {"deviceId": self.device(site, index // 8)["id"]},
+            "features": {"switching": None} if index % 2 else {"accessPoint": None},
+            "interfaces": {
+                "ports": [{"idx": port, "state": "UP"} for port in range(4)]
+            },
+        }
+
+    def device_statistics(self, site: int, index: int) -> Dict[str, Any]:
+        """Device statistics record."""
+        return {
+            "uptimeSec": 86_400 + index,
+            "lastHeartbeatAt": "2025-01-01T00:00:00Z",
+            "cpuUtilizationPct": float(index % 100),
+            "memoryUtilizationPct": float((index * 7) % 100),
+            "loadAverage1Min": 0.5,
+            "loadAverage5Min": 0.4,
+            "loadAverage15Min": 0.3,
+            "uplink": {"txRateBps": 1_000 * index, "rxRateBps": 2_000 * index},
+        }
+
+    def client(self, site: int, index: int) -> Dict[str, Any]:
+        """Client record."""
+        number = site * self.clients + index
+        return {
+            "id": f"{self.site_id(site)}-client-{index:08d}",
+            "name": f"Client {index}",
+            "macAddress": _mac(number, "aa:bb:cc"),
+            "ipAddress": f"10.{128 + site % 128}.{index >> 8 & 255}.{index & 255}",
+            "type": CLIENT_TYPES[index % len(CLIENT_TYPES)],
+            "uplinkDeviceId": self.device(site, index % max(self.devices, 1))["id"],
+            "connectedAt": "2025-01-01T00:00:00Z",
+        }
+
+
+def _index(identifier: str, prefix: str) -> Optional[int]:
+    """Numeric suffix of a synthetic ID with the given prefix."""
+    if not identifier.startswith(prefix):
+        return None
+    suffix = identifier[len(prefix) :]
+    return int(suffix) if suffix.isdigit() else None
+
+
+def _project(record: Dict[str, Any], schema: Optional[Dict[str, Any]]) -> Any:
+    """Shape a record like the spec schema, keeping undeclared extras."""
+    if schema is None:
+        return record
+    properties = schema.get("properties", {})
+    for name, prop in properties.items():
+        if name not in record:
+            record[name] = f"{name}-mock" if prop.get("type") == "string" else None
+    return record
+
+
+class MockController:
+    """Local controller serving every path of the OpenAPI spec.
+
+    Routes, methods and response record shapes come from the spec; records
+    are synthesized by ``Fleet``. The server checks the ``X-API-KEY``
+    header, supports ``offset``/``limit`` pagination with ``totalCount``,
+    answers ``If-None-Match`` with 304 Not Modified, and can add latency,
+    jitter and a random error rate to every response.
+
+    Example:
+        async with MockController(sites=2, devices=1_000) as mock:
+            async with mock.client() as client:
+                sites = await client.get_sites()
+    """
+
+    def __init__(
+        self,
+        sites: int = 1,
+        devices: int = 10,
+        clients: int = 100,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        restart_time: Optional[float] = None,
+        seed: Optional[int] = None,
+        api_key: str = MOCK_API_KEY,
+        spec: Union[str, Path, Dict[str, Any], None] = None,
+    ):
+        """Initialize the mock controller.
+
+        Args:
+            sites: Number of sites
+            devices: Devices per site
+            clients: Clients per site
+            latency: Seconds added to every response
+            jitter: Maximum random seconds added on top of ``latency``
+            error_rate: Fraction of requests answered with ``error_status``
+            error_status: HTTP status of injected errors
+            restart_time: Seconds a restarted device stays RESTARTING before
+                it is ONLINE again; it never comes back if not given
+            seed: Seed for jitter and error injection
+            api_key: API key clients must send
+            spec: OpenAPI spec, as a path or a decoded document; the bundled
+                UniFi Network API spec if not given
+        """
+        if spec is None:
+            self.spec = default_spec()
+        elif isinstance(spec, dict):
+            self.spec = spec
+        else:
+            self.spec = json.loads(Path(spec).read_text())
+        self.fleet = Fleet(sites, devices, clients)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.restart_time = restart_time
+        self.api_key = api_key
+        self.stats = MockStats()
+        self._random = random.Random(seed)
+        self._runner: Optional[web.AppRunner] = None
+        self._site: Optional[web.TCPSite] = None
+        self.host: Optional[str] = None
+        self.app = self.build_app()
+
+    def build_app(self) -> web.Application:
+        """Create the aiohttp application with one route per spec operation."""
+        handlers: Dict[str, Handler] = {
+            endpoints.SITES: self._sites,
+            endpoints.DEVICES: self._devices,
+            endpoints.DEVICE: self._device,
+            endpoints.DEVICE_STATISTICS: self._statistics,
+            endpoints.DEVICE_ACTIONS: self._action,
+            endpoints.CLIENTS: self._clients,
+            endpoints.INFO: self._info,
+        }
+        app = web.Application(middlewares=[self._middleware])
+        for path, operations in self.spec["paths"].items():
+            handler = handlers.get(endpoints.template_for(path))
+            if handler is None:
+                continue
+            for method in operations:
+                app.router.add_route(method.upper(), path, handler)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving.
+
+        Args:
+            host: Address to listen on
+            port: Port to listen on, 0 for any free port
+
+        Returns:
+            ``host:port`` to pass to ``UniFiClient``
+        """
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        self._site = web.TCPSite(self._runner, host, port)
+        await self._site.start()
+        server = self._runner.addresses[0]
+        self.host = f"{server[0]}:{server[1]}"
+        return self.host
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "MockController":
+        """Start serving on context entry."""
+        await self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[type],
+        exc_val: Optional[Exception],
+        exc_tb: Optional[Any],
+    ) -> None:
+        """Stop serving on context exit."""
+        await self.stop()
+
+    def client(self, **kwargs: Any) -> "UniFiClient":
+        """Create a ``UniFiClient`` talking to this controller over HTTP.
+
+        Args:
+            **kwargs: Extra ``UniFiClient`` arguments
+        """
+        from .client import UniFiClient
+
+        if self.host is None:
+            raise RuntimeError("Mock controller is not running")
+        kwargs.setdefault("api_key", self.api_key)
+        kwargs.setdefault("logger", structlog.get_logger("mock_controller"))
+        return UniFiClient(host=self.host, scheme="http", **kwargs)
+
+    def schema(self, template: str, method: str = "get") -> Optional[Dict[str, Any]]:
+        """Record schema the spec declares for an endpoint, if any."""
+        operation = self.spec["paths"].get(f"/{template}", {}).get(method, {})
+        content = operation.get("responses", {}).get("200", {}).get("content", {})
+        schema = content.get("application/json", {}).get("schema")
+        if schema is None:
+            return None
+        data = schema.get("properties", {}).get("data")
+        return data.get("items") if data is not None else schema  # type: ignore[no-any-return]
+
+    @web.middleware
+    async def _middleware(
+        self, request: web.Request, handler: Handler
+    ) -> web.StreamResponse:
+        """Authenticate, inject latency and errors, and count requests."""
+        template = endpoints.template_for(request.path)
+        self.stats.requests[template] = self.stats.requests.get(template, 0) + 1
+        delay = self.latency + self._random.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if request.headers.get("X-API-KEY") != self.api_key:
+            return web.json_response({"message": "Unauthorized"}, status=401)
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.stats.errors[template] = self.stats.errors.get(template, 0) + 1
+            return web.json_response(
+                {"message": "Injected error"}, status=self.error_status
+            )
+        return await handler(request)
+
+    def _respond(self, request: web.Request, data: Dict[str, Any]) -> web.Response:
+        """Serialize a response, answering conditional requests with 304."""
+        body = json.dumps(data, separators=(",", ":")).encode()
+        etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        if request.headers.get("If-None-Match") == etag:
+            self.stats.not_modified += 1
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(
+            body=body, content_type="application/json", headers={"ETag": etag}
+        )
+
+    def _page(
+        self,
+        request: web.Request,
+        total: int,
+        record: Callable[[int], Dict[str, Any]],
+        template: str,
+    ) -> web.Response:
+        """Serve a list endpoint, paginated if ``offset``/``limit`` are given."""
+        schema = self.schema(template)
+        if "limit" not in request.query and "offset" not in request.query:
+            items = [_project(record(index), schema) for index in range(total)]
+            return self._respond(request, {"data": items})
+
+        offset = max(0, int(request.query.get("offset", 0)))
+        limit = max(0, int(request.query.get("limit", 25)))
+        stop = min(total, offset + limit)
+        items = [_project(record(index), schema) for index in range(offset, stop)]
+        return self._respond(
+            request,
+            {
+                "offset": offset,
+                "limit": limit,
+                "count": len(items),
+                "totalCount": total,
+                "data": items,
+            },
+        )
+
+    def _site_index(self, request: web.Request) -> int:
+        """Site index from the path, raising 404 for unknown sites."""
+        site = self.fleet.site_index(request.match_info["siteId"])
+        if site is None:
+            raise web.HTTPNotFound()
+        return site
+
+    def _device_index(self, request: web.Request) -> Tuple[int, int]:
+        """Site and device index from the path, raising 404 if unknown."""
+        site = self._site_index(request)
+        device = self.fleet.device_index(site, request.match_info["deviceId"])
+        if device is None:
+            raise web.HTTPNotFound()
+        return site, device
+
+    async def _sites(self, request: web.Request) -> web.Response:
+        """List sites."""
+        return self._page(request, self.fleet.sites, self.fleet.site, endpoints.SITES)
+
+    async def _devices(self, request: web.Request) -> web.Response:
+        """List devices of a site."""
+        site = self._site_index(request)
+        return self._page(
+            request,
+            self.fleet.devices,
+            lambda index: self.fleet.device(site, index),
+            endpoints.DEVICES,
+        )
+
+    async def _clients(self, request: web.Request) -> web.Response:
+        """List clients of a site."""
+        site = self._site_index(request)
+        return self._page(
+            request,
+            self.fleet.clients,
+            lambda index: self.fleet.client(site, index),
+            endpoints.CLIENTS,
+        )
+
+    async def _device(self, request: web.Request) -> web.Response:
+        """Device details."""
+        return self._respond(
+            request, self.fleet.device_details(*self._device_index(request))
+        )
+
+    async def _statistics(self, request: web.Request) -> web.Response:
+        """Latest device statistics."""
+        return self._respond(
+            request, self.fleet.device_statistics(*self._device_index(request))
+        )
+
+    async def _action(self, request: web.Request) -> web.Response:
+        """Perform a device action."""
+        self._device_index(request)
+        body = await request.json()
+        device_id = request.match_info["deviceId"]
+        self.stats.actions.append((device_id, body))
+        if body.get("action") == "RESTART":
+            self.fleet.states[device_id] = "RESTARTING"
+            if self.restart_time is not None:
+                asyncio.get_running_loop().call_later(
+                    self.restart_time, self.fleet.states.pop, device_id, None
+                )
+        return web.json_response({"action": body.get("action"), "status": "OK"})
+
+    async def _info(self, request: web.Request) -> web.Response:
+        """System information."""
+        version = self.spec.get("info", {}).get("version", "0.0.0")
+        info = _project({"applicationVersion": version}, self.schema(endpoints.INFO))
+        return self._respond(request, info)
@@ -0,0 +1,280 @@
+"""Typed, copy-free views over UniFi API response records."""
+
+from typing import (
+    Any,
+    ClassVar,
+    Dict,
+    Generic,
+    Iterator,
+    List,
+    Sequence,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    overload,
+)
+
+from .decoding import JsonLoads, default_json_loads
+
+T = TypeVar("T")
+M = TypeVar("M", bound="Model")
+
+
+class ModelValidationError(ValueError):
+    """Raised when a record does not match its model."""
+
+
+class Field(Generic[T]):
+    """Typed attribute backed by a key of the underlying record.
+
+    Values are read from the wrapped dictionary on access, so building a
+    model costs one small object and no per-field work.
+    """
+
+    def __init__(self, key: str, kind: Type[T], required: bool = False):
+        """Initialize the field.
+
+        Args:
+            key: Key in the API record
+            kind: Expected value type
+            required: Whether validation requires the key to be present
+        """
+        self.key = key
+        self.kind = kind
+        self.required = required
+
+    @overload
+    def __get__(self, instance: None, owner: Type["Model"]) -> "Field[T]": ...
+
+    @overload
+    def __get__(self, instance: "Model", owner: Type["Model"]) -> Optional[T]: ...
+
+    def __get__(
+        self, instance: Optional["Model"], owner: Type["Model"]
+    ) -> Union["Field[T]", Optional[T]]:
+        """Read the value from the record."""
+        if instance is None:
+            return self
+        return instance.raw.get(self.key)
+
+    def check(self, record: Dict[str, Any]) -> Optional[str]:
+        """Describe why a record violates this field, if it does."""
+        value = record.get(self.key)
+        if value is None:
+            return f"missing {self.key}" if self.required else None
+        if self.kind is float and isinstance(value, int):
+            return None
+        if not isinstance(value, self.kind):
+            return (
+                f"{self.key} is {type(value).__name__}, expected {self.kind.__name__}"
+            )
+        return None
+
+
+class Model:
+    """Base class for typed views over API records.
+
+    A model wraps the decoded dictionary without copying it and uses
+    ``__slots__`` so an instance holds a single reference. Validation is
+    lazy: nothing is checked until ``validate()`` is called.
+    """
+
+    __slots__ = ("raw",)
+    fields: ClassVar[Tuple[Field[Any], ...]] = ()
+
+    def __init__(self, raw: Dict[str, Any]):
+        """Wrap an API record.
+
+        Args:
+            raw: Decoded record, used as-is
+        """
+        self.raw = raw
+
+    def __init_subclass__(cls) -> None:
+        """Collect the fields declared on a model."""
+        super().__init_subclass__()
+        cls.fields = tuple(
+            value for value in vars(cls).values() if isinstance(value, Field)
+        )
+
+    def __repr__(self) -> str:
+        """Show the wrapped record."""
+        return f"{type(self).__name__}({self.raw!r})"
+
+    def __eq__(self, other: object) -> bool:
+        """Models are equal when they wrap equal records."""
+        return (
+            isinstance(other, Model)
+            and type(other) is type(self)
+            and other.raw == self.raw
+        )
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Read any key of the underlying record."""
+        return self.raw.get(key, default)
+
+    def validate(self: M) -> M:
+        """Check the record against the declared fields.
+
+        Returns:
+            The model itself
+
+        Raises:
+            ModelValidationError: If a field is missing or has the wrong type
+        """
+        problems = [
+            problem for field in self.fields if (problem := field.check(self.raw))
+        ]
+        if problems:
+            raise ModelValidationError(
+                f"Invalid {type(self).__name__}: {', '.join(problems)}"
+            )
+        return self
+
+    @classmethod
+    def from_bytes(cls: Type[M], body: bytes, loads: Optional[JsonLoads] = None) -> M:
+        """Decode a single record straight from a JSON body.
+
+        Args:
+            body: Raw JSON response body
+            loads: JSON decoder, defaults to the fastest available
+
+        Returns:
+            Model wrapping the decoded record
+        """
+        return cls((loads or default_json_loads())(body))
+
+    @classmethod
+    def list_from_response(cls: Type[M], response: Dict[str, Any]) -> "ModelList[M]":
+        """Wrap the records of a decoded ``{"data": [...]}`` response.
+
+        Args:
+            response: Decoded list response
+
+        Returns:
+            Lazy sequence of models sharing the record dictionaries
+        """
+        return ModelList(cls, response.get("data", []))
+
+    @classmethod
+    def list_from_bytes(
+        cls: Type[M], body: bytes, loads: Optional[JsonLoads] = None
+    ) -> "ModelList[M]":
+        """Decode a ``{"data": [...]}`` list response straight from bytes.
+
+        Args:
+            body: Raw JSON response body
+            loads: JSON decoder, defaults to the fastest available
+
+        Returns:
+            Lazy sequence of models wrapping the decoded records
+        """
+        return cls.list_from_response((loads or default_json_loads())(body))
+
+
+class ModelList(Sequence[M]):
+    """Read-only sequence of models over a list of records.
+
+    Models are created on access, so wrapping a response of any size is
+    free and records that are never looked at cost nothing extra.
+    """
+
+    __slots__ = ("model", "records")
+
+    def __init__(self, model: Type[M], records: List[Dict[str, Any]]):
+        """Wrap a list of records.
+
+        Args:
+            model: Model class to view records as
+            records: Decoded records, used as-is
+        """
+        self.model = model
+        self.records = records
+
+    def __len__(self) -> int:
+        """Number of records."""
+        return len(self.records)
+
+    @overload
+    def __getitem__(self, index: int) -> M: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "ModelList[M]": ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[M, "ModelList[M]"]:
+        """View one record, or a slice of records, as models."""
+        if isinstance(index, slice):
+            return ModelList(self.model, self.records[index])
+        return self.model(self.records[index])
+
+    def __iter__(self) -> Iterator[M]:
+        """Iterate over the records as models."""
+        model = self.model
+        for record in self.records:
+            yield model(record)
+
+    def validate(self) -> "ModelList[M]":
+        """Validate every record.
+
+        Returns:
+            The sequence itself
+
+        Raises:
+            ModelValidationError: If any record is invalid
+        """
+        for item in self:
+            item.validate()
+        return self
+
+
+class Site(Model):
+    """A site managed by the controller."""
+
+    __slots__ = ()
+
+    id = Field("id", str, required=True)
+    name = Field("name", str)
+
+
+class Device(Model):
+    """An adopted UniFi device."""
+
+    __slots__ = ()
+
+    id = Field("id", str, required=True)
+    name = Field("name", str)
+    model = Field("model", str)
+    mac_address = Field("macAddress", str)
+    ip_address = Field("ipAddress", str)
+    state = Field("state", str)
+    firmware_version = Field("firmwareVersion", str)
+
+
+class Client(Model):
+    """A client connected to the network."""
+
+    __slots__ = ()
+
+    id = Field("id", str, required=True)
+    name = Field("name", str)
+    mac_address = Field("macAddress", str)
+    ip_address = Field("ipAddress", str)
+    type = Field("type", str)
+    uplink_device_id = Field("uplinkDeviceId", str)
+    connected_at = Field("connectedAt", str)
+
+
+class DeviceStatistics(Model):
+    """Latest statistics reported by a device."""
+
+    __slots__ = ()
+
+    uptime_sec = Field("uptimeSec", int)
+    cpu_utilization_pct = Field("cpuUtilizationPct", float)
+    memory_utilization_pct = Field("memoryUtilizationPct", float)
+    load_average_1min = Field("loadAverage1Min", float)
+    load_average_5min = Field("loadAverage5Min", float)
+    load_average_15min = Field("loadAverage15Min", float)
+    last_heartbeat_at = Field("lastHeartbeatAt", str)
@@ -0,0 +1,398 @@
+"""Continuous device statistics polling into ring-buffer time series."""
+
+import asyncio
+import math
+import time
+from array import array
+from dataclasses import dataclass
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncGenerator,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+if TYPE_CHECKING:
+    from .client import UniFiClient
+
+DEFAULT_POLL_INTERVAL = 30.0
+DEFAULT_CAPACITY = 120
+DEFAULT_POLL_CONCURRENCY = 16
+
+STATISTIC_FIELDS: Tuple[str, ...] = (
+    "uptimeSec",
+    "cpuUtilizationPct",
+    "memoryUtilizationPct",
+    "loadAverage1Min",
+    "loadAverage5Min",
+    "loadAverage15Min",
+    "uplink.txRateBps",
+    "uplink.rxRateBps",
+)
+
+
+def _lookup(record: Mapping[str, Any], path: str) -> float:
+    """Read a numeric value by dotted path, NaN if missing."""
+    value: Any = record
+    for key in path.split("."):
+        if not isinstance(value, Mapping):
+            return math.nan
+        value = value.get(key)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return math.nan
+
+
+@dataclass(frozen=True)
+class Rollup:
+    """Summary of one field over a window of samples."""
+
+    count: int
+    minimum: float
+    maximum: float
+    mean: float
+    p95: float
+
+
+class Sample(NamedTuple):
+    """A statistics sample delivered to subscribers."""
+
+    device_id: str
+    timestamp: float
+    values: Tuple[float, ...]
+
+
+class TimeSeries:
+    """Fixed-size ring buffer of numeric samples for one device.
+
+    All samples live in preallocated ``array('d')`` storage, one row of
+    ``len(fields)`` values per sample, so recording a sample allocates
+    nothing. Missing values are stored as NaN and skipped by rollups.
+    """
+
+    def __init__(self, fields: Sequence[str], capacity: int = DEFAULT_CAPACITY):
+        """Initialize an empty series.
+
+        Args:
+            fields: Dotted paths of the statistics to keep
+            capacity: Number of samples kept before the oldest is overwritten
+        """
+        if capacity < 1:
+            raise ValueError("Capacity must be at least 1")
+
+        self.fields = tuple(fields)
+        self.capacity = capacity
+        self._columns = {name: index for index, name in enumerate(self.fields)}
+        self._timestamps = array("d", bytes(8 * capacity))
+        self._values = array("d", bytes(8 * capacity * len(self.fields)))
+        self._head = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Number of samples held."""
+        return self._size
+
+    def append(self, timestamp: float, record: Mapping[str, Any]) -> None:
+        """Record the statistics from an API response.
+
+        Args:
+            timestamp: Sample time in seconds
+            record: ``statistics/latest`` response
+        """
+        width = len(self.fields)
+        offset = self._head * width
+        values = self._values
+        for index, path in enumerate(self.fields):
+            values[offset + index] = _lookup(record, path)
+        self._timestamps[self._head] = timestamp
+        self._head = (self._head + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def _slots(self, since: Optional[float] = None) -> Iterator[int]:
+        """Buffer slots from oldest to newest, optionally only recent ones."""
+        start = (self._head - self._size) % self.capacity
+        for step in range(self._size):
+            slot = (start + step) % self.capacity
+            if since is None or self._timestamps[slot] >= since:
+                yield slot
+
+    def latest(self) -> Optional[Tuple[float, Tuple[float, ...]]]:
+        """Most recent timestamp and values, if any."""
+        if not self._size:
+            return None
+        slot = (self._head - 1) % self.capacity
+        width = len(self.fields)
+        return (
+            self._timestamps[slot],
+            tuple(self._values[slot * width : (slot + 1) * width]),
+        )
+
+    def values(self, field: str, window: Optional[float] = None) -> List[float]:
+        """Values of one field, oldest first, skipping missing samples.
+
+        Args:
+            field: Dotted path of the statistic
+            window: Only include samples from the last ``window`` seconds,
+                measured from the newest sample
+
+        Returns:
+            Field values
+        """
+        column = self._column(field)
+        since = self._window_start(window)
+        width = len(self.fields)
+        result = []
+        for slot in self._slots(since):
+            value = self._values[slot * width + column]
+            if not math.isnan(value):
+                result.append(value)
+        return result
+
+    def rollup(self, field: str, window: Optional[float] = None) -> Optional[Rollup]:
+        """Summarize one field over a window.
+
+        Args:
+            field: Dotted path of the statistic
+            window: Seconds to look back from the newest sample, or all samples
+
+        Returns:
+            Rollup, or None if the window holds no values
+        """
+        values = self.values(field, window)
+        if not values:
+            return None
+        ordered = sorted(values)
+        rank = max(0, math.ceil(0.95 * len(ordered)) - 1)
+        return Rollup(
+            count=len(ordered),
+            minimum=ordered[0],
+            maximum=ordered[-1],
+            mean=math.fsum(ordered) / len(ordered),
+            p95=ordered[rank],
+        )
+
+    def _column(self, field: str) -> int:
+        """Column index of a field."""
+        try:
+            return self._columns[field]
+        except KeyError:
+            raise KeyError(f"Unknown statistic: {field}") from None
+
+    def _window_start(self, window: Optional[float]) -> Optional[float]:
+        """Earliest timestamp included in a window."""
+        latest = self.latest()
+        if window is None or latest is None:
+            return None
+        return latest[0] - window
+
+    def nbytes(self) -> int:
+        """Memory used by the preallocated buffers."""
+        return (len(self._timestamps) + len(self._values)) * 8
+
+
+class StatisticsPoller:
+    """Samples statistics for every device at a fixed interval.
+
+    Devices are discovered from all sites on start and every
+    ``discovery_interval`` seconds. Each round fetches
+    ``statistics/latest`` for all devices with bounded concurrency and
+    records the values in per-device ``TimeSeries`` ring buffers. Rounds
+    are scheduled at fixed times, so slow rounds do not make the interval
+    drift.
+
+    Example:
+        async with StatisticsPoller(client, interval=10) as poller:
+            async for sample in poller.subscribe():
+                cpu = poller.series(sample.device_id).rollup(
+                    "cpuUtilizationPct", window=300
+                )
+    """
+
+    def __init__(
+        self,
+        client: "UniFiClient",
+        interval: float = DEFAULT_POLL_INTERVAL,
+        capacity: int = DEFAULT_CAPACITY,
+        fields: Sequence[str] = STATISTIC_FIELDS,
+        concurrency: int = DEFAULT_POLL_CONCURRENCY,
+        discovery_interval: float = 300.0,
+    ):
+        """Initialize the poller.
+
+        Args:
+            client: Client to poll with
+            interval: Seconds between polling rounds
+            capacity: Samples kept per device
+            fields: Dotted paths of the statistics to keep
+            concurrency: Maximum statistics requests in flight
+            discovery_interval: Seconds between device list refreshes
+        """
+        if interval <= 0:
+            raise ValueError("Interval must be positive")
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1")
+
+        self.client = client
+        self.interval = interval
+        self.capacity = capacity
+        self.fields = tuple(fields)
+        self.discovery_interval = discovery_interval
+        self.rounds = 0
+        self.errors = 0
+        self._devices: Dict[str, str] = {}
+        self._series: Dict[str, TimeSeries] = {}
+        self._subscribers: Set["asyncio.Queue[Sample]"] = set()
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._task: Optional[asyncio.Task[None]] = None
+        self._last_discovery = -math.inf
+
+    @property
+    def devices(self) -> Dict[str, str]:
+        """Polled device IDs mapped to their site IDs."""
+        return dict(self._devices)
+
+    def series(self, device_id: str) -> TimeSeries:
+        """Time series for a device.
+
+        Raises:
+            KeyError: If the device has not been sampled
+        """
+        return self._series[device_id]
+
+    async def start(self) -> None:
+        """Start polling in the background."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop polling."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def __aenter__(self) -> "StatisticsPoller":
+        """Start polling on context entry."""
+        await self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[type],
+        exc_val: Optional[Exception],
+        exc_tb: Optional[Any],
+    ) -> None:
+        """Stop polling on context exit."""
+        await self.stop()
+
+    async def subscribe(
+        self, max_pending: int = 10_000
+    ) -> AsyncGenerator[Sample, None]:
+        """Receive every new sample as it is recorded.
+
+        Args:
+            max_pending: Samples buffered for a slow subscriber before the
+                oldest are dropped
+
+        Yields:
+            New samples
+        """
+        queue: asyncio.Queue[Sample] = asyncio.Queue(maxsize=max_pending)
+        self._subscribers.add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers.discard(queue)
+
+    async def poll_once(self) -> int:
+        """Run a single polling round.
+
+        Returns:
+            Number of devices sampled successfully
+        """
+        loop = asyncio.get_running_loop()
+        if loop.time() - self._last_discovery >= self.discovery_interval:
+            await self.discover()
+        results = await asyncio.gather(
+            *(
+                self._sample(site_id, device_id)
+                for device_id, site_id in self._devices.items()
+            )
+        )
+        self.rounds += 1
+        return sum(results)
+
+    async def discover(self) -> None:
+        """Refresh the list of devices to poll."""
+        devices: Dict[str, str] = {}
+        sites = await self.client.get_sites()
+        for site in sites.get("data", []):
+            site_id = site.get("id")
+            if not site_id:
+                continue
+            async for device in self.client.iter_devices(site_id):
+                if device.get("id"):
+                    devices[device["id"]] = site_id
+        self._devices = devices
+        for device_id in set(self._series) - set(devices):
+            del self._series[device_id]
+        self._last_discovery = asyncio.get_running_loop().time()
+        self.client.logger.debug("poller_discovered_devices", devices=len(devices))
+
+    async def _run(self) -> None:
+        """Poll at fixed times until cancelled."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        while True:
+            try:
+                await self.poll_once()
+            except Exception as exc:
+                self.errors += 1
+                self.client.logger.warning("poller_round_failed", error=str(exc))
+            deadline += self.interval
+            now = loop.time()
+            if deadline < now:
+                # Skip rounds that were missed instead of bursting to catch up
+                deadline = now + self.interval - (now - deadline) % self.interval
+            await asyncio.sleep(deadline - now)
+
+    async def _sample(self, site_id: str, device_id: str) -> bool:
+        """Fetch and record statistics for one device."""
+        async with self._semaphore:
+            try:
+                stats = await self.client.get_device_statistics(site_id, device_id)
+            except Exception as exc:
+                self.errors += 1
+                self.client.logger.debug(
+                    "poller_sample_failed", device_id=device_id, error=str(exc)
+                )
+                return False
+
+        timestamp = time.time()
+        series = self._series.get(device_id)
+        if series is None:
+            series = self._series[device_id] = TimeSeries(self.fields, self.capacity)
+        series.append(timestamp, stats)
+        if self._subscribers:
+            self._publish(device_id, series)
+        return True
+
+    def _publish(self, device_id: str, series: TimeSeries) -> None:
+        """Deliver the newest sample of a series to subscribers."""
+        latest = series.latest()
+        if latest is None:
+            return
+        sample = Sample(device_id, latest[0], latest[1])
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(sample)
@@ -0,0 +1,508 @@
+"""Recommendations checker comparing every site against a check catalogue."""
+
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from .metrics import error_reason
+from .sync import fingerprint
+
+if TYPE_CHECKING:
+    from .client import UniFiClient
+
+DEFAULT_CHECK_CONCURRENCY = 16
+
+PASS = "pass"
+FAIL = "fail"
+NOT_APPLICABLE = "not_applicable"
+ERROR = "error"
+
+# Data sources a check can read
+DEVICES = "devices"
+STATISTICS = "statistics"
+CLIENTS = "clients"
+SOURCES = (DEVICES, STATISTICS, CLIENTS)
+
+# Source name -> records of one site
+SiteData = Dict[str, List[Dict[str, Any]]]
+
+
+@dataclass
+class CheckResult:
+    """Verdict of one check for one site.
+
+    Attributes:
+        status: "pass", "fail", "not_applicable" or "error"
+        message: One-line explanation
+        details: Offending devices or clients, one line each
+    """
+
+    status: str
+    message: str
+    details: List[str] = field(default_factory=list)
+
+
+@dataclass
+class Finding:
+    """Result of one check for one site in a compliance report.
+
+    Attributes:
+        check: Check name
+        site_id: Site the check ran against
+        result: Verdict of the check
+        cached: Whether the verdict was reused because the configuration
+            the check reads did not change
+    """
+
+    check: str
+    site_id: str
+    result: CheckResult
+    cached: bool = False
+
+    @property
+    def status(self) -> str:
+        """Status of the verdict."""
+        return self.result.status
+
+
+class Check(ABC):
+    """A recommendation that can be checked against one site's data.
+
+    Subclasses name the sources they read, and optionally the record fields
+    that matter, and implement ``evaluate``. The checker caches each
+    verdict against a fingerprint of exactly those inputs, so a change to
+    anything else, such as a device's uptime, does not re-run the check.
+    """
+
+    name = ""
+    title = ""
+    sources: Tuple[str, ...] = ()
+    fields: Mapping[str, Tuple[str, ...]] = MappingProxyType({})
+
+    def inputs(self, site: SiteData) -> Dict[str, Any]:
+        """The part of a site's data this check reads.
+
+        Args:
+            site: Records of the site by source
+
+        Returns:
+            Records of every source the check reads, reduced to ``fields``
+            where given and ordered so the fingerprint is stable
+        """
+        inputs: Dict[str, Any] = {}
+        for source in self.sources:
+            records = site.get(source, [])
+            keys = self.fields.get(source)
+            if keys is not None:
+                records = [{key: record.get(key) for key in keys} for record in records]
+            inputs[source] = sorted(records, key=lambda record: str(record.get("id")))
+        return inputs
+
+    @abstractmethod
+    def evaluate(self, inputs: Dict[str, Any]) -> CheckResult:
+        """Check the inputs of one site.
+
+        Args:
+            inputs: Output of ``inputs``
+
+        Returns:
+            Verdict for the site
+        """
+
+
+class FirmwareUpToDate(Check):
+    """Every device runs the latest firmware the controller offers."""
+
+    name = "firmware_up_to_date"
+    title = "Keep device firmware up to date"
+    sources = (DEVICES,)
+    fields = {DEVICES: ("id", "name", "firmwareVersion", "firmwareUpdatable")}
+
+    def evaluate(self, inputs: Dict[str, Any]) -> CheckResult:
+        """Fail for devices with a firmware update available."""
+        devices = inputs[DEVICES]
+        if not devices:
+            return CheckResult(NOT_APPLICABLE, "No devices")
+        outdated = [
+            f"{device['name'] or device['id']} ({device['firmwareVersion']})"
+            for device in devices
+            if device["firmwareUpdatable"]
+        ]
+        if outdated:
+            return CheckResult(
+                FAIL, f"{len(outdated)} devices have updates available", outdated
+            )
+        return CheckResult(PASS, "All devices are up to date")
+
+
+class ConsistentFirmware(Check):
+    """Devices of the same model run the same firmware version."""
+
+    name = "consistent_firmware"
+    title = "Run one firmware version per model"
+    sources = (DEVICES,)
+    fields = {DEVICES: ("id", "model", "firmwareVersion")}
+
+    def evaluate(self, inputs: Dict[str, Any]) -> CheckResult:
+        """Fail for models running more than one firmware version."""
+        versions: Dict[str, Set[str]] = {}
+        for device in inputs[DEVICES]:
+            if device["model"] and device["firmwareVersion"]:
+                versions.setdefault(device["model"], set()).add(
+                    device["firmwareVersion"]
+                )
+        if not versions:
+            return CheckResult(NOT_APPLICABLE, "No devices with firmware versions")
+        mixed = [
+            f"{model}: {', '.join(sorted(found))}"
+            for model, found in sorted(versions.items())
+            if len(found) > 1
+        ]
+        if mixed:
+            return CheckResult(FAIL, f"{len(mixed)} models run mixed firmware", mixed)
+        return CheckResult(PASS, "Each model runs a single firmware version")
+
+
+class AccessPointLoad(Check):
+    """No access point serves more wireless clients than it handles well."""
+
+    name = "access_point_load"
+    title = "Spread wireless clients across access points"
+    sources = (DEVICES, CLIENTS)
+    fields = {
+        DEVICES: ("id", "name", "features"),
+        CLIENTS: ("id", "type", "uplinkDeviceId"),
+    }
+
+    def __init__(self, max_clients: int = 50):
+        """Initialize the check.
+
+        Args:
+            max_clients: Most wireless clients one access point should serve
+        """
+        self.max_clients = max_clients
+
+    def evaluate(self, inputs: Dict[str, Any]) -> CheckResult:
+        """Fail for access points above the client limit."""
+        access_points = {
+            device["id"]: device["name"] or device["id"]
+            for device in inputs[DEVICES]
+            if "accessPoint" in (device["features"] or {})
+        }
+        if not access_points:
+            return CheckResult(NOT_APPLICABLE, "No access points")
+        load = Counter(
+            client["uplinkDeviceId"]
+            for client in inputs[CLIENTS]
+            if client["type"] == "WIRELESS"
+        )
+        overloaded = [
+            f"{access_points[device_id]}: {count} clients"
+            for device_id, count in sorted(load.items())
+            if device_id in access_points and count > self.max_clients
+        ]
+        if overloaded:
+            return CheckResult(
+                FAIL,
+                f"{len(overloaded)} access points serve over "
+                f"{self.max_clients} clients",
+                overloaded,
+            )
+        return CheckResult(PASS, "Access point load is within limits")
+
+
+DEFAULT_CHECKS: Tuple[Check, ...] = (
+    FirmwareUpToDate(),
+    ConsistentFirmware(),
+    AccessPointLoad(),
+)
+
+
+@dataclass
+class ComplianceReport:
+    """Findings of one checker run.
+
+    Attributes:
+        findings: One finding per site and check
+        sites: Number of sites checked
+        evaluated: Number of checks that ran
+        cached: Number of verdicts reused from the previous run
+        failed_sites: Sites whose data could not be fetched completely
+        duration: Wall-clock time in seconds
+    """
+
+    findings: List[Finding] = field(default_factory=list)
+    sites: int = 0
+    evaluated: int = 0
+    cached: int = 0
+    failed_sites: List[str] = field(default_factory=list)
+    duration: float = 0.0
+
+    @property
+    def failures(self) -> List[Finding]:
+        """Findings of checks that failed."""
+        return [finding for finding in self.findings if finding.status == FAIL]
+
+    def by_site(self) -> Dict[str, List[Finding]]:
+        """Group findings by site."""
+        grouped: Dict[str, List[Finding]] = {}
+        for finding in self.findings:
+            grouped.setdefault(finding.site_id, []).append(finding)
+        return grouped
+
+    def summary(self) -> Dict[str, Any]:
+        """Summarize the report as a plain dictionary suitable for logging."""
+        counts = {status: 0 for status in (PASS, FAIL, NOT_APPLICABLE, ERROR)}
+        for finding in self.findings:
+            counts[finding.status] += 1
+        return {
+            "sites": self.sites,
+            "evaluated": self.evaluated,
+            "cached": self.cached,
+            "failed_sites": len(self.failed_sites),
+            "duration": round(self.duration, 3),
+            **counts,
+        }
+
+
+class RecommendationChecker:
+    """Checks every site against a catalogue of recommendations.
+
+    Each run fetches what the checks need once for all of them: device
+    details through the client's ``DeviceSync``, which only fetches
+    devices whose summary changed, and, concurrently across sites, the
+    latest statistics of every device and the client lists when a check
+    reads them. Statistics change without the summary changing, so they
+    are fetched on every run rather than taken from the sync. Every verdict
+    is stored with a fingerprint of the inputs its check read; when a later
+    run sees the same fingerprint, the verdict is reused without running
+    the check.
+
+    Example:
+        checker = RecommendationChecker(client)
+        report = await checker.run()
+        for finding in report.failures:
+            print(finding.site_id, finding.result.message)
+    """
+
+    def __init__(
+        self,
+        client: "UniFiClient",
+        checks: Sequence[Check] = DEFAULT_CHECKS,
+        concurrency: int = DEFAULT_CHECK_CONCURRENCY,
+    ):
+        """Initialize the checker.
+
+        Args:
+            client: Client to fetch site data with
+            checks: Checks to run; names must be unique
+            concurrency: Maximum requests in flight
+        """
+        names = [check.name for check in checks]
+        if len(set(names)) != len(names):
+            raise ValueError("Check names must be unique")
+        unknown = {source for check in checks for source in check.sources} - set(
+            SOURCES
+        )
+        if unknown:
+            raise ValueError(f"Unknown sources {sorted(unknown)}")
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1")
+
+        self.client = client
+        self.checks = list(checks)
+        self.concurrency = concurrency
+        self.sources = {source for check in checks for source in check.sources}
+        # (site_id, check name) -> (fingerprint, verdict)
+        self._verdicts: Dict[Tuple[str, str], Tuple[str, CheckResult]] = {}
+
+    async def run(self) -> ComplianceReport:
+        """Check every site.
+
+        Returns:
+            Findings for every site and check
+        """
+        start = time.perf_counter()
+        report = ComplianceReport()
+        sites = await self.client.get_sites()
+        site_ids = [site["id"] for site in sites.get("data", []) if site.get("id")]
+        data: Dict[str, SiteData] = {site_id: {} for site_id in site_ids}
+        failed: Dict[str, Set[str]] = {}
+        # site_id -> records that could not be fetched, one line each
+        unfetched: Dict[str, List[str]] = {}
+
+        if self.sources & {DEVICES, STATISTICS}:
+            synced = await self.client.sync_devices(
+                self.concurrency, include_statistics=False
+            )
+            for site_id in synced.failed_sites:
+                failed.setdefault(site_id, set()).update({DEVICES, STATISTICS})
+            # A device whose fetch failed is missing or stale in the sync
+            for change in synced.changes:
+                if not change.ok:
+                    failed.setdefault(change.site_id, set()).update(
+                        {DEVICES, STATISTICS}
+                    )
+                    unfetched.setdefault(change.site_id, []).append(
+                        f"{change.device_id}: details not fetched"
+                    )
+            self._collect_devices(data)
+        if STATISTICS in self.sources:
+            await self._collect_statistics(data, failed, unfetched)
+        if CLIENTS in self.sources:
+            await self._collect_clients(data, failed)
+
+        for site_id in site_ids:
+            for check in self.checks:
+                report.findings.append(
+                    self._check(
+                        site_id,
+                        check,
+                        data[site_id],
+                        failed.get(site_id),
+                        sorted(unfetched.get(site_id, [])),
+                    )
+                )
+        report.sites = len(site_ids)
+        report.cached = sum(finding.cached for finding in report.findings)
+        report.evaluated = len(report.findings) - report.cached
+        report.failed_sites = sorted(failed)
+        self._verdicts = {
+            key: value for key, value in self._verdicts.items() if key[0] in data
+        }
+        report.duration = time.perf_counter() - start
+        self.client.logger.info("recommendations_checked", **report.summary())
+        return report
+
+    def _collect_devices(self, data: Dict[str, SiteData]) -> None:
+        """Group the synced device records by site."""
+        for state in self.client.device_sync.devices.values():
+            site = data.get(state.site_id)
+            if site is not None:
+                site.setdefault(DEVICES, []).append(
+                    {**state.summary, **(state.details or {})}
+                )
+
+    async def _collect_statistics(
+        self,
+        data: Dict[str, SiteData],
+        failed: Dict[str, Set[str]],
+        unfetched: Dict[str, List[str]],
+    ) -> None:
+        """Fetch the latest statistics of every synced device concurrently."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def collect(site_id: str, device_id: str) -> None:
+            async with semaphore:
+                try:
+                    statistics = await self.client.get_device_statistics(
+                        site_id, device_id
+                    )
+                except Exception as exc:
+                    failed.setdefault(site_id, set()).add(STATISTICS)
+                    unfetched.setdefault(site_id, []).append(
+                        f"{device_id}: statistics not fetched"
+                    )
+                    self.client.logger.warning(
+                        "recommendation_statistics_failed",
+                        site_id=site_id,
+                        device_id=device_id,
+                        error=error_reason(exc),
+                    )
+                    return
+            data[site_id].setdefault(STATISTICS, []).append(
+                {"id": device_id, **statistics}
+            )
+
+        await asyncio.gather(
+            *(
+                collect(site_id, device["id"])
+                for site_id, site in data.items()
+                if STATISTICS not in failed.get(site_id, ())
+                for device in site.get(DEVICES, [])
+            )
+        )
+
+    async def _collect_clients(
+        self, data: Dict[str, SiteData], failed: Dict[str, Set[str]]
+    ) -> None:
+        """List the clients of every site concurrently."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def collect(site_id: str) -> None:
+            async with semaphore:
+                try:
+                    clients = [c async for c in self.client.iter_clients(site_id)]
+                except Exception as exc:
+                    failed.setdefault(site_id, set()).add(CLIENTS)
+                    self.client.logger.warning(
+                        "recommendation_clients_failed",
+                        site_id=site_id,
+                        error=error_reason(exc),
+                    )
+                    return
+            data[site_id][CLIENTS] = clients
+
+        await asyncio.gather(*(collect(site_id) for site_id in data))
+
+    def _check(
+        self,
+        site_id: str,
+        check: Check,
+        site: SiteData,
+        failed: Optional[Set[str]],
+        unfetched: List[str],
+    ) -> Finding:
+        """Run one check for one site, reusing the last verdict if possible."""
+        missing = sorted(failed.intersection(check.sources)) if failed else []
+        if missing:
+            result = CheckResult(
+                ERROR, f"Could not fetch {', '.join(missing)}", unfetched
+            )
+            return Finding(check.name, site_id, result)
+        inputs = check.inputs(site)
+        digest = fingerprint(inputs)
+        previous = self._verdicts.get((site_id, check.name))
+        if previous is not None and previous[0] == digest:
+            return Finding(check.name, site_id, previous[1], cached=True)
+        try:
+            result = check.evaluate(inputs)
+        except Exception as exc:
+            self.client.logger.warning(
+                "recommendation_check_failed",
+                check=check.name,
+                site_id=site_id,
+                error=str(exc),
+            )
+            return Finding(check.name, site_id, CheckResult(ERROR, str(exc)))
+        self._verdicts[(site_id, check.name)] = (digest, result)
+        return Finding(check.name, site_id, result)
+
+    def forget(self, site_ids: Optional[Iterable[str]] = None) -> None:
+        """Drop cached verdicts so the next run evaluates every check again.
+
+        Args:
+            site_ids: Sites to forget; all sites if not given
+        """
+        if site_ids is None:
+            self._verdicts.clear()
+            return
+        sites = set(site_ids)
+        self._verdicts = {
+            key: value for key, value in self._verdicts.items() if key[0] not in sites
+        }
@@ -0,0 +1,513 @@
+"""Incremental network problem detection over a columnar device inventory."""
+
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from .inventory import (
+    CATEGORY,
+    DEVICE_SCHEMA,
+    NUMBER,
+    Inventory,
+    Mask,
+    NumberColumn,
+)
+from .poller import STATISTIC_FIELDS
+from .sync import REMOVED, DeviceChange
+
+CRITICAL = "critical"
+WARNING = "warning"
+INFO = "info"
+
+OPENED = "opened"
+RESOLVED = "resolved"
+CHANGED = "changed"
+
+# Rules are re-run one device at a time while fewer than 1 in this many
+# devices changed, and over whole columns otherwise
+ROW_EVALUATION_RATIO = 16
+
+# Device fields the engine tracks: summary fields, a few details, the
+# polled statistics and the number of clients behind each device
+ENGINE_SCHEMA: Dict[str, str] = {
+    **DEVICE_SCHEMA,
+    "firmwareUpdatable": CATEGORY,
+    "clientCount": NUMBER,
+    **{name: NUMBER for name in STATISTIC_FIELDS},
+}
+
+
+class Check(ABC):
+    """Condition on device fields.
+
+    ``mask`` evaluates every device at once; ``test`` evaluates one device
+    and is used when only a few devices changed. Subclasses implement
+    ``mask`` and should override ``test`` with a per-row version.
+    """
+
+    fields: FrozenSet[str] = frozenset()
+
+    @abstractmethod
+    def mask(self, inventory: Inventory) -> Mask:
+        """Devices meeting the condition."""
+
+    def test(self, inventory: Inventory, row: int) -> bool:
+        """Whether the device at a row meets the condition."""
+        return bool(self.mask(inventory).bits[row])
+
+
+class OneOf(Check):
+    """A category field holds one of the given values."""
+
+    def __init__(self, name: str, values: Iterable[Any]):
+        """Initialize the check."""
+        self.name = name
+        self.values = tuple(values)
+        self.fields = frozenset([name])
+        self._strings = frozenset(str(value) for value in self.values)
+
+    def mask(self, inventory: Inventory) -> Mask:
+        """Devices holding one of the values."""
+        return inventory.isin(self.name, self.values)
+
+    def test(self, inventory: Inventory, row: int) -> bool:
+        """Whether the device at a row holds one of the values."""
+        value = inventory.column(self.name)[row]
+        return value is not None and str(value) in self._strings
+
+
+class Between(Check):
+    """A number field lies in a closed range; missing values never do."""
+
+    def __init__(self, name: str, low: float, high: float):
+        """Initialize the check."""
+        self.name = name
+        self.low = low
+        self.high = high
+        self.fields = frozenset([name])
+
+    def _column(self, inventory: Inventory) -> NumberColumn:
+        """Number column the check reads."""
+        column = inventory.column(self.name)
+        if not isinstance(column, NumberColumn):
+            raise TypeError(f"Not a number field: {self.name}")
+        return column
+
+    def mask(self, inventory: Inventory) -> Mask:
+        """Devices with values in the range."""
+        return self._column(inventory).between(self.low, self.high)
+
+    def test(self, inventory: Inventory, row: int) -> bool:
+        """Whether the device at a row has a value in the range."""
+        return self.low <= self._column(inventory).values[row] <= self.high
+
+
+def equals(name: str, *values: Any) -> Check:
+    """Check that a field holds any of the given values."""
+    return OneOf(name, values)
+
+
+def at_least(name: str, threshold: float) -> Check:
+    """Check that a number field is at least ``threshold``."""
+    return Between(name, threshold, math.inf)
+
+
+def below(name: str, threshold: float) -> Check:
+    """Check that a number field is below ``threshold``."""
+    return Between(name, -math.inf, math.nextafter(threshold, -math.inf))
+
+
+@dataclass(frozen=True)
+class Rule:
+    """A network problem, detected over all devices at once.
+
+    Attributes:
+        name: Rule identifier
+        levels: Severity and check pairs, most severe first; a device's
+            issue takes the first severity whose check selects it
+        message: Issue description, formatted with the device record
+        fields: Device fields the checks read; the rule is only re-evaluated
+            when one of them changes. Defaults to the checks' fields.
+    """
+
+    name: str
+    levels: Tuple[Tuple[str, Check], ...]
+    message: str
+    fields: FrozenSet[str] = frozenset()
+
+    def __post_init__(self) -> None:
+        """Derive the rule's fields from its checks if not declared."""
+        if not self.fields:
+            fields = frozenset().union(*(check.fields for _, check in self.levels))
+            object.__setattr__(self, "fields", fields)
+
+    def level(self, inventory: Inventory, row: int) -> Optional[int]:
+        """Index of the most severe level selecting a device, if any."""
+        for index, (_, check) in enumerate(self.levels):
+            if check.test(inventory, row):
+                return index
+        return None
+
+    def levels_by_row(self, inventory: Inventory) -> Dict[int, int]:
+        """Most severe level index for every selected device."""
+        selected: Dict[int, int] = {}
+        # Least severe first, so that more severe levels overwrite
+        for index in range(len(self.levels) - 1, -1, -1):
+            for row in self.levels[index][1].mask(inventory).indices():
+                selected[row] = index
+        return selected
+
+
+@dataclass
+class Issue:
+    """A problem currently detected on a device."""
+
+    rule: str
+    device_id: str
+    severity: str
+    message: str
+    since: float
+
+
+@dataclass
+class IssueChange:
+    """An issue that was opened, resolved or changed severity.
+
+    Attributes:
+        kind: "opened", "resolved" or "changed"
+        issue: The issue as it is now; for resolutions, as it was last
+        previous_severity: Severity before a change, None for new issues
+    """
+
+    kind: str
+    issue: Issue
+    previous_severity: Optional[str] = None
+
+
+DEFAULT_RULES: Tuple[Rule, ...] = (
+    Rule(
+        "device_offline",
+        (
+            (CRITICAL, equals("state", "OFFLINE")),
+            (WARNING, equals("state", "CONNECTION_INTERRUPTED", "ISOLATED")),
+        ),
+        "{name} is {state}",
+    ),
+    Rule(
+        "device_not_ready",
+        ((INFO, equals("state", "PENDING_ADOPTION", "ADOPTING", "GETTING_READY")),),
+        "{name} is {state}",
+    ),
+    Rule(
+        "high_cpu",
+        (
+            (CRITICAL, at_least("cpuUtilizationPct", 90)),
+            (WARNING, at_least("cpuUtilizationPct", 75)),
+        ),
+        "{name} CPU at {cpuUtilizationPct}%",
+    ),
+    Rule(
+        "high_memory",
+        (
+            (CRITICAL, at_least("memoryUtilizationPct", 95)),
+            (WARNING, at_least("memoryUtilizationPct", 85)),
+        ),
+        "{name} memory at {memoryUtilizationPct}%",
+    ),
+    Rule(
+        "recently_restarted",
+        ((INFO, below("uptimeSec", 600)),),
+        "{name} restarted {uptimeSec} seconds ago",
+    ),
+    Rule(
+        "firmware_update_available",
+        ((INFO, equals("firmwareUpdatable", True)),),
+        "{name} can be updated from firmware {firmwareVersion}",
+    ),
+    Rule(
+        "overloaded_device",
+        (
+            (CRITICAL, at_least("clientCount", 100)),
+            (WARNING, at_least("clientCount", 60)),
+        ),
+        "{name} serves {clientCount} clients",
+    ),
+)
+
+
+class _Record(Dict[str, Any]):
+    """Device record for message formatting; missing fields format as "?"."""
+
+    def __missing__(self, key: str) -> str:
+        return "?"
+
+
+def _flatten(statistics: Mapping[str, Any], prefix: str = "") -> Dict[str, Any]:
+    """Flatten nested statistics into dotted paths."""
+    flat: Dict[str, Any] = {}
+    for key, value in statistics.items():
+        if isinstance(value, Mapping):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+class RuleEngine:
+    """Keeps network issues up to date as device data changes.
+
+    Devices, their statistics and client counts live in one columnar
+    inventory. Updates record which fields of which devices actually
+    changed, and only the rules depending on those fields are re-run. When
+    few devices changed, a rule is re-checked for just those devices;
+    otherwise it runs over whole columns at once through inventory masks.
+    Issue state is kept per rule and device, so each update reports only
+    the issues it opened, resolved or re-graded. Rows of removed devices
+    are dropped, and the rest renumbered, once they make up most of the
+    inventory.
+
+    Example:
+        engine = RuleEngine()
+        engine.update_devices((await client.get_devices(site_id))["data"])
+        for change in engine.update_statistics({device_id: stats}):
+            ...
+    """
+
+    def __init__(
+        self,
+        rules: Sequence[Rule] = DEFAULT_RULES,
+        schema: Mapping[str, str] = ENGINE_SCHEMA,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Initialize the engine.
+
+        Args:
+            rules: Rules to evaluate
+            schema: Device fields to track, including every rule's fields
+            clock: Wall-clock time source for issue start times
+        """
+        unknown = {name for rule in rules for name in rule.fields} - set(schema)
+        if unknown:
+            raise ValueError(
+                f"Rules use untracked fields: {', '.join(sorted(unknown))}"
+            )
+        self.rules = list(rules)
+        self.devices = Inventory(schema)
+        self.issues: Dict[Tuple[str, str], Issue] = {}
+        self._clock = clock
+        self._rows: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._present = bytearray()
+        # Level index of every open issue, by rule and row
+        self._levels: Dict[str, Dict[int, int]] = {rule.name: {} for rule in rules}
+        self._dependents: Dict[str, List[Rule]] = defaultdict(list)
+        for rule in self.rules:
+            for name in rule.fields:
+                self._dependents[name].append(rule)
+
+    def update_devices(self, records: Iterable[Mapping[str, Any]]) -> List[IssueChange]:
+        """Add or update devices from device list or details records.
+
+        Records without an ``id`` are skipped.
+        """
+        dirty: Dict[str, Set[int]] = defaultdict(set)
+        for record in records:
+            device_id = record.get("id")
+            if device_id:
+                self._upsert(device_id, record, dirty)
+        return self._refresh(dirty)
+
+    def update_statistics(
+        self, statistics: Mapping[str, Mapping[str, Any]]
+    ) -> List[IssueChange]:
+        """Update known devices from ``statistics/latest`` responses.
+
+        Args:
+            statistics: Responses by device identifier; unknown devices
+                are ignored
+        """
+        dirty: Dict[str, Set[int]] = defaultdict(set)
+        for device_id, record in statistics.items():
+            if device_id in self._rows:
+                self._upsert(device_id, _flatten(record), dirty)
+        return self._refresh(dirty)
+
+    def update_clients(self, records: Iterable[Mapping[str, Any]]) -> List[IssueChange]:
+        """Recount the clients behind each device from a full client list."""
+        counts: Dict[str, int] = defaultdict(int)
+        for record in records:
+            uplink = record.get("uplinkDeviceId")
+            if uplink is not None:
+                counts[uplink] += 1
+        dirty: Dict[str, Set[int]] = defaultdict(set)
+        for device_id in self._rows:
+            self._upsert(device_id, {"clientCount": counts.get(device_id, 0)}, dirty)
+        return self._refresh(dirty)
+
+    def remove_devices(self, device_ids: Iterable[str]) -> List[IssueChange]:
+        """Forget devices, resolving their issues."""
+        removed = set()
+        for device_id in device_ids:
+            row = self._rows.get(device_id)
+            if row is not None and self._present[row]:
+                self._present[row] = 0
+                removed.add(row)
+        changes = self._refresh({name: removed for name in self.devices.schema})
+        if 2 * self._present.count(0) > len(self._present):
+            self._compact()
+        return changes
+
+    def apply(self, changes: Iterable[DeviceChange]) -> List[IssueChange]:
+        """Feed the changes of a ``DeviceSync`` round into the engine."""
+        changes = list(changes)
+        kept = [change for change in changes if change.kind != REMOVED]
+        results = self.remove_devices(
+            change.device_id for change in changes if change.kind == REMOVED
+        )
+        results += self.update_devices(
+            {**change.summary, **(change.details or {})} for change in kept
+        )
+        results += self.update_statistics(
+            {
+                change.device_id: change.statistics
+                for change in kept
+                if change.statistics is not None
+            }
+        )
+        return results
+
+    def evaluate(self, rules: Optional[Iterable[Rule]] = None) -> List[IssueChange]:
+        """Run rules over every device and update the known issues.
+
+        Args:
+            rules: Rules to run; all rules if not given
+
+        Returns:
+            Issues opened, resolved or changed by the evaluation
+        """
+        changes: List[IssueChange] = []
+        for rule in self.rules if rules is None else rules:
+            selected = rule.levels_by_row(self.devices)
+            current = self._levels[rule.name]
+            for row in selected.keys() | current.keys():
+                level = selected.get(row) if self._present[row] else None
+                changes.extend(self._transition(rule, row, level))
+        return changes
+
+    def summary(self) -> Dict[str, int]:
+        """Number of open issues per severity."""
+        counts = {severity: 0 for severity in (CRITICAL, WARNING, INFO)}
+        for issue in self.issues.values():
+            counts[issue.severity] = counts.get(issue.severity, 0) + 1
+        return counts
+
+    def _refresh(self, dirty: Mapping[str, Set[int]]) -> List[IssueChange]:
+        """Re-run the rules that depend on changed fields."""
+        rows_by_rule: Dict[str, Set[int]] = defaultdict(set)
+        for name, rows in dirty.items():
+            for rule in self._dependents.get(name, ()):
+                rows_by_rule[rule.name] |= rows
+
+        limit = len(self.devices) / ROW_EVALUATION_RATIO
+        changes: List[IssueChange] = []
+        for rule in self.rules:
+            targets = rows_by_rule.get(rule.name)
+            if not targets:
+                continue
+            if len(targets) > limit:
+                changes.extend(self.evaluate([rule]))
+                continue
+            for row in targets:
+                level = rule.level(self.devices, row) if self._present[row] else None
+                changes.extend(self._transition(rule, row, level))
+        return changes
+
+    def _compact(self) -> None:
+        """Drop the rows of removed devices, renumbering the others."""
+        kept = [row for row, present in enumerate(self._present) if present]
+        renumbered = {old: new for new, old in enumerate(kept)}
+        self.devices = Inventory.from_records(
+            (self.devices.row(row) for row in kept), self.devices.schema
+        )
+        self._ids = [self._ids[row] for row in kept]
+        self._rows = {device_id: row for row, device_id in enumerate(self._ids)}
+        self._present = bytearray(b"\x01") * len(kept)
+        for name, levels in self._levels.items():
+            self._levels[name] = {
+                renumbered[row]: level for row, level in levels.items()
+            }
+
+    def _upsert(
+        self, device_id: str, record: Mapping[str, Any], dirty: Dict[str, Set[int]]
+    ) -> None:
+        """Write a device's fields, noting those that changed in ``dirty``."""
+        row = self._rows.get(device_id)
+        if row is None:
+            row = self.devices.append({"id": device_id})
+            self._rows[device_id] = row
+            self._ids.append(device_id)
+            self._present.append(1)
+        elif not self._present[row]:
+            self._present[row] = 1
+            # A returning device may match any rule again
+            for name in self.devices.schema:
+                dirty[name].add(row)
+        for name, value in record.items():
+            column = self.devices.columns.get(name)
+            if column is None:
+                continue
+            before = column[row]
+            column.set(row, value)
+            if column[row] != before:
+                dirty[name].add(row)
+
+    def _transition(
+        self, rule: Rule, row: int, level: Optional[int]
+    ) -> List[IssueChange]:
+        """Open, resolve or re-grade the issue of a rule on a device.
+
+        An issue that keeps its severity has its message refreshed, since
+        the values it quotes may have changed.
+        """
+        current = self._levels[rule.name]
+        key = (rule.name, self._ids[row])
+        if level == current.get(row):
+            if level is not None:
+                self.issues[key].message = self._message(rule, row)
+            return []
+        if level is None:
+            del current[row]
+            issue = self.issues.pop(key)
+            return [IssueChange(RESOLVED, issue, issue.severity)]
+
+        current[row] = level
+        severity = rule.levels[level][0]
+        message = self._message(rule, row)
+        existing = self.issues.get(key)
+        if existing is None:
+            issue = Issue(rule.name, key[1], severity, message, self._clock())
+            self.issues[key] = issue
+            return [IssueChange(OPENED, issue)]
+        previous = existing.severity
+        existing.severity = severity
+        existing.message = message
+        return [IssueChange(CHANGED, existing, previous)]
+
+    def _message(self, rule: Rule, row: int) -> str:
+        """Format a rule's issue message for the device at a row."""
+        return rule.message.format_map(_Record(self.devices.row(row)))
@@ -0,0 +1,540 @@
+"""Volatility-aware polling: per-target intervals under a global request budget."""
+
+import asyncio
+import heapq
+import math
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from .poller import STATISTIC_FIELDS, _lookup
+from .traffic import TokenBucket
+
+if TYPE_CHECKING:
+    from .client import UniFiClient
+
+# Priority lanes, served in this order
+CRITICAL = "critical"
+NORMAL = "normal"
+PRIORITIES = (CRITICAL, NORMAL)
+
+DEFAULT_MIN_INTERVAL = 10.0
+DEFAULT_MAX_INTERVAL = 300.0
+DEFAULT_BUDGET = 5.0
+DEFAULT_JITTER = 0.1
+DEFAULT_CHANGE_THRESHOLD = 0.05
+DEFAULT_SCHEDULER_CONCURRENCY = 16
+
+# Interval factors after a sample that changed and one that did not
+SPEEDUP = 0.5
+SLOWDOWN = 1.5
+
+# Statistics that show activity; uptime changes on every sample
+VOLATILITY_FIELDS: Tuple[str, ...] = tuple(
+    field for field in STATISTIC_FIELDS if field != "uptimeSec"
+)
+
+Fetch = Callable[[], Awaitable[Dict[str, Any]]]
+Measure = Callable[[Mapping[str, Any], Mapping[str, Any]], float]
+
+
+def statistics_change(fields: Sequence[str] = VOLATILITY_FIELDS) -> Measure:
+    """Build a measure of how much statistics changed between two samples.
+
+    Args:
+        fields: Dotted paths of the statistics to compare
+
+    Returns:
+        Function returning the largest relative change of any field, where
+        values below 1 count as 1 so that noise around zero is ignored
+    """
+    paths = tuple(fields)
+
+    def change(previous: Mapping[str, Any], current: Mapping[str, Any]) -> float:
+        largest = 0.0
+        for path in paths:
+            old, new = _lookup(previous, path), _lookup(current, path)
+            if math.isnan(old) or math.isnan(new):
+                if math.isnan(old) != math.isnan(new):
+                    return 1.0
+                continue
+            largest = max(largest, abs(new - old) / max(abs(old), abs(new), 1.0))
+        return largest
+
+    return change
+
+
+def membership_change(previous: Mapping[str, Any], current: Mapping[str, Any]) -> float:
+    """Fraction of list items, by ID, that appeared or disappeared.
+
+    Suits list responses such as ``get_clients()``.
+    """
+    old = {item.get("id") for item in previous.get("data", [])}
+    new = {item.get("id") for item in current.get("data", [])}
+    return len(old ^ new) / max(len(old | new), 1)
+
+
+@dataclass(eq=False)
+class PollTarget:
+    """A request polled at its own interval.
+
+    Attributes:
+        key: Unique name, e.g. ``statistics/<device-id>``
+        fetch: Makes the request
+        measure: Scores the change between two responses, 0 for none
+        priority: "critical" or "normal"
+        min_interval: Shortest interval in seconds
+        max_interval: Longest interval in seconds
+        interval: Current interval, learned from how often data changes
+        data: Latest response
+        polls: Successful polls
+        changes: Polls whose data changed
+        errors: Failed polls
+    """
+
+    key: str
+    fetch: Fetch
+    measure: Measure
+    priority: str
+    min_interval: float
+    max_interval: float
+    interval: float
+    data: Optional[Dict[str, Any]] = None
+    polls: int = 0
+    changes: int = 0
+    errors: int = 0
+    due: float = 0.0
+
+
+class Update(NamedTuple):
+    """A poll result delivered to subscribers."""
+
+    key: str
+    timestamp: float
+    data: Dict[str, Any]
+    change: float
+
+
+@dataclass
+class SchedulerStats:
+    """Scheduler counters.
+
+    Attributes:
+        requests: Requests sent
+        errors: Requests that failed
+        changes: Polls whose data changed
+        stretched: Normal polls scheduled later to stay within the budget
+    """
+
+    requests: int = 0
+    errors: int = 0
+    changes: int = 0
+    stretched: int = 0
+
+    def summary(self) -> str:
+        """One-line summary."""
+        return (
+            f"{self.requests} requests, {self.changes} changed, "
+            f"{self.errors} failed, {self.stretched} stretched"
+        )
+
+
+class PollScheduler:
+    """Polls each target at an interval adapted to how much its data changes.
+
+    A target whose response changed by at least ``change_threshold`` since
+    its previous poll is polled twice as often next time, down to its
+    minimum interval; one that did not change, or failed, is polled 1.5
+    times less often, up to its maximum. Busy devices are thus sampled closely while
+    idle ones cost few requests.
+
+    All requests draw from one token bucket refilled at ``budget``
+    requests per second. When the intervals ask for more than that,
+    normal targets are stretched so the critical lane keeps its rate,
+    and due critical targets are always sent first. First polls are
+    spread over each target's first interval and every interval is
+    jittered, so targets do not fall into synchronized bursts.
+
+    Example:
+        scheduler = PollScheduler(client, budget=10)
+        await scheduler.discover(critical=lambda d: d["model"] == "USW-Pro-48")
+        async with scheduler:
+            async for update in scheduler.subscribe():
+                print(update.key, update.change)
+    """
+
+    def __init__(
+        self,
+        client: "UniFiClient",
+        budget: float = DEFAULT_BUDGET,
+        burst: Optional[float] = None,
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        max_interval: float = DEFAULT_MAX_INTERVAL,
+        change_threshold: float = DEFAULT_CHANGE_THRESHOLD,
+        jitter: float = DEFAULT_JITTER,
+        concurrency: int = DEFAULT_SCHEDULER_CONCURRENCY,
+        seed: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the scheduler.
+
+        Args:
+            client: Client to poll with
+            budget: Sustained requests per second across all targets
+            burst: Requests that may be sent at once, defaults to one
+                second's worth of the budget
+            min_interval: Default shortest interval in seconds
+            max_interval: Default longest interval in seconds
+            change_threshold: Change score from which data counts as changed
+            jitter: Fraction by which each interval is randomly varied
+            concurrency: Maximum requests in flight
+            seed: Seed for the jitter, for reproducible schedules
+            clock: Monotonic time source for schedules and the budget
+        """
+        if budget <= 0:
+            raise ValueError("Budget must be positive")
+        if not 0 < min_interval <= max_interval:
+            raise ValueError("Intervals must be positive with min <= max")
+        if not 0 <= jitter < 1:
+            raise ValueError("Jitter must be at least 0 and below 1")
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1")
+
+        self.client = client
+        self.budget = budget
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.change_threshold = change_threshold
+        self.jitter = jitter
+        self.stats = SchedulerStats()
+        self._clock = clock
+        self.bucket = TokenBucket(budget, burst, clock)
+        self._random = random.Random(seed)
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._targets: Dict[str, PollTarget] = {}
+        self._discovered: Set[str] = set()
+        self._demand = dict.fromkeys(PRIORITIES, 0.0)
+        self._heap: List[Tuple[float, int, PollTarget]] = []
+        self._ready: Dict[str, Deque[PollTarget]] = {p: deque() for p in PRIORITIES}
+        self._sequence = 0
+        self._wakeup = asyncio.Event()
+        self._inflight: Set["asyncio.Task[None]"] = set()
+        self._subscribers: Set["asyncio.Queue[Update]"] = set()
+        self._task: Optional[asyncio.Task[None]] = None
+
+    @property
+    def targets(self) -> Dict[str, PollTarget]:
+        """Scheduled targets by key."""
+        return dict(self._targets)
+
+    @property
+    def demand(self) -> float:
+        """Requests per second the current intervals ask for."""
+        return sum(self._demand.values())
+
+    def add(
+        self,
+        key: str,
+        fetch: Fetch,
+        measure: Measure,
+        priority: str = NORMAL,
+        min_interval: Optional[float] = None,
+        max_interval: Optional[float] = None,
+    ) -> PollTarget:
+        """Schedule a target, replacing any with the same key.
+
+        The target starts at its minimum interval, so its volatility is
+        learned quickly, and its first poll is at a random point within it.
+
+        Args:
+            key: Unique name
+            fetch: Makes the request
+            measure: Scores the change between two responses
+            priority: "critical" or "normal"
+            min_interval: Shortest interval, the scheduler default if not given
+            max_interval: Longest interval, the scheduler default if not given
+
+        Returns:
+            The scheduled target
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {priority!r}, expected {PRIORITIES}")
+        low = self.min_interval if min_interval is None else min_interval
+        high = self.max_interval if max_interval is None else max_interval
+        if not 0 < low <= high:
+            raise ValueError("Intervals must be positive with min <= max")
+
+        self.remove(key)
+        target = PollTarget(key, fetch, measure, priority, low, high, low)
+        self._targets[key] = target
+        self._demand[priority] += 1 / target.interval
+        self._push(target, self._now() + self._random.uniform(0, low))
+        return target
+
+    def remove(self, key: str) -> bool:
+        """Stop polling a target.
+
+        Returns:
+            True if the target was scheduled
+        """
+        target = self._targets.pop(key, None)
+        if target is None:
+            return False
+        self._demand[target.priority] -= 1 / target.interval
+        self._discovered.discard(key)
+        return True
+
+    def add_device(self, site_id: str, device_id: str, priority: str = NORMAL) -> None:
+        """Poll the latest statistics of a device."""
+        self.add(
+            f"statistics/{device_id}",
+            lambda: self.client.get_device_statistics(site_id, device_id),
+            statistics_change(),
+            priority,
+        )
+
+    def add_clients(self, site_id: str, priority: str = NORMAL) -> None:
+        """Poll the client list of a site."""
+        self.add(
+            f"clients/{site_id}",
+            lambda: self.client.get_clients(site_id),
+            membership_change,
+            priority,
+        )
+
+    async def discover(
+        self,
+        critical: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        include_clients: bool = True,
+    ) -> int:
+        """Schedule every device of every site, and each site's client list.
+
+        Targets added by a previous discovery whose device or site is gone
+        are removed; targets that are still present keep what they learned.
+
+        Args:
+            critical: Selects the device records to poll in the critical lane
+            include_clients: Also poll the client list of each site
+
+        Returns:
+            Number of targets scheduled by this discovery
+        """
+        found: Dict[str, Tuple[str, Optional[str], str]] = {}
+        sites = await self.client.get_sites()
+        for site in sites.get("data", []):
+            site_id = site.get("id")
+            if not site_id:
+                continue
+            if include_clients:
+                found[f"clients/{site_id}"] = (site_id, None, NORMAL)
+            async for device in self.client.iter_devices(site_id):
+                if device.get("id"):
+                    lane = (
+                        CRITICAL
+                        if critical is not None and critical(device)
+                        else NORMAL
+                    )
+                    found[f"statistics/{device['id']}"] = (site_id, device["id"], lane)
+
+        for key in self._discovered - set(found):
+            self.remove(key)
+        for key, (site_id, device_id, lane) in found.items():
+            existing = self._targets.get(key)
+            if existing is not None and existing.priority == lane:
+                continue
+            if device_id is None:
+                self.add_clients(site_id, lane)
+            else:
+                self.add_device(site_id, device_id, lane)
+        self._discovered = set(found)
+        self.client.logger.debug("scheduler_discovered_targets", targets=len(found))
+        return len(found)
+
+    async def start(self) -> None:
+        """Start polling in the background."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop polling and wait for requests in flight to be cancelled."""
+        tasks = list(self._inflight)
+        if self._task is not None:
+            tasks.append(self._task)
+            self._task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def __aenter__(self) -> "PollScheduler":
+        """Start polling on context entry."""
+        await self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[type],
+        exc_val: Optional[Exception],
+        exc_tb: Optional[Any],
+    ) -> None:
+        """Stop polling on context exit."""
+        await self.stop()
+
+    async def subscribe(
+        self, max_pending: int = 10_000
+    ) -> AsyncGenerator[Update, None]:
+        """Receive every poll result as it arrives.
+
+        Args:
+            max_pending: Updates buffered for a slow subscriber before the
+                oldest are dropped
+
+        Yields:
+            Poll results
+        """
+        queue: asyncio.Queue[Update] = asyncio.Queue(maxsize=max_pending)
+        self._subscribers.add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers.discard(queue)
+
+    def _now(self) -> float:
+        """Scheduler time in seconds."""
+        return self._clock()
+
+    def _push(self, target: PollTarget, due: float) -> None:
+        """Queue a target for polling at a time."""
+        target.due = due
+        self._sequence += 1
+        heapq.heappush(self._heap, (due, self._sequence, target))
+        self._wakeup.set()
+
+    def _next_interval(self, target: PollTarget) -> float:
+        """Jittered time until a target's next poll, stretched to fit the budget."""
+        interval = target.interval
+        if target.priority == NORMAL:
+            available = self.budget - self._demand[CRITICAL]
+            wanted = self._demand[NORMAL]
+            if wanted > available:
+                stretched = interval * wanted / available if available > 0 else math.inf
+                interval = min(stretched, target.max_interval)
+                self.stats.stretched += 1
+        return interval * self._random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _collect_due(self, now: float) -> None:
+        """Move targets that are due into their priority lanes."""
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            due, _, target = heapq.heappop(heap)
+            # Skip entries of removed or rescheduled targets
+            if self._targets.get(target.key) is target and target.due == due:
+                self._ready[target.priority].append(target)
+
+    def _next_ready(self) -> Optional[PollTarget]:
+        """The due target to poll next, critical lane first."""
+        for priority in PRIORITIES:
+            lane = self._ready[priority]
+            while lane:
+                target = lane.popleft()
+                if self._targets.get(target.key) is target:
+                    return target
+        return None
+
+    async def _run(self) -> None:
+        """Dispatch due targets until cancelled."""
+        while True:
+            self._collect_due(self._now())
+            if any(self._ready.values()):
+                # Pick the target only once a token is available, so a
+                # critical target that fell due meanwhile goes first
+                await self.bucket.acquire()
+                self._dispatch()
+                continue
+
+            self._wakeup.clear()
+            timeout = self._heap[0][0] - self._now() if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except TimeoutError:
+                pass
+
+    def _dispatch(self) -> bool:
+        """Start polling the next due target with a token already taken.
+
+        Returns:
+            False if no target was due; the token is given back
+        """
+        self._collect_due(self._now())
+        target = self._next_ready()
+        if target is None:
+            # The due targets were removed while waiting for the token
+            self.bucket.release()
+            return False
+        task = asyncio.create_task(self._poll(target))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+        return True
+
+    async def _poll(self, target: PollTarget) -> None:
+        """Poll a target, adapt its interval and schedule the next poll."""
+        self.stats.requests += 1
+        try:
+            async with self._semaphore:
+                data = await target.fetch()
+        except Exception as exc:
+            target.errors += 1
+            self.stats.errors += 1
+            self.client.logger.debug(
+                "scheduler_poll_failed", key=target.key, error=str(exc)
+            )
+            # Back off from targets that keep failing
+            self._adapt(target, False)
+        else:
+            change = 0.0
+            if target.data is not None:
+                change = target.measure(target.data, data)
+            self._adapt(target, change >= self.change_threshold)
+            target.data = data
+            target.polls += 1
+            if self._subscribers:
+                self._publish(Update(target.key, time.time(), data, change))
+        finally:
+            # Also when cancelled by stop(), so a restart polls it again
+            if self._targets.get(target.key) is target:
+                self._push(target, self._now() + self._next_interval(target))
+
+    def _adapt(self, target: PollTarget, changed: bool) -> None:
+        """Shorten the interval after a change, lengthen it otherwise."""
+        if changed:
+            target.changes += 1
+            self.stats.changes += 1
+            interval = max(target.min_interval, target.interval * SPEEDUP)
+        else:
+            interval = min(target.max_interval, target.interval * SLOWDOWN)
+        self._demand[target.priority] += 1 / interval - 1 / target.interval
+        target.interval = interval
+
+    def _publish(self, update: Update) -> None:
+        """Deliver a poll result to subscribers."""
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(update)
@@ -0,0 +1,215 @@
+"""Pooled HTTP session shared between UniFi clients."""
+
+import ssl
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Any, List, Optional, Union
+
+import aiohttp
+
+
+@lru_cache(maxsize=1)
+def default_ssl_context() -> ssl.SSLContext:
+    """Build the verifying SSL context once and reuse it for every connection."""
+    return ssl.create_default_context()
+
+
+@dataclass(frozen=True)
+class ConnectionPoolConfig:
+    """Connection pool settings for the underlying aiohttp connector.
+
+    Attributes:
+        limit: Maximum number of simultaneous connections (0 for unlimited)
+        limit_per_host: Maximum connections per controller (0 for unlimited)
+        keepalive_timeout: Seconds to keep idle connections open for reuse
+        ttl_dns_cache: Seconds to cache DNS lookups (None to cache forever)
+        ssl_context: SSL context to reuse for verified connections
+    """
+
+    limit: int = 100
+    limit_per_host: int = 0
+    keepalive_timeout: float = 30.0
+    ttl_dns_cache: Optional[int] = 300
+    ssl_context: Optional[ssl.SSLContext] = None
+
+    def ssl_for(self, verify_ssl: bool) -> Union[ssl.SSLContext, bool]:
+        """SSL argument to use for requests with the given verification mode."""
+        if not verify_ssl:
+            return False
+        return self.ssl_context or default_ssl_context()
+
+    def create_connector(self) -> aiohttp.TCPConnector:
+        """Create a TCP connector with these settings."""
+        return aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.ttl_dns_cache,
+            ssl=self.ssl_for(True),
+        )
+
+
+@dataclass
+class PoolStats:
+    """Connection pool usage counters used to size the pool.
+
+    Attributes:
+        limit: Configured connection limit (0 for unlimited)
+        limit_per_host: Configured per-host connection limit (0 for unlimited)
+        in_flight: Requests currently holding or waiting for a connection
+        peak_in_flight: Highest observed value of ``in_flight``
+        requests: Total number of requests issued
+        queued: Number of requests that had to wait for a free connection
+        queue_wait_seconds: Total time spent waiting for a free connection
+        connections_created: Number of new connections opened
+        connections_reused: Number of requests served by a kept-alive connection
+    """
+
+    limit: int = 0
+    limit_per_host: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    requests: int = 0
+    queued: int = 0
+    queue_wait_seconds: float = 0.0
+    connections_created: int = 0
+    connections_reused: int = 0
+
+    @property
+    def saturation(self) -> float:
+        """Peak in-flight requests as a fraction of the connection limit."""
+        if not self.limit:
+            return 0.0
+        return self.peak_in_flight / self.limit
+
+    def request_started(self) -> None:
+        """Account for a request entering the pool."""
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def request_finished(self) -> None:
+        """Account for a request leaving the pool."""
+        self.in_flight -= 1
+
+
+class SharedSession:
+    """Lazily created, pooled aiohttp session.
+
+    A single instance can be passed to several ``UniFiClient`` objects so
+    they share DNS cache, kept-alive connections and TLS sessions. The
+    aiohttp session itself is only created on first use, inside the
+    running event loop. Clients never close a session they were given;
+    close it with ``close()`` or by using it as an async context manager.
+    """
+
+    def __init__(
+        self,
+        config: Optional[ConnectionPoolConfig] = None,
+        trace_configs: Optional[List[aiohttp.TraceConfig]] = None,
+    ):
+        """Initialize the shared session.
+
+        Args:
+            config: Connection pool settings
+            trace_configs: Additional aiohttp trace configs to install
+        """
+        self.config = config or ConnectionPoolConfig()
+        self.stats = PoolStats(
+            limit=self.config.limit, limit_per_host=self.config.limit_per_host
+        )
+        self._trace_configs = [self._pool_trace_config(), *(trace_configs or [])]
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """The underlying aiohttp session, created on first access."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=self.config.create_connector(),
+                trace_configs=self._trace_configs,
+            )
+        return self._session
+
+    def add_trace_config(self, trace_config: aiohttp.TraceConfig) -> bool:
+        """Install another trace config if the session has not been opened yet.
+
+        Args:
+            trace_config: Trace config to install
+
+        Returns:
+            True if the config is installed, False if the session is already
+            open and can no longer be traced with it
+        """
+        if trace_config in self._trace_configs:
+            return True
+        if self._session is not None and not self._session.closed:
+            return False
+        self._trace_configs.append(trace_config)
+        return True
+
+    @property
+    def closed(self) -> bool:
+        """Whether the session has been closed or never opened."""
+        return self._session is None or self._session.closed
+
+    async def close(self) -> None:
+        """Close the session and all pooled connections."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> "SharedSession":
+        """Async context manager entry."""
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[type],
+        exc_val: Optional[Exception],
+        exc_tb: Optional[Any],
+    ) -> None:
+        """Async context manager exit."""
+        await self.close()
+
+    def _pool_trace_config(self) -> aiohttp.TraceConfig:
+        """Trace config that feeds connection events into the pool stats."""
+        stats = self.stats
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_queued_start(
+            session: aiohttp.ClientSession,
+            ctx: SimpleNamespace,
+            params: aiohttp.TraceConnectionQueuedStartParams,
+        ) -> None:
+            ctx.queued_at = time.perf_counter()
+
+        async def on_queued_end(
+            session: aiohttp.ClientSession,
+            ctx: SimpleNamespace,
+            params: aiohttp.TraceConnectionQueuedEndParams,
+        ) -> None:
+            stats.queued += 1
+            stats.queue_wait_seconds += time.perf_counter() - ctx.queued_at
+
+        async def on_create_end(
+            session: aiohttp.ClientSession,
+            ctx: SimpleNamespace,
+            params: aiohttp.TraceConnectionCreateEndParams,
+        ) -> None:
+            stats.connections_created += 1
+
+        async def on_reuse(
+            session: aiohttp.ClientSession,
+            ctx: SimpleNamespace,
+            params: aiohttp.TraceConnectionReuseconnParams,
+        ) -> None:
+            stats.connections_reused += 1
+
+        trace_config.on_connection_queued_start.append(on_queued_start)
+        trace_config.on_connection_queued_end.append(on_queued_end)
+        trace_config.on_connection_create_end.append(on_create_end)
+        trace_config.on_connection_reuseconn.append(on_reuse)
+        return trace_config
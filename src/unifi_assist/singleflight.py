@@ -0,0 +1,85 @@
+"""Coalescing of identical in-flight requests."""
+
+import asyncio
+import copy
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class SingleFlightStats:
+    """Request coalescing counters.
+
+    Attributes:
+        calls: Number of calls made through the group
+        executions: Number of calls that actually ran their request
+        coalesced: Number of calls answered by another caller's request
+    """
+
+    calls: int = 0
+    executions: int = 0
+    coalesced: int = 0
+
+
+class _Flight(Generic[T]):
+    """A running request and the number of callers waiting on it."""
+
+    def __init__(self, task: "asyncio.Task[T]"):
+        self.task = task
+        self.callers = 1
+
+
+class SingleFlight:
+    """Run at most one request per key at a time.
+
+    Callers that ask for a key while a request for it is already running
+    wait for that request instead of starting their own. Whenever a result
+    is shared between several callers, each receives its own deep copy so
+    that none of them can mutate another's data. Errors are raised to
+    every waiting caller. Cancelling one caller does not cancel the request
+    for the others.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the group."""
+        self.stats = SingleFlightStats()
+        self._flights: Dict[Hashable, _Flight[Any]] = {}
+
+    def __len__(self) -> int:
+        """Number of requests currently in flight."""
+        return len(self._flights)
+
+    async def do(self, key: Hashable, request: Callable[[], Awaitable[T]]) -> T:
+        """Run ``request`` unless an identical one is already in flight.
+
+        Args:
+            key: Identity of the request, e.g. method and URL
+            request: Factory for the request coroutine
+
+        Returns:
+            The request result, copied if it is shared
+        """
+        self.stats.calls += 1
+        flight = self._flights.get(key)
+        if flight is None:
+            self.stats.executions += 1
+            flight = _Flight(asyncio.ensure_future(request()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda task: self._finish(key, task))
+        else:
+            self.stats.coalesced += 1
+            flight.callers += 1
+
+        result: T = await asyncio.shield(flight.task)
+        if flight.callers > 1:
+            return copy.deepcopy(result)
+        return result
+
+    def _finish(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        """Forget a finished request."""
+        self._flights.pop(key, None)
+        if not task.cancelled():
+            # Mark the error as retrieved if every caller was cancelled
+            task.exception()
@@ -0,0 +1,387 @@
+"""Content-addressed, delta-compressed store for captured API responses."""
+
+import bisect
+import hashlib
+import json
+import os
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+DEFAULT_SEGMENT_SIZE = 64 * 1024 * 1024
+MAX_DELTA_CHAIN = 16
+INDEX_FILE = "index.jsonl"
+
+
+def canonical_json(data: Any) -> bytes:
+    """Serialize data deterministically so equal payloads hash equally."""
+    return json.dumps(data, sort_keys=True, separators=(",", ":")).encode()
+
+
+def _keyed(items: Any) -> Optional[Dict[str, Any]]:
+    """Index a list of records by ``id`` if every record has a unique one."""
+    if not isinstance(items, list):
+        return None
+    keyed: Dict[str, Any] = {}
+    for item in items:
+        if not isinstance(item, dict) or not isinstance(item.get("id"), str):
+            return None
+        if item["id"] in keyed:
+            return None
+        keyed[item["id"]] = item
+    return keyed
+
+
+def _items_delta(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Diff two record lists keyed by ``id``."""
+    delta: Dict[str, Any] = {
+        "upsert": {
+            item_id: item for item_id, item in new.items() if old.get(item_id) != item
+        }
+    }
+    kept = [item_id for item_id in old if item_id in new]
+    added = [item_id for item_id in new if item_id not in old]
+    if list(new) == kept + added:
+        # Usual case: records keep their order, so only removals and the
+        # order of added records are needed; upsert loses its order when
+        # serialized with sorted keys
+        delta["remove"] = [item_id for item_id in old if item_id not in new]
+        delta["added"] = added
+    else:
+        delta["order"] = list(new)
+    return delta
+
+
+def make_delta(base: Any, new: Any) -> Optional[Dict[str, Any]]:
+    """Describe ``new`` as changes to ``base``.
+
+    Top-level keys are compared individually and ``data`` lists are diffed
+    record by record using their ``id``.
+
+    Args:
+        base: Previous payload
+        new: Current payload
+
+    Returns:
+        Delta, or None if the payloads cannot be diffed
+    """
+    if not isinstance(base, dict) or not isinstance(new, dict):
+        return None
+    delta: Dict[str, Any] = {
+        "set": {},
+        "unset": sorted(key for key in base if key not in new),
+    }
+    for key, value in new.items():
+        if key in base and base[key] == value:
+            continue
+        old_items, new_items = _keyed(base.get(key)), _keyed(value)
+        if key == "data" and old_items is not None and new_items is not None:
+            delta["items"] = _items_delta(old_items, new_items)
+        else:
+            delta["set"][key] = value
+    return delta
+
+
+def apply_delta(base: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """Rebuild a payload from its base and a delta from ``make_delta``."""
+    result = {key: value for key, value in base.items() if key not in delta["unset"]}
+    result.update(delta["set"])
+    items = delta.get("items")
+    if items is not None:
+        old_items = _keyed(base.get("data")) or {}
+        upsert = items["upsert"]
+        order = items.get("order")
+        if order is None:
+            removed = set(items["remove"])
+            order = [item_id for item_id in old_items if item_id not in removed]
+            added = items.get("added")
+            if added is None:
+                # Deltas written before "added" was recorded
+                added = [item_id for item_id in upsert if item_id not in old_items]
+            order += added
+        result["data"] = [
+            upsert[item_id] if item_id in upsert else old_items[item_id]
+            for item_id in order
+        ]
+    return result
+
+
+@dataclass(frozen=True)
+class BlobRef:
+    """Location of a stored payload in a segment file."""
+
+    digest: str
+    segment: int
+    offset: int
+    length: int
+    base: Optional[str] = None
+    depth: int = 0
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """A captured response."""
+
+    endpoint: str
+    site: Optional[str]
+    captured_at: str
+    digest: str
+    data: Dict[str, Any]
+
+
+class SnapshotStore:
+    """Append-only store of captured API responses.
+
+    Payloads are addressed by the SHA-256 of their canonical JSON, so a
+    payload that was already captured is never written again. New payloads
+    are stored as a delta against the previous capture of the same
+    endpoint and site when that is smaller, with a full copy at least
+    every ``MAX_DELTA_CHAIN`` captures. Blobs are zlib-compressed and
+    appended to segment files. An append-only JSON Lines index, loaded into
+    memory on open, finds any endpoint, site and capture time without
+    scanning the directory.
+
+    Example:
+        with SnapshotStore("examples/snapshots") as store:
+            store.put("devices", response, site=site_id)
+            latest = store.get("devices", site=site_id)
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        segment_size: int = DEFAULT_SEGMENT_SIZE,
+        fsync: bool = False,
+    ):
+        """Open or create a store.
+
+        Args:
+            root: Store directory
+            segment_size: Size at which a new segment file is started
+            fsync: Whether to fsync after every write
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.segment_size = segment_size
+        self.fsync = fsync
+        self._blobs: Dict[str, BlobRef] = {}
+        self._captures: Dict[Tuple[str, Optional[str]], List[Tuple[str, str]]] = {}
+        self._segment = 0
+        self._segment_file: Optional[BinaryIO] = None
+        self._index_file: Optional[BinaryIO] = None
+        self._load_index()
+
+    def __enter__(self) -> "SnapshotStore":
+        """Context manager entry."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type],
+        exc_val: Optional[Exception],
+        exc_tb: Optional[Any],
+    ) -> None:
+        """Context manager exit."""
+        self.close()
+
+    def close(self) -> None:
+        """Flush and close open files."""
+        for handle in (self._segment_file, self._index_file):
+            if handle is not None:
+                handle.flush()
+                os.fsync(handle.fileno())
+                handle.close()
+        self._segment_file = None
+        self._index_file = None
+
+    def put(
+        self,
+        endpoint: str,
+        data: Dict[str, Any],
+        site: Optional[str] = None,
+        captured_at: Optional[str] = None,
+    ) -> Snapshot:
+        """Store a captured response.
+
+        Args:
+            endpoint: Endpoint name, e.g. "devices"
+            data: Response data
+            site: Site identifier, if the endpoint is per-site
+            captured_at: ISO 8601 capture time, defaults to now
+
+        Returns:
+            The stored snapshot
+        """
+        captured_at = captured_at or datetime.now().isoformat()
+        payload = canonical_json(data)
+        digest = hashlib.sha256(payload).hexdigest()
+        if digest not in self._blobs:
+            self._write_blob(digest, payload, data, self.latest_digest(endpoint, site))
+
+        self._append_index(
+            {
+                "type": "capture",
+                "endpoint": endpoint,
+                "site": site,
+                "captured_at": captured_at,
+                "digest": digest,
+            }
+        )
+        self._record_capture(endpoint, site, captured_at, digest)
+        return Snapshot(endpoint, site, captured_at, digest, data)
+
+    def get(
+        self,
+        endpoint: str,
+        site: Optional[str] = None,
+        at: Optional[Union[str, datetime]] = None,
+    ) -> Optional[Snapshot]:
+        """Look up the capture of an endpoint that was current at a time.
+
+        Args:
+            endpoint: Endpoint name
+            site: Site identifier
+            at: Capture time to look up; the latest capture if not given
+
+        Returns:
+            Snapshot, or None if nothing was captured by then
+        """
+        captures = self._captures.get((endpoint, site))
+        if not captures:
+            return None
+        if at is None:
+            position = len(captures)
+        else:
+            moment = at.isoformat() if isinstance(at, datetime) else at
+            position = bisect.bisect_right(captures, (moment, "\uffff"))
+        if position == 0:
+            return None
+        captured_at, digest = captures[position - 1]
+        return Snapshot(endpoint, site, captured_at, digest, self.load(digest))
+
+    def latest_digest(self, endpoint: str, site: Optional[str] = None) -> Optional[str]:
+        """Digest of the latest capture of an endpoint, if any."""
+        captures = self._captures.get((endpoint, site))
+        return captures[-1][1] if captures else None
+
+    def history(
+        self, endpoint: str, site: Optional[str] = None
+    ) -> List[Tuple[str, str]]:
+        """Capture times and digests of an endpoint, oldest first."""
+        return list(self._captures.get((endpoint, site), []))
+
+    def keys(self) -> Iterator[Tuple[str, Optional[str]]]:
+        """Endpoint and site pairs that have captures."""
+        return iter(list(self._captures))
+
+    def load(self, digest: str) -> Dict[str, Any]:
+        """Load a payload by digest, applying any delta chain."""
+        ref = self._blobs[digest]
+        path = self._segment_path(ref.segment)
+        if self._segment_file is not None:
+            self._segment_file.flush()
+        with open(path, "rb") as segment:
+            segment.seek(ref.offset)
+            blob = json.loads(zlib.decompress(segment.read(ref.length)))
+        if ref.base is None:
+            return blob  # type: ignore[no-any-return]
+        return apply_delta(self.load(ref.base), blob)
+
+    def _write_blob(
+        self,
+        digest: str,
+        payload: bytes,
+        data: Dict[str, Any],
+        base_digest: Optional[str],
+    ) -> None:
+        """Compress and append a payload, as a delta when that is smaller."""
+        blob = zlib.compress(payload, 6)
+        base: Optional[BlobRef] = self._blobs.get(base_digest) if base_digest else None
+        if base is not None and base.depth < MAX_DELTA_CHAIN:
+            delta = make_delta(self.load(base.digest), data)
+            if delta is not None:
+                compressed = zlib.compress(canonical_json(delta), 6)
+                if len(compressed) < len(blob):
+                    self._append_blob(digest, compressed, base)
+                    return
+        self._append_blob(digest, blob, None)
+
+    def _append_blob(self, digest: str, blob: bytes, base: Optional[BlobRef]) -> None:
+        """Append a compressed blob to the current segment and index it."""
+        segment = self._open_segment(len(blob))
+        offset = segment.tell()
+        segment.write(blob)
+        if self.fsync:
+            segment.flush()
+            os.fsync(segment.fileno())
+        ref = BlobRef(
+            digest=digest,
+            segment=self._segment,
+            offset=offset,
+            length=len(blob),
+            base=base.digest if base else None,
+            depth=base.depth + 1 if base else 0,
+        )
+        self._blobs[digest] = ref
+        self._append_index({"type": "blob", **ref.__dict__})
+
+    def _open_segment(self, incoming: int) -> BinaryIO:
+        """Current segment file, rolling over to a new one when full."""
+        if self._segment_file is not None:
+            if self._segment_file.tell() + incoming <= self.segment_size:
+                return self._segment_file
+            self._segment_file.close()
+            self._segment += 1
+        self._segment_file = open(self._segment_path(self._segment), "ab")
+        return self._segment_file
+
+    def _segment_path(self, segment: int) -> Path:
+        """Path of a segment file."""
+        return self.root / f"segment-{segment:06d}.bin"
+
+    def _append_index(self, record: Dict[str, Any]) -> None:
+        """Append a record to the index file."""
+        if self._index_file is None:
+            self._index_file = open(self.root / INDEX_FILE, "ab")
+        self._index_file.write(json.dumps(record).encode() + b"\n")
+        if self.fsync:
+            self._index_file.flush()
+            os.fsync(self._index_file.fileno())
+
+    def _record_capture(
+        self, endpoint: str, site: Optional[str], captured_at: str, digest: str
+    ) -> None:
+        """Add a capture to the in-memory index, keeping it sorted by time."""
+        bisect.insort(
+            self._captures.setdefault((endpoint, site), []), (captured_at, digest)
+        )
+
+    def _load_index(self) -> None:
+        """Load the index file into memory."""
+        path = self.root / INDEX_FILE
+        if not path.exists():
+            return
+        with open(path, "r+b") as index:
+            content = index.read()
+            complete = content.rfind(b"\n") + 1
+            if complete < len(content):
+                # A crash cut off the last record; drop it so appends
+                # start on a fresh line
+                index.truncate(complete)
+        for line in content[:complete].splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.pop("type") == "blob":
+                ref = BlobRef(**record)
+                self._blobs[ref.digest] = ref
+                self._segment = max(self._segment, ref.segment)
+            else:
+                self._record_capture(
+                    record["endpoint"],
+                    record["site"],
+                    record["captured_at"],
+                    record["digest"],
+                )
@@ -0,0 +1,291 @@
+"""Incremental device synchronization based on summary fingerprints."""
+
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import dataclass, field
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+)
+
+if TYPE_CHECKING:
+    from .client import UniFiClient
+
+DEFAULT_SYNC_CONCURRENCY = 16
+
+ADDED = "added"
+MODIFIED = "modified"
+REMOVED = "removed"
+
+
+def fingerprint(
+    record: Mapping[str, Any], fields: Optional[Sequence[str]] = None
+) -> str:
+    """Hash a device summary record.
+
+    Args:
+        record: Device record from the device list
+        fields: Keys to include; all keys if not given
+
+    Returns:
+        Hex digest that changes whenever the included values change
+    """
+    if fields is not None:
+        record = {key: record.get(key) for key in fields}
+    encoded = json.dumps(record, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+@dataclass
+class DeviceState:
+    """Last known state of a device."""
+
+    site_id: str
+    fingerprint: str
+    summary: Dict[str, Any]
+    details: Optional[Dict[str, Any]] = None
+    statistics: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class DeviceChange:
+    """A device that was added, modified or removed since the last sync.
+
+    Attributes:
+        kind: "added", "modified" or "removed"
+        site_id: Site the device belongs to
+        device_id: Device identifier
+        summary: Device record from the device list
+        details: Freshly fetched details, None for removals or failures
+        statistics: Freshly fetched statistics, None if not requested,
+            for removals, or on failure
+        error: Exception raised while fetching, if any
+    """
+
+    kind: str
+    site_id: str
+    device_id: str
+    summary: Dict[str, Any]
+    details: Optional[Dict[str, Any]] = None
+    statistics: Optional[Dict[str, Any]] = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the device was fetched successfully."""
+        return self.error is None
+
+
+@dataclass
+class SyncResult:
+    """Outcome of one sync round.
+
+    Attributes:
+        changes: Added, modified and removed devices
+        devices: Number of devices listed
+        unchanged: Number of devices whose fingerprint did not change
+        fetches: Number of devices whose details were fetched
+        failed_sites: Sites whose device list could not be fetched
+        duration: Round wall-clock time in seconds
+    """
+
+    changes: List[DeviceChange] = field(default_factory=list)
+    devices: int = 0
+    unchanged: int = 0
+    fetches: int = 0
+    failed_sites: List[str] = field(default_factory=list)
+    duration: float = 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """Summarize the round as a plain dictionary suitable for logging."""
+        counts = {kind: 0 for kind in (ADDED, MODIFIED, REMOVED)}
+        for change in self.changes:
+            counts[change.kind] += 1
+        return {
+            "devices": self.devices,
+            "unchanged": self.unchanged,
+            "fetches": self.fetches,
+            "failed_sites": len(self.failed_sites),
+            "duration": round(self.duration, 3),
+            **counts,
+        }
+
+
+class DeviceSync:
+    """Keeps device details in sync with the controller at O(changes) cost.
+
+    Each round lists devices for every site and compares a fingerprint of
+    each summary record with the one seen last time. Details, and
+    optionally statistics, are fetched only for devices that are new or
+    whose fingerprint changed; devices that disappeared are reported as
+    removed. A device whose fetch fails keeps its old fingerprint and is
+    retried on the next round. Devices of a site whose listing fails are
+    left untouched rather than reported as removed.
+
+    Example:
+        sync = DeviceSync(client)
+        result = await sync.run()
+        for change in result.changes:
+            ...
+    """
+
+    def __init__(self, client: "UniFiClient", fields: Optional[Sequence[str]] = None):
+        """Initialize the sync.
+
+        Args:
+            client: Client to sync with
+            fields: Summary keys that make up the fingerprint, e.g. ``("state",
+                "firmwareVersion")``; the whole record if not given
+        """
+        self.client = client
+        self.fields = tuple(fields) if fields is not None else None
+        self.devices: Dict[str, DeviceState] = {}
+
+    async def run(
+        self,
+        concurrency: int = DEFAULT_SYNC_CONCURRENCY,
+        include_statistics: bool = True,
+    ) -> SyncResult:
+        """Run one sync round.
+
+        Args:
+            concurrency: Maximum detail and statistics requests in flight
+            include_statistics: Whether to fetch statistics for changed devices
+
+        Returns:
+            Changes since the previous round
+        """
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1")
+
+        # Settings stay local, so concurrent rounds do not change each other's
+        semaphore = asyncio.Semaphore(concurrency)
+        start = time.perf_counter()
+        result = SyncResult()
+        listings = await self._list_devices(result)
+        seen = {device_id for summaries in listings.values() for device_id in summaries}
+        result.devices = len(seen)
+
+        pending = []
+        for site_id, summaries in listings.items():
+            for device_id, summary in summaries.items():
+                digest = fingerprint(summary, self.fields)
+                state = self.devices.get(device_id)
+                if state is not None and state.fingerprint == digest:
+                    state.summary = summary
+                    # A device can move to another site without changing
+                    state.site_id = site_id
+                    result.unchanged += 1
+                    continue
+                kind = ADDED if state is None else MODIFIED
+                pending.append(
+                    self._refresh(
+                        kind,
+                        site_id,
+                        device_id,
+                        summary,
+                        digest,
+                        semaphore,
+                        include_statistics,
+                    )
+                )
+        result.changes.extend(await asyncio.gather(*pending))
+        result.fetches = len(pending)
+        result.changes.extend(self._remove_missing(seen, result.failed_sites))
+
+        result.duration = time.perf_counter() - start
+        self.client.logger.info("device_sync_complete", **result.summary())
+        return result
+
+    async def _list_devices(
+        self, result: SyncResult
+    ) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """List device summaries per site, skipping sites that fail."""
+        sites = await self.client.get_sites()
+        site_ids = [site["id"] for site in sites.get("data", []) if site.get("id")]
+        listings = await asyncio.gather(
+            *(self._list_site(site_id) for site_id in site_ids),
+            return_exceptions=True,
+        )
+
+        by_site: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for site_id, listing in zip(site_ids, listings):
+            if isinstance(listing, BaseException):
+                result.failed_sites.append(site_id)
+                self.client.logger.warning(
+                    "device_sync_site_failed", site_id=site_id, error=str(listing)
+                )
+                continue
+            by_site[site_id] = listing
+        return by_site
+
+    async def _list_site(self, site_id: str) -> Dict[str, Dict[str, Any]]:
+        """List the device summaries of one site by device ID."""
+        summaries: Dict[str, Dict[str, Any]] = {}
+        async for device in self.client.iter_devices(site_id):
+            if device.get("id"):
+                summaries[device["id"]] = device
+        return summaries
+
+    async def _refresh(
+        self,
+        kind: str,
+        site_id: str,
+        device_id: str,
+        summary: Dict[str, Any],
+        digest: str,
+        semaphore: asyncio.Semaphore,
+        include_statistics: bool,
+    ) -> DeviceChange:
+        """Fetch a new or changed device and record its fingerprint."""
+        change = DeviceChange(kind, site_id, device_id, summary)
+        async with semaphore:
+            try:
+                change.details, change.statistics = await asyncio.gather(
+                    self.client.get_device_details(site_id, device_id),
+                    self._statistics(site_id, device_id, include_statistics),
+                )
+            except Exception as exc:
+                change.error = exc
+                self.client.logger.warning(
+                    "device_sync_fetch_failed", device_id=device_id, error=str(exc)
+                )
+                return change
+
+        self.devices[device_id] = DeviceState(
+            site_id, digest, summary, change.details, change.statistics
+        )
+        return change
+
+    async def _statistics(
+        self, site_id: str, device_id: str, include: bool
+    ) -> Optional[Dict[str, Any]]:
+        """Fetch statistics if they are requested."""
+        if not include:
+            return None
+        return await self.client.get_device_statistics(site_id, device_id)
+
+    def _remove_missing(
+        self, seen: Set[str], failed_sites: Sequence[str]
+    ) -> List[DeviceChange]:
+        """Forget devices that are gone, except from sites that failed to list."""
+        removed = [
+            device_id
+            for device_id, state in self.devices.items()
+            if device_id not in seen and state.site_id not in failed_sites
+        ]
+        changes = []
+        for device_id in removed:
+            state = self.devices.pop(device_id)
+            changes.append(
+                DeviceChange(REMOVED, state.site_id, device_id, state.summary)
+            )
+        return changes
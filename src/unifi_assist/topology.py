@@ -0,0 +1,314 @@
+"""Indexed topology of devices and clients with an uplink graph."""
+
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+)
+
+from .crawl import CrawlRecord
+from .sync import REMOVED, DeviceChange
+
+DEVICE = "device"
+CLIENT = "client"
+
+Record = Dict[str, Any]
+
+
+def normalize_mac(mac: str) -> str:
+    """Lower-case a MAC address and use colons as separators."""
+    return mac.strip().lower().replace("-", ":")
+
+
+def uplink_of(record: Mapping[str, Any]) -> Optional[str]:
+    """The uplink device a device or client record names, if any."""
+    uplink = record.get("uplink")
+    if "uplinkDeviceId" in record:
+        device_id = record["uplinkDeviceId"]
+    elif isinstance(uplink, Mapping):
+        device_id = uplink.get("deviceId")
+    else:
+        return None
+    return str(device_id) if device_id else None
+
+
+def _has_uplink(record: Mapping[str, Any]) -> bool:
+    """Whether a record says anything about its uplink."""
+    return "uplinkDeviceId" in record or isinstance(record.get("uplink"), Mapping)
+
+
+class Topology:
+    """Devices and clients of every site, indexed for constant-time lookups.
+
+    Records are kept by ID, with hash indexes by MAC address, IP address
+    and device model, and an uplink graph linking every device and client
+    to the device it is connected through. All of it is updated in place
+    as device lists, device details and client lists arrive, so a lookup
+    never scans the fleet and a subtree query only visits the subtree.
+
+    Device summaries do not name an uplink; the graph learns device
+    uplinks from device details, and client uplinks from client lists.
+
+    Example:
+        topology = Topology()
+        async for record in client.crawl_inventory():
+            topology.add(record)
+        switch = topology.find_mac("f4:e2:c6:00:00:01")
+        behind = topology.clients_behind(switch["id"])
+        path = topology.uplink_path(behind[0]["id"])
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty topology."""
+        self._records: Dict[str, Record] = {}
+        self._kinds: Dict[str, str] = {}
+        self._sites: Dict[str, str] = {}
+        self._members: Dict[str, Dict[str, Set[str]]] = {DEVICE: {}, CLIENT: {}}
+        self._by_mac: Dict[str, str] = {}
+        self._by_ip: Dict[str, Set[str]] = {}
+        self._by_model: Dict[str, Set[str]] = {}
+        self._parents: Dict[str, str] = {}
+        self._children: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        """Number of devices and clients."""
+        return len(self._records)
+
+    def __contains__(self, node_id: object) -> bool:
+        """Whether a device or client is known."""
+        return node_id in self._records
+
+    def update_devices(
+        self, site_id: str, records: Iterable[Record], complete: bool = False
+    ) -> None:
+        """Add or update devices of a site.
+
+        Args:
+            site_id: Site the devices belong to
+            records: Device summaries or details; fields missing from a
+                record keep their previous values
+            complete: Whether the records are the site's whole device list,
+                so that devices missing from it are removed
+        """
+        self._update(DEVICE, site_id, records, complete)
+
+    def update_clients(
+        self, site_id: str, records: Iterable[Record], complete: bool = False
+    ) -> None:
+        """Add or update clients of a site.
+
+        Args:
+            site_id: Site the clients belong to
+            records: Client records
+            complete: Whether the records are the site's whole client list,
+                so that clients missing from it are removed
+        """
+        self._update(CLIENT, site_id, records, complete)
+
+    def remove(self, node_ids: Iterable[str]) -> None:
+        """Remove devices or clients.
+
+        Nodes connected through a removed device keep their uplink, so they
+        reattach if the device comes back.
+        """
+        for node_id in node_ids:
+            record = self._records.pop(node_id, None)
+            if record is None:
+                continue
+            kind = self._kinds.pop(node_id)
+            self._members[kind][self._sites.pop(node_id)].discard(node_id)
+            self._unindex(node_id, record)
+            self._set_parent(node_id, None)
+
+    def add(self, record: CrawlRecord) -> None:
+        """Feed a fleet crawl record into the topology."""
+        if not record.ok or record.site_id is None:
+            return
+        if record.kind == "devices":
+            self.update_devices(record.site_id, record.data.get("data", []), True)
+        elif record.kind == "clients":
+            self.update_clients(record.site_id, record.data.get("data", []), True)
+        elif record.kind == "device_details":
+            self.update_devices(record.site_id, [record.data])
+
+    def apply(self, changes: Iterable[DeviceChange]) -> None:
+        """Feed the changes of a ``DeviceSync`` round into the topology."""
+        changes = list(changes)
+        self.remove(change.device_id for change in changes if change.kind == REMOVED)
+        for change in changes:
+            if change.kind != REMOVED:
+                self.update_devices(
+                    change.site_id, [{**change.summary, **(change.details or {})}]
+                )
+
+    def get(self, node_id: str) -> Optional[Record]:
+        """Device or client record by ID."""
+        return self._records.get(node_id)
+
+    def kind(self, node_id: str) -> Optional[str]:
+        """Whether an ID is a "device" or a "client", None if unknown."""
+        return self._kinds.get(node_id)
+
+    def site_of(self, node_id: str) -> Optional[str]:
+        """Site of a device or client."""
+        return self._sites.get(node_id)
+
+    def find_mac(self, mac: str) -> Optional[Record]:
+        """Device or client with a MAC address, in any site."""
+        node_id = self._by_mac.get(normalize_mac(mac))
+        return None if node_id is None else self._records[node_id]
+
+    def find_ip(self, ip: str, site_id: Optional[str] = None) -> List[Record]:
+        """Devices and clients with an IP address.
+
+        Sites often reuse private address ranges, so an address can match
+        one record per site.
+
+        Args:
+            ip: IP address
+            site_id: Only return matches from this site
+        """
+        return [
+            self._records[node_id]
+            for node_id in sorted(self._by_ip.get(ip, ()))
+            if site_id is None or self._sites[node_id] == site_id
+        ]
+
+    def devices_by_model(self, model: str) -> List[Record]:
+        """Devices of a model, in every site."""
+        return [
+            self._records[node_id] for node_id in sorted(self._by_model.get(model, ()))
+        ]
+
+    def devices(self, site_id: str) -> List[Record]:
+        """Devices of a site."""
+        return self._site_records(DEVICE, site_id)
+
+    def clients(self, site_id: str) -> List[Record]:
+        """Clients of a site."""
+        return self._site_records(CLIENT, site_id)
+
+    def parent(self, node_id: str) -> Optional[str]:
+        """ID of the device a node is connected through."""
+        return self._parents.get(node_id)
+
+    def children(self, device_id: str) -> List[str]:
+        """IDs of the devices and clients directly connected through a device."""
+        return sorted(self._children.get(device_id, ()))
+
+    def subtree(self, device_id: str) -> Iterator[str]:
+        """IDs of everything connected through a device, directly or not.
+
+        Visits only the subtree, depth first, and never the device itself.
+        """
+        seen = {device_id}
+        stack = [device_id]
+        while stack:
+            for child in self._children.get(stack.pop(), ()):
+                if child not in seen:
+                    seen.add(child)
+                    stack.append(child)
+                    yield child
+
+    def clients_behind(self, device_id: str) -> List[Record]:
+        """Clients connected through a device or any device below it."""
+        return [
+            self._records[node_id]
+            for node_id in self.subtree(device_id)
+            if self._kinds.get(node_id) == CLIENT
+        ]
+
+    def uplink_path(self, node_id: str) -> List[str]:
+        """IDs from a node up through its uplinks to the top of its tree.
+
+        The path starts with the node itself. It stops at a device without
+        a known uplink, or before visiting a node twice if the reported
+        uplinks form a loop.
+        """
+        path = [node_id]
+        seen = {node_id}
+        parent = self._parents.get(node_id)
+        while parent is not None and parent not in seen:
+            path.append(parent)
+            seen.add(parent)
+            parent = self._parents.get(parent)
+        return path
+
+    def _update(
+        self, kind: str, site_id: str, records: Iterable[Record], complete: bool
+    ) -> None:
+        """Upsert records of one kind and site, removing missing ones if asked."""
+        seen = set()
+        for record in records:
+            node_id = record.get("id")
+            if not node_id:
+                continue
+            seen.add(node_id)
+            self._upsert(kind, site_id, node_id, record)
+        if complete:
+            members = self._members[kind].get(site_id, set())
+            self.remove(members - seen)
+
+    def _upsert(self, kind: str, site_id: str, node_id: str, record: Record) -> None:
+        """Merge a record into the store and move its index entries."""
+        previous = self._records.get(node_id)
+        if previous is not None:
+            self._unindex(node_id, previous)
+            if self._sites[node_id] != site_id:
+                self._members[self._kinds[node_id]][self._sites[node_id]].discard(
+                    node_id
+                )
+            record = {**previous, **record}
+        self._records[node_id] = record
+        self._kinds[node_id] = kind
+        self._sites[node_id] = site_id
+        self._members[kind].setdefault(site_id, set()).add(node_id)
+        self._index(node_id, record)
+        if _has_uplink(record):
+            self._set_parent(node_id, uplink_of(record))
+
+    def _index(self, node_id: str, record: Record) -> None:
+        """Add a record's MAC, IP and model index entries."""
+        mac = record.get("macAddress")
+        if mac:
+            self._by_mac[normalize_mac(mac)] = node_id
+        ip = record.get("ipAddress")
+        if ip:
+            self._by_ip.setdefault(ip, set()).add(node_id)
+        model = record.get("model")
+        if model and self._kinds[node_id] == DEVICE:
+            self._by_model.setdefault(model, set()).add(node_id)
+
+    def _unindex(self, node_id: str, record: Record) -> None:
+        """Drop a record's MAC, IP and model index entries."""
+        mac = record.get("macAddress")
+        if mac and self._by_mac.get(normalize_mac(mac)) == node_id:
+            del self._by_mac[normalize_mac(mac)]
+        for index, key in ((self._by_ip, "ipAddress"), (self._by_model, "model")):
+            value = record.get(key)
+            if value in index:
+                index[value].discard(node_id)
+                if not index[value]:
+                    del index[value]
+
+    def _set_parent(self, node_id: str, parent: Optional[str]) -> None:
+        """Move a node below another device in the uplink graph."""
+        previous = self._parents.pop(node_id, None)
+        if previous is not None:
+            siblings = self._children[previous]
+            siblings.discard(node_id)
+            if not siblings:
+                del self._children[previous]
+        if parent is not None and parent != node_id:
+            self._parents[node_id] = parent
+            self._children.setdefault(parent, set()).add(node_id)
+
+    def _site_records(self, kind: str, site_id: str) -> List[Record]:
+        """Records of one kind in a site, ordered by ID."""
+        members = self._members[kind].get(site_id, ())
+        return [self._records[node_id] for node_id in sorted(members)]
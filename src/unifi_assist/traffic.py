@@ -0,0 +1,434 @@
+"""Client-side rate limiting, adaptive concurrency, retries and circuit breaking."""
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, FrozenSet, Optional, TypeVar, Union
+
+import aiohttp
+
+T = TypeVar("T")
+
+OVERLOAD_STATUSES = frozenset({429, 503})
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(Exception):
+    """Raised when requests are refused because the controller is failing."""
+
+
+class TokenBucket:
+    """Token bucket limiting the sustained request rate.
+
+    Up to ``burst`` requests may be sent at once, after which requests are
+    admitted at ``rate`` per second.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the bucket.
+
+        Args:
+            rate: Sustained requests per second
+            burst: Bucket capacity, defaults to one second's worth of requests
+            clock: Monotonic time source
+        """
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+
+        self.rate = rate
+        self.capacity = max(1.0, burst if burst is not None else rate)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        """Add the tokens accumulated since the last update."""
+        now = self._clock()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def try_acquire(self) -> bool:
+        """Take a token without waiting.
+
+        Returns:
+            True if a token was available
+        """
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            while not self.try_acquire():
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def release(self) -> None:
+        """Give back a token that was taken but not used."""
+        self._tokens = min(self.capacity, self._tokens + 1)
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD concurrency limit that backs off when the controller is overloaded.
+
+    Every success raises the limit by ``1 / limit`` (roughly one slot per
+    round of requests) and every overload signal cuts it by ``backoff``, at
+    most once per ``cooldown`` seconds so that one burst of 429s counts as a
+    single congestion event.
+    """
+
+    def __init__(
+        self,
+        initial: int = 8,
+        minimum: int = 1,
+        maximum: int = 64,
+        backoff: float = 0.5,
+        cooldown: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the limiter.
+
+        Args:
+            initial: Starting concurrency limit
+            minimum: Lowest limit to back off to
+            maximum: Highest limit to grow to
+            backoff: Factor applied to the limit on overload
+            cooldown: Minimum seconds between two decreases
+            clock: Monotonic time source
+        """
+        if not 1 <= minimum <= initial <= maximum:
+            raise ValueError("Limits must satisfy 1 <= minimum <= initial <= maximum")
+
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self._clock = clock
+        self._last_decrease = float("-inf")
+        self._condition = asyncio.Condition()
+
+    def _has_capacity(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    async def __aenter__(self) -> "AdaptiveConcurrencyLimiter":
+        """Wait for a free slot."""
+        async with self._condition:
+            await self._condition.wait_for(self._has_capacity)
+            self.in_flight += 1
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[type],
+        exc_val: Optional[Exception],
+        exc_tb: Optional[Any],
+    ) -> None:
+        """Release the slot and wake waiters that now fit under the limit."""
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify(max(1, int(self.limit) - self.in_flight))
+
+    def on_success(self) -> None:
+        """Additively grow the limit after a successful request."""
+        self.limit = min(float(self.maximum), self.limit + 1 / self.limit)
+
+    def on_overload(self) -> bool:
+        """Multiplicatively shrink the limit after an overload response.
+
+        Returns:
+            True if the limit was decreased
+        """
+        now = self._clock()
+        if now - self._last_decrease < self.cooldown:
+            return False
+        self._last_decrease = now
+        self.limit = max(float(self.minimum), self.limit * self.backoff)
+        return True
+
+
+class CircuitBreaker:
+    """Stops sending requests to a controller that keeps failing.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    requests fail fast with ``CircuitOpenError``. Once ``reset_timeout``
+    seconds have passed a single trial request is let through; its outcome
+    closes or re-opens the circuit.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds to wait before a trial request
+            clock: Monotonic time source
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._clock = clock
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        """Circuit state: closed, open or half_open."""
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at < self.reset_timeout:
+            return "open"
+        return "half_open"
+
+    def before_request(self) -> bool:
+        """Check whether a request may be sent.
+
+        Returns:
+            True if the request is the trial of a half-open circuit; it must
+            end in ``record_success``, ``record_failure`` or ``release_trial``
+
+        Raises:
+            CircuitOpenError: If the circuit is open or a trial is running
+        """
+        state = self.state
+        if state == "closed":
+            return False
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        raise CircuitOpenError(
+            f"Circuit open after {self.failures} consecutive failures"
+        )
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful request."""
+        self.failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """Let another trial through after one was abandoned."""
+        self._trial_in_flight = False
+
+    def record_failure(self) -> bool:
+        """Count a failed request.
+
+        Returns:
+            True if this failure opened the circuit
+        """
+        self.failures += 1
+        was_open = self._opened_at is not None
+        if self._trial_in_flight or self.failures >= self.failure_threshold:
+            self._opened_at = self._clock()
+            self._trial_in_flight = False
+        return not was_open and self._opened_at is not None
+
+
+@dataclass
+class RetryPolicy:
+    """Retry settings for idempotent requests.
+
+    Attributes:
+        max_attempts: Total attempts per request, including the first
+        base_delay: Delay before the first retry in seconds
+        max_delay: Upper bound for a single delay in seconds
+        statuses: HTTP statuses that are retried
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 0.2
+    max_delay: float = 10.0
+    statuses: FrozenSet[int] = field(default=RETRYABLE_STATUSES)
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Delay before the next attempt, using full jitter.
+
+        Args:
+            attempt: Number of attempts made so far
+            retry_after: Delay requested by the controller, if any
+
+        Returns:
+            Seconds to wait
+        """
+        if retry_after is not None:
+            return min(self.max_delay, retry_after)
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+
+@dataclass
+class TrafficStats:
+    """Traffic controller counters."""
+
+    requests: int = 0
+    retries: int = 0
+    overloads: int = 0
+    failures: int = 0
+    rejected: int = 0
+    circuit_opens: int = 0
+
+
+@dataclass
+class _Outcome:
+    """Classification of a failed request."""
+
+    retryable: bool
+    overload: bool
+    failure: bool
+    retry_after: Optional[float] = None
+
+
+def _retry_after(exc: aiohttp.ClientResponseError) -> Optional[float]:
+    """Parse a numeric Retry-After header from an error response."""
+    value = exc.headers.get("Retry-After") if exc.headers else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class TrafficController:
+    """Shapes requests to one controller for the highest sustainable throughput.
+
+    Requests pass through an optional token bucket, then an adaptive
+    concurrency limit. 429/503 responses shrink the limit, successes grow
+    it again. Idempotent requests that fail with a retryable status or a
+    connection error are retried with jittered exponential backoff, and a
+    circuit breaker fails fast while the controller is down.
+
+    Example:
+        traffic = TrafficController(rate=50)
+        client = UniFiClient(traffic=traffic)
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+        retry: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        """Initialize the traffic controller.
+
+        Args:
+            rate: Sustained requests per second; unlimited if not given
+            burst: Token bucket capacity
+            limiter: Adaptive concurrency limiter
+            retry: Retry policy for idempotent requests
+            breaker: Circuit breaker
+        """
+        self.bucket = TokenBucket(rate, burst) if rate is not None else None
+        self.limiter = limiter or AdaptiveConcurrencyLimiter()
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.stats = TrafficStats()
+
+    async def run(self, request: Callable[[], Awaitable[T]], idempotent: bool) -> T:
+        """Send a request under rate, concurrency and retry control.
+
+        Args:
+            request: Factory for the request coroutine, called once per attempt
+            idempotent: Whether the request may be retried
+
+        Returns:
+            The request result
+
+        Raises:
+            CircuitOpenError: If the controller is considered down
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            outcome = await self._attempt(request)
+            if not isinstance(outcome, _Attempt):
+                return outcome
+            if not (idempotent and self._should_retry(outcome.outcome, attempt)):
+                raise outcome.error
+            self.stats.retries += 1
+            await asyncio.sleep(self.retry.delay(attempt, outcome.outcome.retry_after))
+
+    def _should_retry(self, outcome: _Outcome, attempt: int) -> bool:
+        """Whether a failed attempt should be retried."""
+        return outcome.retryable and attempt < self.retry.max_attempts
+
+    async def _attempt(
+        self, request: Callable[[], Awaitable[T]]
+    ) -> Union[T, "_Attempt"]:
+        """Make one attempt, returning either the result or the failure."""
+        try:
+            trial = self.breaker.before_request()
+        except CircuitOpenError:
+            self.stats.rejected += 1
+            raise
+        try:
+            if self.bucket is not None:
+                await self.bucket.acquire()
+
+            self.stats.requests += 1
+            async with self.limiter:
+                try:
+                    result = await request()
+                except Exception as exc:
+                    outcome = self._classify(exc)
+                    self._record_failure(outcome)
+                    return _Attempt(exc, outcome)
+                self.limiter.on_success()
+                self.breaker.record_success()
+                return result
+        except BaseException:
+            # Cancelled while waiting or sending: let another trial through
+            if trial:
+                self.breaker.release_trial()
+            raise
+
+    def _classify(self, exc: Exception) -> _Outcome:
+        """Classify a request error."""
+        if isinstance(exc, aiohttp.ClientResponseError):
+            return _Outcome(
+                retryable=exc.status in self.retry.statuses,
+                overload=exc.status in OVERLOAD_STATUSES,
+                failure=exc.status >= 500,
+                retry_after=_retry_after(exc),
+            )
+        if isinstance(exc, (aiohttp.ClientError, asyncio.TimeoutError)):
+            return _Outcome(retryable=True, overload=False, failure=True)
+        return _Outcome(retryable=False, overload=False, failure=False)
+
+    def _record_failure(self, outcome: _Outcome) -> None:
+        """Feed a failed attempt into the limiter and breaker."""
+        if outcome.overload:
+            self.stats.overloads += 1
+            self.limiter.on_overload()
+        if not outcome.failure:
+            # The controller answered, so it is up even if the request failed
+            self.breaker.record_success()
+            return
+        self.stats.failures += 1
+        if self.breaker.record_failure():
+            self.stats.circuit_opens += 1
+
+
+class _Attempt:
+    """A failed attempt and its classification."""
+
+    def __init__(self, error: Exception, outcome: _Outcome):
+        self.error = error
+        self.outcome = outcome
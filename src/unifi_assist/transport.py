@@ -0,0 +1,275 @@
+"""Pluggable request transports: live HTTP, replay and record."""
+
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import aiohttp
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+from . import endpoints
+from .snapshots import SnapshotStore, canonical_json
+
+if TYPE_CHECKING:
+    from .client import UniFiClient
+
+Response = Tuple[int, Dict[str, Any], Mapping[str, str]]
+CaptureKey = Tuple[str, Optional[str]]
+
+
+def capture_key(endpoint: str) -> Optional[CaptureKey]:
+    """Snapshot name and site a GET endpoint is captured under.
+
+    Names match the ones ``scripts/capture_examples.py`` has always used:
+    sites, info, devices, clients, device_details_<id> and device_stats_<id>.
+
+    Args:
+        endpoint: API endpoint path
+
+    Returns:
+        Capture name and site, or None for endpoints that are not captured
+    """
+    template = endpoints.template_for(endpoint)
+    values = {
+        expected[1:-1]: part
+        for part, expected in zip(endpoint.strip("/").split("/"), template.split("/"))
+        if expected.startswith("{")
+    }
+    site, device = values.get("siteId"), values.get("deviceId")
+    names = {
+        endpoints.SITES: "sites",
+        endpoints.INFO: "info",
+        endpoints.DEVICES: "devices",
+        endpoints.CLIENTS: "clients",
+        endpoints.DEVICE: f"device_details_{device}",
+        endpoints.DEVICE_STATISTICS: f"device_stats_{device}",
+    }
+    name = names.get(template)
+    return (name, site) if name is not None else None
+
+
+def _page(data: Dict[str, Any], params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Slice a captured list response like the controller paginates it."""
+    items = data.get("data")
+    if not params or not isinstance(items, list):
+        return data
+    offset = max(0, int(params.get("offset", 0)))
+    limit = max(0, int(params.get("limit", len(items))))
+    page = items[offset : offset + limit]
+    return {
+        **data,
+        "offset": offset,
+        "limit": limit,
+        "count": len(page),
+        "totalCount": len(items),
+        "data": page,
+    }
+
+
+class Transport(ABC):
+    """Sends a client's requests and returns decoded responses.
+
+    Subclasses implement ``send``. A transport is bound to the client that
+    uses it when the client is created.
+    """
+
+    client: "UniFiClient"
+
+    def bind(self, client: "UniFiClient") -> None:
+        """Attach the transport to the client that sends through it."""
+        self.client = client
+
+    @abstractmethod
+    async def send(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Response:
+        """Send a single request.
+
+        Args:
+            method: HTTP method
+            endpoint: API endpoint path
+            params: Optional query parameters
+            json: Optional request body
+            headers: Extra request headers
+
+        Returns:
+            Response status, data (empty for 304 Not Modified) and headers
+        """
+
+
+class HttpTransport(Transport):
+    """Live HTTP requests through the client's pooled session."""
+
+    async def send(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Response:
+        """Send a request to the controller."""
+        return await self.client._send(method, endpoint, params, json, headers)
+
+
+class ReplayTransport(Transport):
+    """Answers GET requests from captured responses, without a controller.
+
+    Each capture is read from the store once and kept as canonical JSON
+    bytes; every request decodes a fresh copy through ``client.decode``, so
+    callers can mutate responses and replays cost what decoding a live
+    response costs, minus the network. List endpoints are paginated from
+    the captured list. Requests without a capture, and all non-GET
+    requests, fail with 404 like an unknown path on a controller.
+
+    Example:
+        with SnapshotStore("examples/snapshots") as store:
+            async with UniFiClient(transport=ReplayTransport(store)) as client:
+                devices = Inventory.devices(await client.get_devices(site_id))
+    """
+
+    def __init__(self, store: SnapshotStore, at: Optional[Union[str, datetime]] = None):
+        """Initialize the transport.
+
+        Args:
+            store: Store holding the captured responses
+            at: Replay the captures that were current at this time; the
+                latest captures if not given
+        """
+        self.store = store
+        self.at = at
+        self._bodies: Dict[CaptureKey, Optional[bytes]] = {}
+
+    async def send(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Response:
+        """Answer a request from the store."""
+        key = capture_key(endpoint) if method == "GET" else None
+        body = self._body(key) if key is not None else None
+        if body is None:
+            raise _not_captured(method, endpoint)
+        data = await self.client.decode(body)
+        return 200, _page(data, params), {}
+
+    def _body(self, key: CaptureKey) -> Optional[bytes]:
+        """Serialized capture for a key, loaded from the store on first use."""
+        if key not in self._bodies:
+            snapshot = self.store.get(key[0], key[1], at=self.at)
+            self._bodies[key] = (
+                canonical_json(snapshot.data) if snapshot is not None else None
+            )
+        return self._bodies[key]
+
+
+def _not_captured(method: str, endpoint: str) -> aiohttp.ClientResponseError:
+    """404 error for a request that has no capture to replay."""
+    url = URL(f"replay:///{endpoint}")
+    headers = CIMultiDictProxy(CIMultiDict[str]())
+    return aiohttp.ClientResponseError(
+        aiohttp.RequestInfo(url, method, headers, url),
+        (),
+        status=404,
+        message="Not captured",
+    )
+
+
+class RecordTransport(Transport):
+    """Passes requests through to another transport and captures responses.
+
+    Successful GET responses are written to the store under the names
+    ``ReplayTransport`` looks up. Paginated lists are captured whole, once
+    their last page has been received, so replays can page them with any
+    page size. Captures are written on a worker thread, one at a time, so
+    compressing and appending them does not block the event loop.
+
+    Example:
+        with SnapshotStore("examples/snapshots") as store:
+            client = UniFiClient(transport=RecordTransport(store))
+            async for record in client.crawl_inventory():
+                ...
+    """
+
+    def __init__(self, store: SnapshotStore, inner: Optional[Transport] = None):
+        """Initialize the transport.
+
+        Args:
+            store: Store to capture responses into
+            inner: Transport that sends the requests, live HTTP if not given
+        """
+        self.store = store
+        self.inner = inner or HttpTransport()
+        self.captured = 0
+        self._pages: Dict[CaptureKey, List[Any]] = {}
+        # Held on the worker thread, so writes stay serialized even when the
+        # request that started one is cancelled
+        self._write_lock = threading.Lock()
+
+    def bind(self, client: "UniFiClient") -> None:
+        """Attach this and the inner transport to the client."""
+        super().bind(client)
+        self.inner.bind(client)
+
+    async def send(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Response:
+        """Send a request and capture a successful GET response."""
+        status, data, response_headers = await self.inner.send(
+            method, endpoint, params, json, headers
+        )
+        key = capture_key(endpoint) if method == "GET" else None
+        if key is not None and status == 200:
+            await self._capture(key, data)
+        return status, data, response_headers
+
+    async def _capture(self, key: CaptureKey, data: Dict[str, Any]) -> None:
+        """Store a response, collecting pages until a list is complete."""
+        if "totalCount" not in data or not isinstance(data.get("data"), list):
+            await self._put(key, data)
+            return
+        offset = int(data.get("offset", 0))
+        items = self._pages.pop(key, []) if offset else []
+        if len(items) != offset:
+            # A page was missed; wait for the list to be read from the start
+            return
+        items.extend(data["data"])
+        if data["data"] and len(items) < int(data["totalCount"]):
+            self._pages[key] = items
+            return
+        await self._put(key, {"data": items})
+
+    async def _put(self, key: CaptureKey, data: Dict[str, Any]) -> None:
+        """Write one complete capture to the store, off the event loop."""
+        await asyncio.to_thread(self._write, key, data)
+        self.captured += 1
+
+    def _write(self, key: CaptureKey, data: Dict[str, Any]) -> None:
+        """Write a capture; the store is not safe for concurrent writers."""
+        with self._write_lock:
+            self.store.put(key[0], data, site=key[1])
@@ -0,0 +1,84 @@
+from typing import List
+
+import pytest
+
+from unifi_assist.bulk import (
+    FAILED,
+    SKIPPED,
+    SUCCEEDED,
+    TIMED_OUT,
+    BulkAction,
+    BulkProgress,
+)
+from unifi_assist.mock_controller import MockController
+
+RESTART = {"action": "RESTART"}
+
+
+@pytest.mark.asyncio
+async def test_rolling_waves_wait_for_health() -> None:
+    """Test canary-first waves, selection by predicate and health polling."""
+    async with MockController(sites=2, devices=10, restart_time=0.02) as mock:
+        async with mock.client() as client:
+            progress: List[BulkProgress] = []
+            bulk = BulkAction(
+                client,
+                RESTART,
+                lambda device: device["id"].endswith(("1", "2", "3", "4", "5")),
+                wave_size=4,
+                settle_time=0,
+                poll_interval=0.01,
+                progress=progress.append,
+            )
+            result = await bulk.run()
+
+    assert result.ok
+    assert len(result.outcomes) == 10
+    assert len(mock.stats.actions) == 10
+    assert [p.wave_size for p in progress] == [1, 2, 4, 3]
+    assert progress[-1].done == progress[-1].total == 10
+    assert all(outcome.state == "ONLINE" for outcome in result.outcomes)
+    assert result.summary()[SUCCEEDED] == 10
+
+
+@pytest.mark.asyncio
+async def test_timeouts_and_abort() -> None:
+    """Test de-duplication, and that failures stop the remaining waves."""
+    targets = [("site-0000", f"site-0000-device-{i:06d}") for i in range(6)]
+    async with MockController(sites=1, devices=6) as mock:
+        async with mock.client() as client:
+            result = await client.bulk_device_action(
+                RESTART,
+                [("site-0000", "missing"), *targets, *targets[:3]],
+                max_failures=1,
+                wait_healthy=False,
+            )
+            actions = len(mock.stats.actions)
+            bulk = BulkAction(
+                client,
+                RESTART,
+                [("site-0000", "site-0000-device-000000")],
+                settle_time=0,
+                poll_interval=0.01,
+                wave_timeout=0.05,
+            )
+            timed_out = await bulk.run()
+
+    statuses = [outcome.status for outcome in result.outcomes]
+    assert statuses[0] == FAILED
+    assert result.failed == result.outcomes[:1]
+    assert not result.aborted
+    assert statuses[1:] == [SUCCEEDED] * 6
+    assert actions == 6
+    assert timed_out.outcomes[0].status == TIMED_OUT
+    assert timed_out.outcomes[0].state == "RESTARTING"
+
+    async with MockController(sites=1, devices=6, error_rate=1.0) as mock:
+        async with mock.client() as client:
+            result = await client.bulk_device_action(
+                RESTART,
+                targets,
+                max_failures=1,
+            )
+    assert result.aborted
+    assert [o.status for o in result.outcomes] == [FAILED] * 2 + [SKIPPED] * 4
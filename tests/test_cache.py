@@ -0,0 +1,116 @@
+from typing import List
+
+import pytest
+
+from unifi_assist.cache import ResponseCache, cache_key
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cache_key_sorts_params() -> None:
+    """Test that parameter order does not affect the cache key."""
+    assert cache_key("devices", {"limit": 10, "offset": 0}) == cache_key(
+        "devices", {"offset": 0, "limit": 10}
+    )
+    assert cache_key("devices") == "devices"
+
+
+def test_entries_expire_per_endpoint_ttl() -> None:
+    """Test that TTLs are picked by endpoint pattern."""
+    clock = FakeClock()
+    cache = ResponseCache(default_ttl=1, ttls={"*/info": 60}, clock=clock)
+    cache.store("v1/info", "v1/info", {"applicationVersion": "9.0.99"})
+    cache.store("v1/sites", "v1/sites", {"data": []})
+
+    clock.now = 30
+    info = cache.lookup("v1/info")
+    assert info is not None and cache.is_fresh(info)
+    assert cache.lookup("v1/sites") is None
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+
+def test_zero_ttl_disables_caching() -> None:
+    """Test that endpoints with a zero TTL are never stored."""
+    cache = ResponseCache(ttls={"*/statistics/latest": 0})
+    cache.store("s/statistics/latest", "s/statistics/latest", {"uptimeSec": 1})
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted() -> None:
+    """Test that the LRU bound evicts the oldest unused entry."""
+    cache = ResponseCache(max_entries=2)
+    for key in ("a", "b"):
+        cache.store(key, key, {})
+    cache.lookup("a")
+    cache.store("c", "c", {})
+
+    assert cache.lookup("b") is None
+    assert cache.lookup("a") is not None
+    assert cache.stats.evictions == 1
+
+
+def test_stale_entries_with_validators_are_revalidated() -> None:
+    """Test that stale entries keep their ETag for a conditional GET."""
+    clock = FakeClock()
+    cache = ResponseCache(default_ttl=1, clock=clock)
+    cache.store("v1/sites", "v1/sites", {"data": [1]}, {"ETag": '"abc"'})
+
+    clock.now = 2
+    entry = cache.lookup("v1/sites")
+    assert entry is not None and not cache.is_fresh(entry)
+    assert entry.validators() == {"If-None-Match": '"abc"'}
+
+    data = cache.revalidated("v1/sites", entry)
+    assert data == {"data": [1]}
+    assert cache.is_fresh(entry)
+    assert cache.stats.revalidations == 1
+
+
+def test_cached_data_is_isolated_from_callers() -> None:
+    """Test that mutating returned data does not corrupt the cache."""
+    cache = ResponseCache()
+    original: List[int] = [1]
+    cache.store("k", "k", {"data": original})
+    original.append(2)
+
+    entry = cache.lookup("k")
+    assert entry is not None and entry.data == {"data": [1]}
+
+
+def test_invalidate_by_prefix() -> None:
+    """Test that invalidation drops only matching endpoints."""
+    cache = ResponseCache()
+    for key in ("sites/a/devices", "sites/a/devices/1", "sites/a/clients"):
+        cache.store(key, key, {})
+
+    cache.store("sites/a/devices?limit=1", "sites/a/devices", {})
+    cache.store("sites/a/devices10", "sites/a/devices10", {})
+
+    assert cache.invalidate("sites/a/devices") == 3
+    assert len(cache) == 2
+    assert cache.invalidate() == 2
+
+
+def test_responses_fetched_before_an_invalidation_are_not_stored() -> None:
+    """Test that a fetch racing an invalidation cannot store stale data."""
+    cache = ResponseCache()
+    generation = cache.generation
+    cache.invalidate("sites/a/devices")
+    cache.store("sites/a/devices", "sites/a/devices", {}, generation=generation)
+    assert len(cache) == 0
+    cache.store("sites/a/devices", "sites/a/devices", {}, generation=cache.generation)
+    assert len(cache) == 1
+
+
+def test_rejects_empty_cache() -> None:
+    """Test that a cache must hold at least one entry."""
+    with pytest.raises(ValueError, match="at least one entry"):
+        ResponseCache(max_entries=0)
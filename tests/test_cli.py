@@ -0,0 +1,129 @@
+import asyncio
+import stat
+import tempfile
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+
+from unifi_assist.cli import ask_daemon, default_socket_path, main
+from unifi_assist.daemon import Daemon, run_command
+from unifi_assist.mock_controller import MockController
+
+
+@pytest.mark.asyncio
+async def test_daemon_serves_cli_requests(tmp_path: Path) -> None:
+    """Test that CLI requests are answered by a warm daemon client."""
+    path = str(tmp_path / "d.sock")
+    async with MockController(sites=1, devices=3) as mock:
+        async with mock.client() as client:
+            daemon = Daemon(client, path)
+            serving = asyncio.create_task(daemon.serve())
+            while not Path(path).exists():
+                await asyncio.sleep(0.01)
+
+            request = {"command": "devices", "args": {"site": "site-0000"}}
+            first = await asyncio.to_thread(ask_daemon, path, request)
+            second = await asyncio.to_thread(ask_daemon, path, request)
+            status = await asyncio.to_thread(ask_daemon, path, {"command": "status"})
+            ping = await asyncio.to_thread(ask_daemon, path, {"command": "ping"})
+            await asyncio.to_thread(ask_daemon, path, {"command": "stop"})
+            await serving
+
+    assert first is not None and second is not None
+    assert first == second and len(first["result"]["data"]) == 3
+    assert status == {
+        "ok": True,
+        "result": {"site-0000": {"devices": 3, "states": {"ONLINE": 3}}},
+    }
+    assert ping is not None and ping["result"]["served"] == 3
+    assert not Path(path).exists()
+
+
+@pytest.mark.asyncio
+async def test_command_errors_are_reported() -> None:
+    """Test that failures become error responses instead of exceptions."""
+    async with MockController(sites=1) as mock:
+        async with mock.client() as client:
+            missing = await run_command(
+                client, {"command": "devices", "args": {"site": "nope"}}
+            )
+            unknown = await run_command(client, {"command": "reboot-everything"})
+
+    assert missing == {"ok": False, "error": "HTTP 404: Not Found"}
+    assert unknown["ok"] is False
+
+
+def test_ping_without_daemon(tmp_path: Path) -> None:
+    """Test that daemon-only commands fail cleanly when none is running."""
+    assert main(["--socket", str(tmp_path / "none.sock"), "ping"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_daemon_socket_safety_and_failures(tmp_path: Path) -> None:
+    """Test socket permissions, refusing non-sockets and unexpected errors."""
+    regular = tmp_path / "not-a-socket"
+    regular.write_text("keep me")
+    path = tmp_path / "d.sock"
+    async with MockController(sites=1) as mock:
+        async with mock.client() as client:
+            with pytest.raises(RuntimeError, match="not a socket"):
+                await Daemon(client, regular).start()
+
+            daemon = Daemon(client, path)
+
+            async def broken(request: Dict[str, Any]) -> Dict[str, Any]:
+                raise KeyError("id")
+
+            daemon.execute = broken  # type: ignore[method-assign]
+            await daemon.start()
+            mode = stat.S_IMODE(path.stat().st_mode)
+            reply = await asyncio.to_thread(ask_daemon, str(path), {"command": "x"})
+            await daemon.close()
+
+        # A listener that closes without answering
+        server = await asyncio.start_unix_server(
+            lambda reader, writer: writer.close(), str(path)
+        )
+        empty = await asyncio.to_thread(ask_daemon, str(path), {"command": "x"})
+        server.close()
+        await server.wait_closed()
+
+        # And one that dies part way through the reply
+        async def cut_off(
+            reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+        ) -> None:
+            await reader.readline()
+            writer.write(b'{"ok": tr')
+            await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_unix_server(cut_off, str(path))
+        partial = await asyncio.to_thread(ask_daemon, str(path), {"command": "x"})
+        server.close()
+
+    assert regular.read_text() == "keep me"
+    assert mode == 0o600
+    assert reply == {"ok": False, "error": "KeyError: 'id'"}
+    assert empty is not None and "without a reply" in empty["error"]
+    assert partial == empty
+
+
+def test_fallback_socket_dir_is_private(
+    tmp_path: Path, monkeypatch: MonkeyPatch
+) -> None:
+    """Test that without a runtime dir the socket is put in a private dir."""
+    monkeypatch.delenv("UNIFI_ASSIST_SOCKET", raising=False)
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+
+    directory = Path(default_socket_path()).parent
+    assert directory.parent == tmp_path
+    assert stat.S_IMODE(directory.stat().st_mode) == 0o700
+
+    # A directory others can write to is refused rather than used
+    directory.chmod(0o777)
+    with pytest.raises(RuntimeError, match="not a private directory"):
+        default_socket_path()
+    assert main(["ping"]) == 1
@@ -0,0 +1,109 @@
+import asyncio
+from contextlib import aclosing
+from typing import Any, Dict, List
+
+import pytest
+import structlog
+
+from unifi_assist.crawl import FleetCrawl
+
+
+class FakeClient:
+    """Stand-in client that serves a small synthetic fleet."""
+
+    def __init__(self, sites: int = 2, devices: int = 5, delay: float = 0.01):
+        self.logger = structlog.get_logger("test_crawl")
+        self.sites = sites
+        self.devices = devices
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _respond(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            return data
+        finally:
+            self.in_flight -= 1
+
+    async def get_sites(self) -> Dict[str, Any]:
+        return await self._respond(
+            {"data": [{"id": f"site-{i}"} for i in range(self.sites)]}
+        )
+
+    async def get_system_info(self) -> Dict[str, Any]:
+        return await self._respond({"applicationVersion": "9.0.99"})
+
+    async def get_devices(self, site_id: str) -> Dict[str, Any]:
+        return await self._respond(
+            {"data": [{"id": f"{site_id}-dev-{i}"} for i in range(self.devices)]}
+        )
+
+    async def get_clients(self, site_id: str) -> Dict[str, Any]:
+        return await self._respond({"data": []})
+
+    async def get_device_details(self, site_id: str, device_id: str) -> Dict[str, Any]:
+        if device_id.endswith("dev-0"):
+            raise RuntimeError("device unavailable")
+        return await self._respond({"id": device_id})
+
+    async def get_device_statistics(
+        self, site_id: str, device_id: str
+    ) -> Dict[str, Any]:
+        return await self._respond({"uptimeSec": 1})
+
+
+def make_crawl(fake: FakeClient, **kwargs: Any) -> FleetCrawl:
+    return FleetCrawl(fake, **kwargs)  # type: ignore[arg-type]
+
+
+@pytest.mark.asyncio
+async def test_crawl_covers_fleet_with_bounded_concurrency() -> None:
+    """Test that every endpoint is crawled without exceeding the limit."""
+    fake = FakeClient()
+    crawl = make_crawl(fake, concurrency=4)
+    records: List[Any] = [record async for record in crawl]
+
+    kinds = [record.kind for record in records]
+    assert kinds.count("sites") == 1
+    assert kinds.count("devices") == 2
+    assert kinds.count("clients") == 2
+    assert kinds.count("device_details") == 10
+    assert kinds.count("device_statistics") == 10
+    assert fake.max_in_flight <= 4
+    assert crawl.stats.errors == 2
+    assert set(crawl.stats.phases) == {"sites", "site_inventory", "device_details"}
+    assert crawl.stats.duration > 0
+    with pytest.raises(RuntimeError, match="iterated once"):
+        [record async for record in crawl]
+
+
+@pytest.mark.asyncio
+async def test_crawl_streams_before_completion() -> None:
+    """Test that records are yielded before the crawl finishes."""
+    crawl = make_crawl(FakeClient(devices=20), concurrency=2)
+    async with aclosing(aiter(crawl)) as records:
+        async for record in records:
+            assert record.kind == "sites"
+            assert crawl.stats.phases["sites"].requests == 1
+            break
+    assert crawl.stats.requests < 40
+
+
+@pytest.mark.asyncio
+async def test_crawl_pauses_for_a_slow_consumer() -> None:
+    """Test that at most max_pending records wait beyond those in flight."""
+    crawl = make_crawl(FakeClient(devices=20, delay=0), concurrency=2, max_pending=2)
+    async with aclosing(aiter(crawl)) as records:
+        await anext(records)
+        await asyncio.sleep(0.05)
+        # One consumed, two queued and two waiting to be queued
+        assert crawl.stats.requests == 5
+
+
+def test_crawl_rejects_invalid_concurrency() -> None:
+    """Test that a non-positive concurrency limit is rejected."""
+    with pytest.raises(ValueError, match="Concurrency must be at least 1"):
+        make_crawl(FakeClient(), concurrency=0)
@@ -0,0 +1,98 @@
+import json
+from typing import Any, Dict, List
+
+import pytest
+
+from unifi_assist import endpoints
+from unifi_assist.cache import ResponseCache
+from unifi_assist.decoding import DataStreamParser, DecodeOffload
+from unifi_assist.metrics import ClientMetrics
+from unifi_assist.mock_controller import MockController
+
+
+def count_clients(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {"count": len(data["data"])}
+
+
+@pytest.mark.asyncio
+async def test_offload_decodes_large_bodies_in_executor() -> None:
+    """Test that large bodies are decoded, and analyzers run, off the loop."""
+    offload = DecodeOffload(threshold=4096)
+    offload.register(endpoints.CLIENTS, count_clients)
+    async with MockController(sites=1, devices=2, clients=200) as mock:
+        async with mock.client(offload=offload, cache=ResponseCache()) as client:
+            clients = await client.get_clients("site-0000")
+            counted = await offload.analyze(endpoints.CLIENTS, clients)
+            paged = [c async for c in client.iter_clients("site-0000", 50)]
+            cached = await client.get_clients("site-0000")
+            devices = await client.get_devices("site-0000")
+            unanalyzed = await offload.analyze(endpoints.DEVICES, devices)
+            with pytest.raises(ValueError, match="JSON object"):
+                await offload.decode(client.json_loads, b"[]" + b" " * 4096)
+    offload.shutdown()
+
+    # Analysis leaves the responses, cached or paginated, as they were sent
+    assert counted == {"count": 200}
+    assert len(clients["data"]) == len(paged) == len(cached["data"]) == 200
+    assert unanalyzed is devices and len(devices["data"]) == 2
+    assert (offload.offloaded, offload.inline) == (6, 1)
+
+
+def test_data_stream_parser_yields_records_across_chunk_boundaries() -> None:
+    """Test incremental parsing for every chunk size, and truncation errors."""
+    document = {
+        "offset": 0,
+        "data": [{"name": "caf\u00e9", "n": [1, {}]}, 12345, "x", [], 1.5, -2.5e-07],
+        "totalCount": 6,
+        "load": 12.75,
+    }
+    for indent in (None, 1):
+        body = json.dumps(document, ensure_ascii=False, indent=indent).encode()
+        for size in range(1, 12):
+            parser = DataStreamParser()
+            records: List[Any] = []
+            for start in range(0, len(body), size):
+                records += parser.feed(body[start : start + size])
+            parser.close()
+            assert records == document["data"]
+            assert parser.fields == {"offset": 0, "totalCount": 6, "load": 12.75}
+
+    # Numbers split after a prefix that is a valid number on its own
+    for chunks in (
+        [b'{"data":[1.', b"5,2]}"],
+        [b'{"data":[1e', b"5]}"],
+        [b'{"data":[2.5E-', b"3]}"],
+        [b'{"data":[],"x":1.', b"5}"],
+    ):
+        parser = DataStreamParser()
+        records = [record for chunk in chunks for record in parser.feed(chunk)]
+        parser.close()
+        expected = json.loads(b"".join(chunks))
+        assert records == expected.pop("data")
+        assert parser.fields == expected
+
+    parser = DataStreamParser()
+    assert parser.feed(b'{"data": [1, 2') == [1]
+    with pytest.raises(ValueError, match="truncated JSON object after 1 records"):
+        parser.close()
+    with pytest.raises(ValueError, match="Expected a JSON object"):
+        DataStreamParser().feed(b"[]")
+
+
+@pytest.mark.asyncio
+async def test_streamed_iteration_matches_buffered() -> None:
+    """Test that streamed pages yield the same clients as buffered ones."""
+    metrics = ClientMetrics()
+    async with MockController(sites=1, devices=2, clients=30) as mock:
+        async with mock.client(metrics=metrics) as client:
+            buffered = [c async for c in client.iter_clients("site-0000", 7)]
+            streamed = [
+                c async for c in client.iter_clients("site-0000", 7, stream=True)
+            ]
+            async for _ in client.iter_clients("site-0000", 7, stream=True):
+                break
+
+    assert streamed == buffered and len(streamed) == 30
+    assert mock.stats.requests[endpoints.CLIENTS] == 5 + 5 + 1
+    streamed_metrics = metrics.endpoint("GET", endpoints.CLIENTS)
+    assert streamed_metrics.requests == 11 and not streamed_metrics.errors
@@ -0,0 +1,94 @@
+import csv
+import gzip
+import io
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+
+from unifi_assist import export
+from unifi_assist.export import (
+    CSV,
+    ZSTD,
+    RecordExporter,
+    _zstd,
+    crawl_rows,
+    export_records,
+)
+from unifi_assist.mock_controller import MockController
+
+
+@pytest.mark.asyncio
+async def test_streams_crawl_statistics_to_gzipped_json_lines(tmp_path: Path) -> None:
+    """Test JSON Lines export with projection and suffix-based compression."""
+    path = tmp_path / "statistics.ndjson.gz"
+    async with MockController(sites=2, devices=30) as mock:
+        async with mock.client() as client:
+            crawl = client.crawl_inventory(include_clients=False, include_details=False)
+            stats = await export_records(
+                crawl_rows(crawl, "device_statistics"),
+                path,
+                columns=["deviceId", "cpuUtilizationPct", "uplink.txRateBps"],
+                buffer_size=512,
+            )
+
+    rows = [json.loads(line) for line in gzip.decompress(path.read_bytes()).split()]
+    assert stats.records == len(rows) == 60
+    assert stats.bytes_written == path.stat().st_size < stats.bytes_encoded
+    row = next(r for r in rows if r["deviceId"] == "site-0001-device-000003")
+    assert row == {
+        "deviceId": "site-0001-device-000003",
+        "cpuUtilizationPct": 3.0,
+        "uplink.txRateBps": 3000,
+    }
+
+
+@pytest.mark.asyncio
+async def test_failed_export_is_abandoned(tmp_path: Path) -> None:
+    """Test that an error in the body is raised and the file left unfinished."""
+    path = tmp_path / "partial.ndjson.gz"
+
+    def records() -> Iterator[Dict[str, Any]]:
+        for i in range(300):
+            yield {"id": i}
+        raise RuntimeError("listing failed")
+
+    with pytest.raises(RuntimeError, match="listing failed"):
+        await export_records(records(), path, buffer_size=256)
+
+    with gzip.open(path) as partial, pytest.raises(EOFError):
+        partial.read()
+
+
+@pytest.mark.asyncio
+async def test_csv_export_to_file_object(
+    tmp_path: Path, monkeypatch: MonkeyPatch
+) -> None:
+    """Test CSV export with inferred columns and nested values."""
+    output = io.BytesIO()
+    records = [{"id": f"c{i}", "tags": ["a", i], "name": "x,y"} for i in range(500)]
+    async with RecordExporter(output, CSV, buffer_size=1024) as exporter:
+        await exporter.write_all(records)
+        await exporter.write({"id": "last", "extra": 1})
+
+    rows = list(csv.reader(io.StringIO(output.getvalue().decode())))
+    assert rows[0] == ["id", "tags", "name"]
+    assert rows[1] == ["c0", '["a",0]', "x,y"]
+    assert rows[-1] == ["last", "", ""]
+    assert len(rows) == 502 and exporter.stats.records == 501
+
+    if _zstd() is None:
+        with pytest.raises(ValueError, match="zstd"):
+            await export_records(records, tmp_path / "zstd.ndjson", compression=ZSTD)
+        assert not (tmp_path / "zstd.ndjson").exists()
+
+    def broken(stream: Any, compression: Optional[str]) -> Any:
+        raise OSError("no space left")
+
+    monkeypatch.setattr(export, "_compressor", broken)
+    exporter = RecordExporter(tmp_path / "out.ndjson")
+    with pytest.raises(OSError):
+        await exporter.open()
+    assert exporter._file is None
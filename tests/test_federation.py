@@ -0,0 +1,102 @@
+import json
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, List, Union
+
+import pytest
+import structlog
+
+from unifi_assist.federation import (
+    SOURCE_FIELD,
+    ControllerConfig,
+    Federation,
+    Record,
+    shard_controllers,
+)
+from unifi_assist.metrics import ClientMetrics
+from unifi_assist.mock_controller import MockController
+from unifi_assist.session import ConnectionPoolConfig
+from unifi_assist.traffic import TrafficController
+
+
+def controller_config(name: str, mock: MockController) -> ControllerConfig:
+    assert mock.host is not None
+    return ControllerConfig(name, mock.host, mock.api_key, scheme="http")
+
+
+@asynccontextmanager
+async def controllers(count: int) -> AsyncIterator[List[MockController]]:
+    mocks = [MockController(sites=2, devices=3) for _ in range(count)]
+    try:
+        for mock in mocks:
+            await mock.start()
+        yield mocks
+    finally:
+        for mock in mocks:
+            await mock.stop()
+
+
+def first_device_per_site(records: List[Record]) -> List[Record]:
+    """Analysis run in the worker processes of a sharded query."""
+    return [record for record in records if record["id"].endswith("-000000")]
+
+
+def marking_loads(body: Union[str, bytes]) -> Any:
+    """Decoder that marks every listed record, to see it used in workers."""
+    data = json.loads(body)
+    for record in data.get("data", []) if isinstance(data, dict) else []:
+        record["decodedBy"] = "marking_loads"
+    return data
+
+
+@pytest.mark.asyncio
+async def test_queries_merge_and_tag_records() -> None:
+    """Test that records from every controller are merged and tagged."""
+    async with controllers(3) as mocks:
+        mocks[2].error_rate = 1.0
+        configs = [controller_config(f"c{i}", mock) for i, mock in enumerate(mocks)]
+        logger = structlog.get_logger("test_federation")
+        async with Federation(configs, logger=logger) as federation:
+            sites = await federation.sites()
+            devices = await federation.devices()
+
+    assert len(sites.records) == 4
+    assert [record[SOURCE_FIELD] for record in devices.records] == ["c0"] * 6 + [
+        "c1"
+    ] * 6
+    assert {record["siteId"] for record in devices.records} == {
+        "site-0000",
+        "site-0001",
+    }
+    assert devices.errors == {"c2": "503"}
+    assert len(devices.by_controller()["c1"]) == 6
+
+
+@pytest.mark.asyncio
+async def test_sharded_query_runs_in_workers() -> None:
+    """Test that shards are queried and analyzed in worker processes."""
+    async with controllers(3) as mocks:
+        configs = [controller_config(f"c{i}", mock) for i, mock in enumerate(mocks)]
+        logger = structlog.get_logger("test_federation")
+        async with Federation(
+            configs,
+            logger=logger,
+            pool=ConnectionPoolConfig(limit=4),
+            json_loads=marking_loads,
+        ) as federation:
+            result = await federation.sharded(
+                "devices", workers=2, analyze=first_device_per_site
+            )
+        async with Federation(
+            configs, logger=logger, metrics=ClientMetrics()
+        ) as federation:
+            with pytest.raises(ValueError, match="worker processes"):
+                await federation.sharded("devices", workers=2)
+        with pytest.raises(ValueError, match="traffic controller"):
+            Federation(configs, logger=logger, traffic=TrafficController())
+
+    assert [len(shard) for shard in shard_controllers(configs, 2)] == [2, 1]
+    assert result.ok
+    assert sorted(
+        (record[SOURCE_FIELD], record["siteId"]) for record in result.records
+    ) == [(f"c{i}", f"site-000{s}") for i in range(3) for s in range(2)]
+    assert {record["decodedBy"] for record in result.records} == {"marking_loads"}
@@ -0,0 +1,101 @@
+from typing import Any, Dict, List
+
+import pytest
+
+from unifi_assist.inventory import CLIENT_SCHEMA, Inventory, StringColumn
+
+CLIENTS: List[Dict[str, Any]] = [
+    {
+        "id": "c1",
+        "name": "Laptop",
+        "macAddress": "aa:bb:cc:00:00:01",
+        "ipAddress": "10.0.0.1",
+        "type": "WIRELESS",
+        "uplinkDeviceId": "ap-1",
+    },
+    {
+        "id": "c2",
+        "name": None,
+        "macAddress": "aa:bb:cc:00:00:02",
+        "ipAddress": "fe80::1",
+        "type": "WIRED",
+        "uplinkDeviceId": "sw-1",
+    },
+    {
+        "id": "c3",
+        "name": "Phone",
+        "macAddress": "AA-BB-CC-00-00-03",
+        "ipAddress": None,
+        "type": "WIRELESS",
+        "uplinkDeviceId": "ap-1",
+    },
+]
+
+
+@pytest.fixture
+def inventory() -> Inventory:
+    return Inventory.clients({"data": CLIENTS})
+
+
+def test_rows_round_trip(inventory: Inventory) -> None:
+    """Test that records are rebuilt from the columns."""
+    assert len(inventory) == 3
+    assert inventory.row(0) == CLIENTS[0]
+    assert inventory.row(1)["ipAddress"] == "fe80::1"
+    assert inventory.row(-1)["macAddress"] == "aa:bb:cc:00:00:03"
+    assert inventory.row(2)["ipAddress"] is None
+
+
+def test_filters_combine(inventory: Inventory) -> None:
+    """Test equality filters and mask combinators."""
+    wireless = inventory.equals("type", "WIRELESS")
+    assert wireless.count() == 2
+    assert list((wireless & inventory.equals("name", "Phone")).indices()) == [2]
+    assert list((~wireless).indices()) == [1]
+    assert inventory.select(type="WIRED", uplinkDeviceId="sw-1").count() == 1
+    assert inventory.equals("macAddress", "aa:bb:cc:00:00:03").count() == 1
+    assert inventory.equals("ipAddress", "fe80::1").count() == 1
+    assert inventory.equals("type", "UNKNOWN").count() == 0
+
+
+def test_group_count(inventory: Inventory) -> None:
+    """Test group-bys on one and several fields."""
+    assert inventory.group_count("uplinkDeviceId") == {"ap-1": 2, "sw-1": 1}
+    wireless = inventory.equals("type", "WIRELESS")
+    assert inventory.group_count("uplinkDeviceId", where=wireless) == {"ap-1": 2}
+    assert inventory.group_count("type", "uplinkDeviceId") == {
+        ("WIRELESS", "ap-1"): 2,
+        ("WIRED", "sw-1"): 1,
+    }
+
+
+def test_update_overwrites_fields(inventory: Inventory) -> None:
+    """Test that updates replace values in place."""
+    inventory.update(0, {"name": "Desktop", "ipAddress": "10.0.0.9"})
+    assert inventory.row(0)["name"] == "Desktop"
+    assert inventory.equals("ipAddress", "10.0.0.9").count() == 1
+    assert inventory.equals("name", "Laptop").count() == 0
+
+
+def test_values_that_do_not_pack_round_trip() -> None:
+    """Test invalid MAC addresses and over-long strings."""
+    odd = ["aa:bb:cc:dd:ee:ff:00:11:22", "not-a-mac", "aabb.ccdd.eeff"]
+    inventory = Inventory.clients(
+        {"data": [{**CLIENTS[0], "macAddress": mac} for mac in odd]}
+    )
+    assert [inventory.row(i)["macAddress"] for i in range(3)] == odd
+    assert list(inventory.equals("macAddress", "not-a-mac").indices()) == [1]
+    inventory.update(1, {"macAddress": "aa:bb:cc:00:00:09"})
+    assert inventory.equals("macAddress", "AA-BB-CC-00-00-09").count() == 1
+
+    column = StringColumn()
+    column.append("x" + "\u00e9" * 40_000)
+    value = column[0]
+    assert value is not None and len(value.encode()) < 0xFFFF
+    assert value.startswith("x\u00e9") and value.endswith("\u00e9")
+
+
+def test_rejects_unknown_schema_kind() -> None:
+    """Test that schemas must use known column kinds."""
+    with pytest.raises(ValueError, match="Unknown column kinds"):
+        Inventory({**CLIENT_SCHEMA, "extra": "blob"})
@@ -0,0 +1,60 @@
+import json
+import logging
+import logging.handlers
+from pathlib import Path
+from typing import Generator
+
+import pytest
+import structlog
+
+from unifi_assist.logging import is_debug_enabled, setup_logging, shutdown_logging
+
+
+@pytest.fixture(autouse=True)
+def reset_logging() -> Generator[None, None, None]:
+    shutdown_logging()
+    yield
+    shutdown_logging()
+    structlog.reset_defaults()
+
+
+def test_configures_once(tmp_path: Path) -> None:
+    """Test that repeated setup does not add handlers again."""
+    setup_logging("once", log_level="INFO", log_to_file=True, log_dir=str(tmp_path))
+    handlers = list(logging.getLogger().handlers)
+    setup_logging("once", log_level="DEBUG", log_to_file=True, log_dir=str(tmp_path))
+
+    assert logging.getLogger().handlers == handlers
+    assert [
+        isinstance(handler, logging.handlers.QueueHandler) for handler in handlers
+    ].count(True) == 1
+
+
+def test_level_filtering_skips_debug(tmp_path: Path) -> None:
+    """Test that debug events are filtered by the bound logger itself."""
+    logger = setup_logging("filtered", log_level="INFO", log_dir=str(tmp_path))
+    assert not is_debug_enabled(logger)
+
+    logger = setup_logging("filtered", log_level="DEBUG", force=True)
+    assert is_debug_enabled(logger)
+
+
+def test_queued_records_reach_rotating_files(tmp_path: Path) -> None:
+    """Test that records written by the background thread rotate by size."""
+    logger = setup_logging(
+        "rotating",
+        log_level="INFO",
+        log_to_file=True,
+        log_dir=str(tmp_path),
+        max_bytes=2_000,
+        backup_count=2,
+    )
+    for i in range(100):
+        logger.info("event", index=i)
+    shutdown_logging()
+
+    # Rendered once, by the file handler on the listener thread
+    last = json.loads((tmp_path / "rotating.json.log").read_text().splitlines()[-1])
+    assert last["event"] == "event" and last["index"] == 99
+    assert (tmp_path / "rotating.json.log.1").exists()
+    assert not (tmp_path / "rotating.json.log.3").exists()
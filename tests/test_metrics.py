@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+import pytest
+from aiohttp import TraceConfig, web
+from aiohttp.test_utils import TestServer
+
+from unifi_assist.endpoints import DEVICE_STATISTICS, SITES, template_for
+from unifi_assist.metrics import (
+    OTHER_ENDPOINT,
+    ClientMetrics,
+    Histogram,
+    LoopLagMonitor,
+    RequestTiming,
+    timing_trace_config,
+)
+from unifi_assist.session import SharedSession
+
+
+def test_template_for_groups_concrete_paths() -> None:
+    """Test that concrete paths map to their spec templates."""
+    path = "/proxy/network/integration/v1/sites/s1/devices/d1/statistics/latest"
+    assert template_for(path) == DEVICE_STATISTICS
+    assert template_for("proxy/network/integration/v1/sites?limit=5") == SITES
+    assert template_for("somewhere/else") == "somewhere/else"
+
+
+def test_histogram_quantiles() -> None:
+    """Test bucket counting and quantile interpolation."""
+    histogram = Histogram((0.01, 0.1, 1.0))
+    for value in [0.005] * 50 + [0.05] * 45 + [0.5] * 4 + [5.0]:
+        histogram.observe(value)
+
+    assert histogram.count == 100
+    assert histogram.quantile(0.5) == pytest.approx(0.01)
+    assert 0.01 < histogram.quantile(0.95) <= 0.1
+    assert histogram.quantile(1.0) == 1.0
+    assert histogram.cumulative()[-1] == ("+Inf", 100)
+
+
+def test_prometheus_export() -> None:
+    """Test that metrics render as Prometheus text."""
+    metrics = ClientMetrics()
+    path = "proxy/network/integration/v1/sites/s1/devices/d1/statistics/latest"
+    metrics.observe("GET", path, RequestTiming())
+    metrics.observe("GET", path.replace("d1", "d2"), RequestTiming(), error="503")
+
+    text = metrics.to_prometheus()
+    labels = f'method="GET",endpoint="{DEVICE_STATISTICS}"'
+    assert f"unifi_client_requests_total{{{labels}}} 2" in text
+    assert f'unifi_client_request_errors_total{{{labels},reason="503"}} 1' in text
+    assert f'_bucket{{{labels},phase="total",le="+Inf"}} 2' in text
+    assert metrics.summary()[f"GET {DEVICE_STATISTICS}"]["errors"] == 1
+
+    # Unknown paths share one label instead of one per site and device
+    for site in ("s1", "s2"):
+        metrics.observe("GET", f"sites/{site}/unknown", RequestTiming())
+    assert metrics.summary()[f"GET {OTHER_ENDPOINT}"]["requests"] == 2
+
+
+@pytest.mark.asyncio
+async def test_trace_config_records_connection_phases() -> None:
+    """Test that traced requests get connection and first-byte timings."""
+
+    async def handler(request: web.Request) -> web.Response:
+        return web.json_response({"data": []})
+
+    app = web.Application()
+    app.router.add_get("/", handler)
+    async with TestServer(app) as server:
+        shared = SharedSession()
+        assert shared.add_trace_config(timing_trace_config())
+        async with shared:
+            timing = RequestTiming()
+            async with shared.session.get(
+                server.make_url("/"), trace_request_ctx=timing
+            ) as response:
+                await response.read()
+            assert not shared.add_trace_config(TraceConfig())
+
+    assert timing.connect > 0
+    assert timing.ttfb >= timing.connect
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_monitor_sees_blocking_work() -> None:
+    """Test that synchronous work on the loop shows up as lag."""
+    async with LoopLagMonitor(interval=0.001) as lag:
+        await asyncio.sleep(0.01)
+        time.sleep(0.05)
+        await asyncio.sleep(0.01)
+
+    assert lag.histogram.count >= 2
+    assert lag.max_lag >= 0.04
+    assert lag.summary()["p99_ms"] <= lag.summary()["max_ms"]
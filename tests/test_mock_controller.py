@@ -0,0 +1,71 @@
+import aiohttp
+import pytest
+
+from unifi_assist import endpoints
+from unifi_assist.cache import ResponseCache
+from unifi_assist.mock_controller import MockController
+from unifi_assist.traffic import RetryPolicy, TrafficController
+
+
+@pytest.mark.asyncio
+async def test_serves_spec_endpoints() -> None:
+    """Test that every spec endpoint answers with synthesized records."""
+    async with MockController(sites=2, devices=3, clients=4) as mock:
+        async with mock.client() as client:
+            sites = await client.get_sites()
+            site_id = sites["data"][1]["id"]
+            devices = await client.get_devices(site_id)
+            device_id = devices["data"][0]["id"]
+            details = await client.get_device_details(site_id, device_id)
+            stats = await client.get_device_statistics(site_id, device_id)
+            clients = await client.get_clients(site_id)
+            info = await client.get_system_info()
+
+    assert len(sites["data"]) == 2
+    assert len(devices["data"]) == 3
+    assert set(devices["data"][0]) >= {"id", "name", "model", "macAddress", "state"}
+    assert details["id"] == device_id
+    assert "cpuUtilizationPct" in stats
+    assert len(clients["data"]) == 4
+    assert info["applicationVersion"] == mock.spec["info"]["version"]
+
+
+@pytest.mark.asyncio
+async def test_pagination_and_crawl() -> None:
+    """Test that paginated iteration and crawls see the whole fleet."""
+    async with MockController(sites=2, devices=45, clients=0) as mock:
+        async with mock.client() as client:
+            devices = [device async for device in client.iter_devices("site-0000", 20)]
+            crawl = client.crawl_inventory(include_clients=False)
+            records = [record async for record in crawl]
+
+    assert len({device["id"] for device in devices}) == 45
+    assert mock.stats.requests[endpoints.DEVICES] == 3 + 2
+    assert sum(record.kind == "device_details" for record in records) == 90
+    assert all(record.ok for record in records)
+
+
+@pytest.mark.asyncio
+async def test_auth_etag_and_errors() -> None:
+    """Test API key checks, conditional requests and injected errors."""
+    async with MockController(error_rate=0.0) as mock:
+        bad = mock.client(api_key="wrong")
+        with pytest.raises(aiohttp.ClientResponseError) as error:
+            await bad.get_sites()
+        assert error.value.status == 401
+        await bad.close()
+
+        now = [0.0]
+        cache = ResponseCache(default_ttl=1, clock=lambda: now[0])
+        async with mock.client(cache=cache) as client:
+            await client.get_sites()
+            now[0] = 10.0
+            await client.get_sites()
+        assert mock.stats.not_modified == 1
+
+        mock.error_rate = 1.0
+        traffic = TrafficController(retry=RetryPolicy(max_attempts=2, base_delay=0))
+        async with mock.client(traffic=traffic) as client:
+            with pytest.raises(aiohttp.ClientResponseError):
+                await client.get_sites()
+        assert mock.stats.errors[endpoints.SITES] == 2
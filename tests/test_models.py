@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from unifi_assist.decoding import default_json_loads, stdlib_loads
+from unifi_assist.models import Client, Device, DeviceStatistics, ModelValidationError
+
+BODY = json.dumps(
+    {
+        "data": [
+            {"id": "c1", "macAddress": "aa:bb:cc:00:00:01", "type": "WIRED"},
+            {"id": "c2", "macAddress": "aa:bb:cc:00:00:02", "type": "WIRELESS"},
+        ]
+    }
+).encode()
+
+
+def test_models_wrap_records_without_copying() -> None:
+    """Test that models are views over the decoded records."""
+    response = default_json_loads()(BODY)
+    clients = Client.list_from_response(response)
+
+    assert len(clients) == 2
+    assert clients[0].mac_address == "aa:bb:cc:00:00:01"
+    assert clients[1].raw is response["data"][1]
+    assert [client.type for client in clients] == ["WIRED", "WIRELESS"]
+    assert clients[1:][0] == Client(response["data"][1])
+
+
+def test_models_use_slots() -> None:
+    """Test that model instances carry no per-instance dictionary."""
+    device = Device({"id": "d1"})
+    assert not hasattr(device, "__dict__")
+    with pytest.raises(AttributeError):
+        device.extra = 1  # type: ignore[attr-defined]
+
+
+def test_validation_is_lazy() -> None:
+    """Test that invalid records are only rejected on validate()."""
+    clients = Client.list_from_bytes(b'{"data": [{"name": 1}]}', stdlib_loads)
+    assert clients[0].get("name") == 1
+
+    with pytest.raises(ModelValidationError, match="missing id.*name is int"):
+        clients.validate()
+
+
+def test_numeric_fields_accept_integers() -> None:
+    """Test that float fields accept integral JSON numbers."""
+    stats = DeviceStatistics.from_bytes(b'{"cpuUtilizationPct": 5, "uptimeSec": 10}')
+    assert stats.validate().cpu_utilization_pct == 5
@@ -0,0 +1,73 @@
+from typing import Any, Dict, List, Optional
+
+import pytest
+import structlog
+
+from unifi_assist.client import UniFiClient
+
+
+class PagedClient(UniFiClient):
+    """Client whose GET requests are answered from an in-memory list."""
+
+    def __init__(self, items: List[Dict[str, Any]], paginated: bool = True):
+        super().__init__(
+            host="controller.test",
+            api_key="test-key",
+            logger=structlog.get_logger("test_pagination"),
+        )
+        self.items = items
+        self.paginated = paginated
+        self.requests: List[Optional[Dict[str, Any]]] = []
+
+    async def _get(
+        self, endpoint: str, params: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        self.requests.append(params)
+        if not self.paginated:
+            return {"data": list(self.items)}
+        assert params is not None
+        offset, limit = params["offset"], params["limit"]
+        page = self.items[offset : offset + limit]
+        return {
+            "offset": offset,
+            "limit": limit,
+            "count": len(page),
+            "totalCount": len(self.items),
+            "data": page,
+        }
+
+
+@pytest.mark.asyncio
+async def test_iter_clients_pages_through_all_items() -> None:
+    """Test that iteration requests consecutive pages until exhausted."""
+    items = [{"id": str(i)} for i in range(25)]
+    client = PagedClient(items)
+    async with client:
+        received = [item async for item in client.iter_clients("site", page_size=10)]
+
+    assert received == items
+    assert client.requests == [
+        {"offset": 0, "limit": 10},
+        {"offset": 10, "limit": 10},
+        {"offset": 20, "limit": 10},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_iter_devices_handles_unpaginated_response() -> None:
+    """Test that a plain data response is treated as a single page."""
+    items = [{"id": str(i)} for i in range(10)]
+    client = PagedClient(items, paginated=False)
+    async with client:
+        received = [item async for item in client.iter_devices("site", page_size=10)]
+
+    assert received == items
+    assert len(client.requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_iter_devices_rejects_invalid_page_size() -> None:
+    """Test that a non-positive page size is rejected."""
+    async with PagedClient([]) as client:
+        with pytest.raises(ValueError, match="Page size must be at least 1"):
+            await anext(client.iter_devices("site", page_size=0))
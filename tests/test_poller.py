@@ -0,0 +1,87 @@
+import asyncio
+from typing import Any, AsyncGenerator, Dict
+
+import pytest
+import structlog
+
+from unifi_assist.poller import StatisticsPoller, TimeSeries
+
+
+class FakeClient:
+    """Stand-in client with one site and a few devices."""
+
+    def __init__(self, devices: int = 3):
+        self.logger = structlog.get_logger("test_poller")
+        self.devices = devices
+        self.polls = 0
+
+    async def get_sites(self) -> Dict[str, Any]:
+        return {"data": [{"id": "site"}]}
+
+    async def iter_devices(self, site_id: str) -> AsyncGenerator[Dict[str, Any], None]:
+        for i in range(self.devices):
+            yield {"id": f"dev-{i}"}
+
+    async def get_device_statistics(
+        self, site_id: str, device_id: str
+    ) -> Dict[str, Any]:
+        self.polls += 1
+        return {"cpuUtilizationPct": self.polls, "uplink": {"txRateBps": 100}}
+
+
+def test_series_wraps_and_rolls_up() -> None:
+    """Test that the ring buffer keeps only the newest samples."""
+    series = TimeSeries(["cpuUtilizationPct", "uplink.txRateBps"], capacity=4)
+    for second in range(6):
+        series.append(float(second), {"cpuUtilizationPct": second * 10})
+
+    assert len(series) == 4
+    assert series.values("cpuUtilizationPct") == [20, 30, 40, 50]
+    assert series.values("uplink.txRateBps") == []
+    assert series.values("cpuUtilizationPct", window=1) == [40, 50]
+
+    rollup = series.rollup("cpuUtilizationPct")
+    assert rollup is not None
+    assert (rollup.minimum, rollup.maximum, rollup.mean, rollup.p95) == (
+        20,
+        50,
+        35,
+        50,
+    )
+    assert series.rollup("uplink.txRateBps") is None
+
+
+def test_series_rejects_unknown_field() -> None:
+    """Test that only configured statistics can be read."""
+    series = TimeSeries(["cpuUtilizationPct"])
+    with pytest.raises(KeyError, match="Unknown statistic"):
+        series.values("memoryUtilizationPct")
+
+
+@pytest.mark.asyncio
+async def test_poll_once_samples_every_device() -> None:
+    """Test that one round discovers and samples all devices."""
+    fake = FakeClient()
+    poller = StatisticsPoller(fake, fields=["cpuUtilizationPct"])  # type: ignore[arg-type]
+
+    assert await poller.poll_once() == 3
+    assert await poller.poll_once() == 3
+    assert set(poller.devices) == {"dev-0", "dev-1", "dev-2"}
+    assert len(poller.series("dev-0")) == 2
+
+
+@pytest.mark.asyncio
+async def test_subscribers_receive_new_samples() -> None:
+    """Test that background polling publishes samples to subscribers."""
+    fake = FakeClient(devices=2)
+    poller = StatisticsPoller(fake, interval=0.01)  # type: ignore[arg-type]
+    subscription = poller.subscribe()
+    receive = asyncio.ensure_future(anext(subscription))
+    await asyncio.sleep(0)
+
+    async with poller:
+        sample = await asyncio.wait_for(receive, timeout=1)
+    await subscription.aclose()
+
+    assert sample.device_id in {"dev-0", "dev-1"}
+    assert len(sample.values) == len(poller.fields)
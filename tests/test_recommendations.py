@@ -0,0 +1,120 @@
+from typing import Any, Dict
+
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+
+from unifi_assist import endpoints
+from unifi_assist.mock_controller import MockController
+from unifi_assist.recommendations import (
+    DEVICES,
+    ERROR,
+    FAIL,
+    PASS,
+    STATISTICS,
+    AccessPointLoad,
+    Check,
+    CheckResult,
+    ConsistentFirmware,
+    FirmwareUpToDate,
+    RecommendationChecker,
+)
+
+
+class Broken(Check):
+    name = "broken"
+    sources = (DEVICES,)
+
+    def evaluate(self, inputs: Dict[str, Any]) -> CheckResult:
+        raise RuntimeError("boom")
+
+
+class BusyCpu(Check):
+    name = "busy_cpu"
+    sources = (STATISTICS,)
+    fields = {STATISTICS: ("id", "cpuUtilizationPct")}
+
+    def evaluate(self, inputs: Dict[str, Any]) -> CheckResult:
+        busy = [s["id"] for s in inputs[STATISTICS] if s["cpuUtilizationPct"] >= 90]
+        return CheckResult(FAIL if busy else PASS, "", busy)
+
+
+@pytest.mark.asyncio
+async def test_checks_all_sites_and_reuses_unchanged_verdicts() -> None:
+    """Test concurrent checks, fingerprint caching and re-evaluation."""
+    checks = [FirmwareUpToDate(), ConsistentFirmware(), AccessPointLoad(5), Broken()]
+    async with MockController(sites=3, devices=8, clients=40) as mock:
+        async with mock.client() as client:
+            checker = RecommendationChecker(client, checks)
+            first = await checker.run()
+            details = mock.stats.requests[endpoints.DEVICE]
+
+            # Device state is not an input of any check
+            mock.fleet.states["site-0001-device-000003"] = "OFFLINE"
+            second = await checker.run()
+
+    statuses = {(f.site_id, f.check): f.status for f in first.findings}
+    assert first.sites == 3 and first.cached == 0 and first.evaluated == 12
+    # Devices 0 and 7 of every site have firmware updates available
+    assert statuses[("site-0000", "firmware_up_to_date")] == FAIL
+    assert statuses[("site-0000", "consistent_firmware")] == PASS
+    # Access points are the even devices; each serves 5 wireless clients at most
+    assert statuses[("site-0002", "access_point_load")] == PASS
+    assert statuses[("site-0002", "broken")] == ERROR
+    assert len(first.failures) == 3
+
+    assert details == 24
+    assert mock.stats.requests[endpoints.DEVICE] == details + 1
+    assert second.cached == 9 and second.evaluated == 3
+    assert [f.result for f in second.findings] == [f.result for f in first.findings]
+
+
+@pytest.mark.asyncio
+async def test_devices_that_could_not_be_fetched_are_reported() -> None:
+    """Test that a failed first detail fetch is an error, not a missing device."""
+    async with MockController(sites=2, devices=4) as mock:
+        async with mock.client() as client:
+            original = client.get_device_details
+
+            async def flaky(site_id: str, device_id: str) -> Dict[str, Any]:
+                if device_id == "site-0001-device-000002":
+                    raise RuntimeError("timeout")
+                return await original(site_id, device_id)
+
+            client.get_device_details = flaky  # type: ignore[method-assign]
+            checker = RecommendationChecker(client, [FirmwareUpToDate()])
+            first = await checker.run()
+            client.get_device_details = original  # type: ignore[method-assign]
+            second = await checker.run()
+
+    findings = {finding.site_id: finding for finding in first.findings}
+    assert findings["site-0000"].status == FAIL
+    assert findings["site-0001"].status == ERROR
+    assert findings["site-0001"].result.details == [
+        "site-0001-device-000002: details not fetched"
+    ]
+    assert first.failed_sites == ["site-0001"]
+    assert [finding.status for finding in second.findings] == [FAIL, FAIL]
+    assert [finding.cached for finding in second.findings] == [True, False]
+
+
+@pytest.mark.asyncio
+async def test_statistics_are_fetched_on_every_run(monkeypatch: MonkeyPatch) -> None:
+    """Test that a CPU change is seen while the device summary stays the same."""
+    async with MockController(sites=1, devices=4) as mock:
+        async with mock.client() as client:
+            checker = RecommendationChecker(client, [BusyCpu()])
+            first = await checker.run()
+
+            statistics = mock.fleet.device_statistics
+
+            def busy(site: int, index: int) -> Dict[str, Any]:
+                return {**statistics(site, index), "cpuUtilizationPct": 95.0}
+
+            monkeypatch.setattr(mock.fleet, "device_statistics", busy)
+            second = await checker.run()
+            details = mock.stats.requests[endpoints.DEVICE]
+
+    assert first.findings[0].status == PASS
+    assert second.findings[0].status == FAIL and not second.findings[0].cached
+    assert len(second.findings[0].result.details) == 4
+    assert details == 4
@@ -0,0 +1,121 @@
+from typing import Any, Dict, List
+
+from unifi_assist.inventory import Inventory, Mask
+from unifi_assist.rules import (
+    CHANGED,
+    CRITICAL,
+    OPENED,
+    RESOLVED,
+    WARNING,
+    Check,
+    Rule,
+    RuleEngine,
+    at_least,
+    equals,
+)
+from unifi_assist.sync import ADDED, REMOVED, DeviceChange
+
+
+def devices(count: int) -> List[Dict[str, Any]]:
+    return [{"id": f"d{i}", "name": f"AP {i}", "state": "ONLINE"} for i in range(count)]
+
+
+def test_issues_open_escalate_and_resolve() -> None:
+    """Test that issue state follows device updates."""
+    engine = RuleEngine(clock=lambda: 100.0)
+    assert engine.update_devices(devices(3)) == []
+
+    opened = engine.update_statistics({"d1": {"cpuUtilizationPct": 80}})
+    assert [(c.kind, c.issue.severity) for c in opened] == [(OPENED, WARNING)]
+    assert opened[0].issue.message == "AP 1 CPU at 80.0%"
+    escalated = engine.update_statistics({"d1": {"cpuUtilizationPct": 95}})
+    unchanged = engine.update_statistics({"d1": {"cpuUtilizationPct": 95}})
+    # Same severity, new value: no change reported, but the message follows
+    assert engine.update_statistics({"d1": {"cpuUtilizationPct": 97}}) == []
+    assert engine.issues[("high_cpu", "d1")].message == "AP 1 CPU at 97.0%"
+    resolved = engine.update_statistics({"d1": {"cpuUtilizationPct": 10}})
+
+    assert [(c.kind, c.previous_severity) for c in escalated] == [(CHANGED, WARNING)]
+    assert escalated[0].issue.severity == CRITICAL
+    assert unchanged == []
+    assert [c.kind for c in resolved] == [RESOLVED]
+    assert engine.issues == {}
+
+
+class Counting(Check):
+    """Check recording how it was evaluated."""
+
+    def __init__(self, inner: Check):
+        self.inner = inner
+        self.fields = inner.fields
+        self.calls: List[str] = []
+
+    def mask(self, inventory: Inventory) -> Mask:
+        self.calls.append("mask")
+        return self.inner.mask(inventory)
+
+    def test(self, inventory: Inventory, row: int) -> bool:
+        self.calls.append("test")
+        return self.inner.test(inventory, row)
+
+
+def test_only_dependent_rules_are_evaluated() -> None:
+    """Test that updates re-run only affected rules, only on changed rows."""
+    offline = Counting(equals("state", "OFFLINE"))
+    busy = Counting(at_least("cpuUtilizationPct", 90))
+    engine = RuleEngine(
+        [
+            Rule("offline", ((CRITICAL, offline),), "{name} offline"),
+            Rule("busy", ((WARNING, busy),), "{name} busy"),
+        ]
+    )
+    engine.update_devices(devices(40))
+    offline.calls.clear()
+    busy.calls.clear()
+
+    changes = engine.update_devices([{"id": "d2", "state": "OFFLINE"}])
+    repeated = engine.update_devices([{"id": "d2", "state": "OFFLINE"}])
+
+    assert offline.calls == ["test"]
+    assert busy.calls == []
+    assert [(c.issue.device_id, c.issue.severity) for c in changes] == [
+        ("d2", CRITICAL)
+    ]
+    assert repeated == []
+
+
+def test_clients_and_sync_changes() -> None:
+    """Test client counts and removals fed from a device sync."""
+    engine = RuleEngine()
+    engine.apply(
+        [DeviceChange(ADDED, "s", d["id"], d) for d in devices(2)],
+    )
+    clients = [{"id": f"c{i}", "uplinkDeviceId": "d0"} for i in range(70)]
+
+    overloaded = engine.update_clients(clients)
+    removed = engine.apply([DeviceChange(REMOVED, "s", "d0", {})])
+
+    assert [(c.issue.rule, c.issue.severity) for c in overloaded] == [
+        ("overloaded_device", WARNING)
+    ]
+    assert [c.kind for c in removed] == [RESOLVED]
+    assert engine.summary() == {"critical": 0, "warning": 0, "info": 0}
+
+
+def test_records_without_id_are_skipped_and_removed_rows_compacted() -> None:
+    """Test that churn does not grow the inventory without bound."""
+    engine = RuleEngine()
+    engine.update_devices([*devices(10), {"name": "No id", "state": "OFFLINE"}])
+    engine.update_devices([{"id": "d8", "state": "OFFLINE"}])
+    assert len(engine.devices) == 10
+
+    removed = engine.remove_devices(f"d{i}" for i in range(6))
+    assert removed == []
+    assert len(engine.devices) == 4
+
+    # Remaining issues and devices keep working on their new rows
+    resolved = engine.update_devices([{"id": "d8", "state": "ONLINE"}])
+    assert [(c.kind, c.issue.device_id) for c in resolved] == [(RESOLVED, "d8")]
+    opened = engine.update_devices([{"id": "d2", "name": "Back", "state": "OFFLINE"}])
+    assert [(c.kind, c.issue.message) for c in opened] == [(OPENED, "Back is OFFLINE")]
+    assert len(engine.devices) == 5
@@ -0,0 +1,143 @@
+import asyncio
+from typing import Any, AsyncGenerator, Dict, List
+
+import pytest
+import structlog
+
+from unifi_assist.scheduler import (
+    CRITICAL,
+    NORMAL,
+    PollScheduler,
+    membership_change,
+    statistics_change,
+)
+
+
+class FakeClient:
+    """Stand-in client with one site where only device 0 is busy."""
+
+    def __init__(self, devices: int = 6):
+        self.logger = structlog.get_logger("test_scheduler")
+        self.devices = devices
+        self.polls: Dict[str, int] = {}
+        self.order: List[str] = []
+
+    async def get_sites(self) -> Dict[str, Any]:
+        return {"data": [{"id": "site"}]}
+
+    async def iter_devices(self, site_id: str) -> AsyncGenerator[Dict[str, Any], None]:
+        for i in range(self.devices):
+            yield {"id": f"dev-{i}", "model": "core" if i == 5 else "ap"}
+
+    async def get_device_statistics(
+        self, site_id: str, device_id: str
+    ) -> Dict[str, Any]:
+        count = self.polls[device_id] = self.polls.get(device_id, 0) + 1
+        self.order.append(device_id)
+        busy = device_id == "dev-0"
+        cpu = 90.0 if busy and count % 2 else 5.0
+        return {"cpuUtilizationPct": cpu, "uptimeSec": count}
+
+    async def get_clients(self, site_id: str) -> Dict[str, Any]:
+        raise RuntimeError("controller unavailable")
+
+
+def test_change_measures() -> None:
+    """Test relative statistics change and list membership change."""
+    change = statistics_change(["cpuUtilizationPct", "uplink.txRateBps"])
+    assert change({"cpuUtilizationPct": 50}, {"cpuUtilizationPct": 40}) == 0.2
+    assert change({"cpuUtilizationPct": 0.1}, {"cpuUtilizationPct": 0.2}) < 0.2
+    assert change({}, {"uplink": {"txRateBps": 1}}) == 1.0
+    assert change({}, {}) == 0.0
+    clients = {"data": [{"id": "a"}, {"id": "b"}]}
+    assert membership_change(clients, {"data": [{"id": "b"}, {"id": "c"}]}) == 2 / 3
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def run_for(
+    scheduler: PollScheduler, clock: FakeClock, duration: float, step: float = 0.005
+) -> None:
+    """Dispatch as the scheduler's loop does, advancing the fake clock."""
+    for _ in range(round(duration / step)):
+        clock.now += step
+        while scheduler.bucket.try_acquire() and scheduler._dispatch():
+            pass
+        await asyncio.gather(*scheduler._inflight)
+
+
+@pytest.mark.asyncio
+async def test_busy_devices_are_polled_more_within_budget() -> None:
+    """Test adaptive intervals, the request budget and the critical lane."""
+    client = FakeClient()
+    clock = FakeClock()
+    scheduler = PollScheduler(
+        client,  # type: ignore[arg-type]
+        budget=200,
+        min_interval=0.02,
+        max_interval=0.3,
+        seed=1,
+        clock=clock,
+    )
+    assert await scheduler.discover(critical=lambda d: d["model"] == "core") == 7
+    assert scheduler.targets["statistics/dev-5"].priority == CRITICAL
+
+    await run_for(scheduler, clock, 2.0)
+    busy, idle = client.polls["dev-0"], client.polls["dev-1"]
+    assert busy > 5 * idle
+    assert scheduler.targets["statistics/dev-0"].interval == 0.02
+    assert scheduler.targets["statistics/dev-1"].interval == 0.3
+    assert scheduler.stats.errors == scheduler.targets["clients/site"].errors > 0
+    assert scheduler.stats.requests <= 200 * 2.0 + scheduler.bucket.capacity
+
+    # With too little budget, normal targets are stretched and critical go first
+    client.order.clear()
+    scheduler = PollScheduler(
+        client,  # type: ignore[arg-type]
+        budget=10,
+        burst=1,
+        min_interval=0.02,
+        seed=1,
+        clock=clock,
+    )
+    for i in range(6):
+        scheduler.add_device("site", f"dev-{i}", CRITICAL if i == 5 else NORMAL)
+    await run_for(scheduler, clock, 2.0)
+    assert scheduler.stats.stretched > 0
+    assert scheduler.stats.requests <= 10 * 2.0 + 1
+    assert client.order.count("dev-5") > 2 * client.order.count("dev-1")
+
+    # A token taken for a target that was removed meanwhile is given back
+    clock.now += 1.0
+    scheduler._collect_due(clock.now)
+    for i in range(6):
+        scheduler.remove(f"statistics/dev-{i}")
+    assert scheduler.bucket.try_acquire()
+    assert not scheduler._dispatch()
+    assert scheduler.bucket.try_acquire()
+
+
+@pytest.mark.asyncio
+async def test_polls_in_the_background_until_stopped() -> None:
+    """Test that the scheduler loop polls and publishes updates."""
+    client = FakeClient(devices=2)
+    scheduler = PollScheduler(
+        client,  # type: ignore[arg-type]
+        min_interval=0.01,
+        seed=1,
+    )
+    await scheduler.discover(include_clients=False)
+    updates = scheduler.subscribe()
+    async with scheduler:
+        update = await asyncio.wait_for(anext(updates), timeout=5)
+    await updates.aclose()
+    assert update.key in scheduler.targets
+    assert scheduler.stats.requests >= 1
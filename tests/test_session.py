@@ -0,0 +1,51 @@
+import pytest
+import structlog
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from unifi_assist.client import UniFiClient
+from unifi_assist.session import ConnectionPoolConfig, SharedSession
+
+
+def make_client(session: SharedSession) -> UniFiClient:
+    return UniFiClient(
+        host="controller.test",
+        api_key="test-key",
+        logger=structlog.get_logger("test_session"),
+        session=session,
+    )
+
+
+@pytest.mark.asyncio
+async def test_clients_share_session_without_closing_it() -> None:
+    """Test that borrowed sessions outlive the clients using them."""
+    async with SharedSession() as shared:
+        first, second = make_client(shared), make_client(shared)
+        assert first.session is second.session
+
+        await first.close()
+        await second.close()
+        assert not shared.closed
+
+    assert shared.closed
+
+
+@pytest.mark.asyncio
+async def test_pool_stats_track_connection_reuse() -> None:
+    """Test that pool stats report new and reused connections."""
+
+    async def handler(request: web.Request) -> web.Response:
+        return web.json_response({"data": []})
+
+    app = web.Application()
+    app.router.add_get("/", handler)
+    async with TestServer(app) as server:
+        config = ConnectionPoolConfig(limit=1)
+        async with SharedSession(config) as shared:
+            for _ in range(3):
+                async with shared.session.get(server.make_url("/")) as response:
+                    await response.read()
+
+    assert shared.stats.limit == 1
+    assert shared.stats.connections_created == 1
+    assert shared.stats.connections_reused == 2
@@ -0,0 +1,76 @@
+import asyncio
+from typing import Any, Dict
+
+import pytest
+
+from unifi_assist.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_request() -> None:
+    """Test that identical concurrent calls run the request once."""
+    group = SingleFlight()
+    calls = 0
+
+    async def request() -> Dict[str, Any]:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"data": [1]}
+
+    results = await asyncio.gather(*(group.do("devices", request) for _ in range(10)))
+
+    assert calls == 1
+    assert all(result == {"data": [1]} for result in results)
+    assert len({id(result) for result in results}) == 10
+    assert group.stats.coalesced == 9
+    assert len(group) == 0
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_waiter() -> None:
+    """Test that a failing request raises in every caller."""
+    group = SingleFlight()
+
+    async def request() -> None:
+        await asyncio.sleep(0.01)
+        raise RuntimeError("controller unavailable")
+
+    results = await asyncio.gather(
+        *(group.do("info", request) for _ in range(3)), return_exceptions=True
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert group.stats.executions == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_others() -> None:
+    """Test that cancelling the first caller leaves the request running."""
+    group = SingleFlight()
+
+    async def request() -> str:
+        await asyncio.sleep(0.01)
+        return "ok"
+
+    first = asyncio.create_task(group.do("sites", request))
+    second = asyncio.create_task(group.do("sites", request))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "ok"
+
+
+@pytest.mark.asyncio
+async def test_sequential_calls_are_not_coalesced() -> None:
+    """Test that a finished request is not reused by later calls."""
+    group = SingleFlight()
+
+    async def request() -> int:
+        return 1
+
+    await group.do("sites", request)
+    await group.do("sites", request)
+
+    assert group.stats.executions == 2
+    assert group.stats.coalesced == 0
@@ -0,0 +1,115 @@
+from pathlib import Path
+from typing import Any, Dict, List
+
+from unifi_assist.snapshots import SnapshotStore, apply_delta, make_delta
+
+
+def devices(count: int, state: str = "ONLINE") -> Dict[str, Any]:
+    data: List[Dict[str, Any]] = [
+        {"id": f"dev-{i}", "name": f"Device {i}", "state": state} for i in range(count)
+    ]
+    return {"offset": 0, "count": count, "totalCount": count, "data": data}
+
+
+def test_delta_round_trip() -> None:
+    """Test that deltas rebuild the new payload from the old one."""
+    old = devices(5)
+    new = devices(6)
+    new["data"][2]["state"] = "OFFLINE"
+    new["data"].reverse()
+    del new["offset"]
+
+    delta = make_delta(old, new)
+
+    assert delta is not None
+    assert set(delta["items"]["upsert"]) == {"dev-2", "dev-5"}
+    assert apply_delta(old, delta) == new
+
+
+def test_identical_payloads_are_stored_once(tmp_path: Path) -> None:
+    """Test that repeated captures only add index entries."""
+    with SnapshotStore(tmp_path) as store:
+        first = store.put("devices", devices(50), site="site", captured_at="t1")
+        second = store.put("devices", devices(50), site="site", captured_at="t2")
+
+        assert first.digest == second.digest
+        assert len(store._blobs) == 1
+        assert store.history("devices", "site") == [
+            ("t1", first.digest),
+            ("t2", first.digest),
+        ]
+
+
+def test_changes_are_stored_as_deltas(tmp_path: Path) -> None:
+    """Test that a small change costs far less than a full copy."""
+    with SnapshotStore(tmp_path) as store:
+        base = devices(500)
+        full = store._blobs[
+            store.put("devices", base, site="site", captured_at="t1").digest
+        ].length
+        changed = devices(500)
+        changed["data"][7]["state"] = "OFFLINE"
+        snapshot = store.put("devices", changed, site="site", captured_at="t2")
+
+        delta = store._blobs[snapshot.digest]
+        assert delta.base is not None
+        assert delta.length < full / 10
+        assert store.get("devices", "site", at="t2").data == changed  # type: ignore[union-attr]
+
+
+def test_appended_records_keep_their_order(tmp_path: Path) -> None:
+    """Test that records appended out of ID order survive storage and reopen."""
+    grown = devices(200)
+    grown["data"] += [{"id": "zzz", "name": "Z"}, {"id": "aaa", "name": "A"}]
+    with SnapshotStore(tmp_path) as store:
+        store.put("devices", devices(200), site="site", captured_at="t1")
+        snapshot = store.put("devices", grown, site="site", captured_at="t2")
+        assert store._blobs[snapshot.digest].base is not None
+
+    # A crash while appending leaves a partial last index line
+    with open(tmp_path / "index.jsonl", "ab") as index:
+        index.write(b'{"type": "capture", "endp')
+
+    with SnapshotStore(tmp_path) as store:
+        stored = store.get("devices", "site")
+        assert stored is not None and stored.data == grown
+        store.put("sites", {"data": []}, captured_at="t3")
+    with SnapshotStore(tmp_path) as store:
+        assert store.get("sites") is not None
+
+
+def test_lookup_by_time_after_reopen(tmp_path: Path) -> None:
+    """Test that the index is reloaded and answers point-in-time lookups."""
+    with SnapshotStore(tmp_path) as store:
+        for hour, state in enumerate(["ONLINE", "OFFLINE", "ONLINE"]):
+            store.put(
+                "devices",
+                devices(3, state),
+                site="site",
+                captured_at=f"2025-01-01T0{hour + 1}:00:00",
+            )
+        store.put("sites", {"data": [{"id": "site"}]}, captured_at="2025-01-01T01")
+
+    with SnapshotStore(tmp_path) as store:
+        assert store.get("devices", "site", at="2025-01-01T00:30:00") is None
+        midway = store.get("devices", "site", at="2025-01-01T02:30:00")
+        assert midway is not None
+        assert midway.data == devices(3, "OFFLINE")
+        latest = store.get("devices", "site")
+        assert latest is not None
+        assert latest.captured_at == "2025-01-01T03:00:00"
+        assert latest.data == devices(3)
+        assert sorted(store.keys(), key=str) == [("devices", "site"), ("sites", None)]
+
+
+def test_segments_roll_over(tmp_path: Path) -> None:
+    """Test that blobs move to a new segment once the current one is full."""
+    with SnapshotStore(tmp_path, segment_size=256) as store:
+        for count in range(1, 6):
+            store.put("devices", {"data": [{"id": str(i)} for i in range(count * 40)]})
+
+    with SnapshotStore(tmp_path) as store:
+        latest = store.get("devices")
+        assert latest is not None
+        assert len(latest.data["data"]) == 200
+    assert len(list(tmp_path.glob("segment-*.bin"))) > 1
@@ -0,0 +1,109 @@
+import asyncio
+from typing import Any, AsyncGenerator, Dict, List
+
+import pytest
+import structlog
+
+from unifi_assist.sync import DeviceSync, fingerprint
+
+
+class FakeClient:
+    """Stand-in client with an editable fleet."""
+
+    def __init__(self, devices: int = 10):
+        self.logger = structlog.get_logger("test_sync")
+        self.fleet: Dict[str, List[Dict[str, Any]]] = {
+            "site": [{"id": f"dev-{i}", "state": "ONLINE"} for i in range(devices)]
+        }
+        self.failing_sites: List[str] = []
+        self.details_requests = 0
+
+    async def get_sites(self) -> Dict[str, Any]:
+        return {"data": [{"id": site_id} for site_id in self.fleet]}
+
+    async def iter_devices(self, site_id: str) -> AsyncGenerator[Dict[str, Any], None]:
+        if site_id in self.failing_sites:
+            raise RuntimeError("site unavailable")
+        for device in self.fleet[site_id]:
+            yield dict(device)
+
+    async def get_device_details(self, site_id: str, device_id: str) -> Dict[str, Any]:
+        self.details_requests += 1
+        return {"id": device_id}
+
+    async def get_device_statistics(
+        self, site_id: str, device_id: str
+    ) -> Dict[str, Any]:
+        return {"uptimeSec": 1}
+
+
+def make_sync(fake: FakeClient) -> DeviceSync:
+    return DeviceSync(fake)  # type: ignore[arg-type]
+
+
+def test_fingerprint_fields() -> None:
+    """Test that only the selected fields affect the fingerprint."""
+    record = {"id": "a", "state": "ONLINE", "uptime": 1}
+    assert fingerprint(record) != fingerprint({**record, "uptime": 2})
+    assert fingerprint(record, ["state"]) == fingerprint(
+        {**record, "uptime": 2}, ["state"]
+    )
+
+
+@pytest.mark.asyncio
+async def test_steady_state_fetches_only_changes() -> None:
+    """Test that unchanged devices are not fetched again."""
+    fake = FakeClient()
+    sync = make_sync(fake)
+
+    first = await sync.run()
+    assert [change.kind for change in first.changes] == ["added"] * 10
+    assert fake.details_requests == 10
+
+    second = await sync.run()
+    assert second.changes == []
+    assert second.unchanged == 10
+    assert fake.details_requests == 10
+
+    fake.fleet["site"][3]["state"] = "OFFLINE"
+    fake.fleet["site"].pop()
+    fake.fleet["site"].append({"id": "dev-new", "state": "ONLINE"})
+    third = await sync.run()
+
+    kinds = {change.device_id: change.kind for change in third.changes}
+    assert kinds == {"dev-3": "modified", "dev-new": "added", "dev-9": "removed"}
+    assert fake.details_requests == 12
+    assert sync.devices["dev-3"].summary["state"] == "OFFLINE"
+
+
+@pytest.mark.asyncio
+async def test_failed_site_keeps_devices() -> None:
+    """Test that a site that fails to list does not report removals."""
+    fake = FakeClient(devices=3)
+    sync = make_sync(fake)
+    await sync.run()
+
+    fake.failing_sites.append("site")
+    result = await sync.run()
+
+    assert result.failed_sites == ["site"]
+    assert result.changes == []
+    assert len(sync.devices) == 3
+
+
+@pytest.mark.asyncio
+async def test_concurrent_rounds_keep_their_settings() -> None:
+    """Test concurrent rounds with different settings, and site moves."""
+    fake = FakeClient(devices=3)
+    sync = make_sync(fake)
+    with_statistics, without = await asyncio.gather(
+        sync.run(concurrency=2), sync.run(concurrency=1, include_statistics=False)
+    )
+    assert all(change.statistics is not None for change in with_statistics.changes)
+    assert all(change.statistics is None for change in without.changes)
+
+    # The same device, unchanged, now listed under another site
+    fake.fleet["other"] = [fake.fleet["site"].pop()]
+    result = await sync.run()
+    assert result.changes == []
+    assert sync.devices["dev-2"].site_id == "other"
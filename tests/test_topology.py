@@ -0,0 +1,87 @@
+import pytest
+
+from unifi_assist.mock_controller import MockController
+from unifi_assist.sync import MODIFIED, REMOVED, DeviceChange
+from unifi_assist.topology import CLIENT, Topology
+
+SITE = "site-0000"
+
+
+def device_id(index: int) -> str:
+    return f"{SITE}-device-{index:06d}"
+
+
+@pytest.mark.asyncio
+async def test_crawl_builds_indexes_and_uplink_graph() -> None:
+    """Test lookups, subtree and path queries over a crawled fleet."""
+    topology = Topology()
+    async with MockController(sites=2, devices=20, clients=40) as mock:
+        async with mock.client() as client:
+            async for record in client.crawl_inventory(include_statistics=False):
+                topology.add(record)
+
+    assert len(topology) == 2 * (20 + 40)
+    assert len(topology.devices(SITE)) == 20
+    client_record = topology.clients(SITE)[0]
+    assert topology.find_mac(client_record["macAddress"].upper()) is client_record
+    assert topology.kind(client_record["id"]) == CLIENT
+    assert [r["id"] for r in topology.find_ip("10.0.0.1")] == [device_id(1)]
+    assert len(topology.find_ip("10.0.0.1", site_id="site-0001")) == 0
+    assert len(topology.devices_by_model("U6-Pro")) > 0
+
+    # Device i is uplinked to device i // 8; clients to device i % 20
+    assert topology.uplink_path(device_id(17)) == [
+        device_id(17),
+        device_id(2),
+        device_id(0),
+    ]
+    assert topology.children(device_id(2)) == [
+        f"{SITE}-client-00000002",
+        f"{SITE}-client-00000022",
+        *(device_id(i) for i in range(16, 20)),
+    ]
+    behind = {record["id"] for record in topology.clients_behind(device_id(2))}
+    assert behind == {
+        f"{SITE}-client-{i:08d}" for i in (2, 22, 16, 36, 17, 37, 18, 38, 19, 39)
+    }
+    assert len(topology.clients_behind(device_id(0))) == 40
+
+
+def test_incremental_updates_move_index_entries() -> None:
+    """Test that updates and removals keep indexes and graph consistent."""
+    topology = Topology()
+    topology.update_devices(
+        SITE,
+        [
+            {"id": "sw", "model": "USW", "macAddress": "AA-00-00-00-00-01"},
+            {"id": "ap", "model": "U6", "uplink": {"deviceId": "sw"}},
+        ],
+    )
+    topology.update_clients(
+        SITE,
+        [
+            {"id": "c1", "ipAddress": "10.0.0.5", "uplinkDeviceId": "ap"},
+            {"id": "c2", "ipAddress": "10.0.0.6", "uplinkDeviceId": "ap"},
+        ],
+    )
+    assert {record["id"] for record in topology.clients_behind("sw")} == {"c1", "c2"}
+
+    topology.update_clients(
+        SITE, [{"id": "c1", "ipAddress": "10.0.0.7", "uplinkDeviceId": "sw"}], True
+    )
+    assert "c2" not in topology
+    assert topology.find_ip("10.0.0.5") == []
+    assert topology.find_ip("10.0.0.7")[0]["uplinkDeviceId"] == "sw"
+    assert topology.children("ap") == []
+
+    # A device summary without an uplink keeps the one learned from details
+    topology.apply(
+        [
+            DeviceChange(MODIFIED, SITE, "ap", {"id": "ap", "model": "U7"}),
+            DeviceChange(REMOVED, SITE, "sw", {"id": "sw"}),
+        ]
+    )
+    assert topology.devices_by_model("U6") == []
+    assert topology.uplink_path("ap") == ["ap", "sw"]
+    assert topology.find_mac("aa:00:00:00:00:01") is None
+    assert topology.children("sw") == ["ap", "c1"]
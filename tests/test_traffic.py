@@ -0,0 +1,154 @@
+import asyncio
+from typing import List
+
+import aiohttp
+import pytest
+from multidict import CIMultiDict, CIMultiDictProxy
+
+from unifi_assist.traffic import (
+    AdaptiveConcurrencyLimiter,
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    TokenBucket,
+    TrafficController,
+)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def response_error(status: int, retry_after: str = "") -> aiohttp.ClientResponseError:
+    headers = CIMultiDict({"Retry-After": retry_after} if retry_after else {})
+    return aiohttp.ClientResponseError(
+        request_info=None,  # type: ignore[arg-type]
+        history=(),
+        status=status,
+        headers=CIMultiDictProxy(headers),
+    )
+
+
+def test_token_bucket_allows_burst_then_refills() -> None:
+    """Test that the bucket admits a burst, refills and takes tokens back."""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=2, clock=clock)
+
+    assert bucket.try_acquire() and bucket.try_acquire()
+    assert not bucket.try_acquire()
+    clock.now = 0.5
+    assert bucket.try_acquire()
+    # A token given back is available again, up to the capacity
+    bucket.release()
+    assert bucket.try_acquire() and not bucket.try_acquire()
+
+
+def test_limiter_grows_additively_and_backs_off_once_per_cooldown() -> None:
+    """Test AIMD behaviour of the concurrency limiter."""
+    clock = FakeClock()
+    limiter = AdaptiveConcurrencyLimiter(initial=4, maximum=8, clock=clock)
+
+    for _ in range(4):
+        limiter.on_success()
+    assert limiter.limit == pytest.approx(5, rel=0.05)
+
+    assert limiter.on_overload()
+    assert not limiter.on_overload()
+    assert limiter.limit == pytest.approx(2.5, rel=0.05)
+
+
+@pytest.mark.asyncio
+async def test_limiter_caps_in_flight_requests() -> None:
+    """Test that no more than the limit run at once."""
+    limiter = AdaptiveConcurrencyLimiter(initial=2, maximum=2)
+    peak: List[int] = []
+
+    async def work() -> None:
+        async with limiter:
+            peak.append(limiter.in_flight)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(work() for _ in range(6)))
+    assert max(peak) == 2
+
+
+def test_circuit_breaker_opens_and_allows_single_trial() -> None:
+    """Test closed, open and half-open circuit transitions."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+
+    assert not breaker.record_failure()
+    assert breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+    clock.now = 10
+    breaker.before_request()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_trial_releases_the_half_open_circuit() -> None:
+    """Test that a trial cancelled while waiting for a token is given up."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    traffic = TrafficController(rate=1, burst=1, breaker=breaker)
+    assert traffic.bucket is not None and traffic.bucket.try_acquire()
+    breaker.record_failure()
+    assert breaker.state == "half_open"
+
+    async def request() -> str:
+        return "ok"
+
+    task = asyncio.create_task(traffic.run(request, idempotent=True))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    assert breaker.before_request()
+
+
+@pytest.mark.asyncio
+async def test_idempotent_requests_are_retried() -> None:
+    """Test that retryable errors are retried and honour Retry-After."""
+    traffic = TrafficController(retry=RetryPolicy(max_attempts=3, base_delay=0))
+    errors = [response_error(429, retry_after="0"), response_error(502)]
+
+    async def request() -> str:
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    assert await traffic.run(request, idempotent=True) == "ok"
+    assert traffic.stats.retries == 2
+    assert traffic.stats.overloads == 1
+    assert traffic.limiter.limit < 8
+
+
+@pytest.mark.asyncio
+async def test_non_idempotent_and_client_errors_are_not_retried() -> None:
+    """Test that POSTs and 4xx errors fail on the first attempt."""
+    traffic = TrafficController(retry=RetryPolicy(base_delay=0))
+    attempts = 0
+
+    async def request(status: int) -> None:
+        nonlocal attempts
+        attempts += 1
+        raise response_error(status)
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        await traffic.run(lambda: request(503), idempotent=False)
+    with pytest.raises(aiohttp.ClientResponseError):
+        await traffic.run(lambda: request(404), idempotent=True)
+
+    assert attempts == 2
+    assert traffic.stats.retries == 0
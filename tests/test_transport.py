@@ -0,0 +1,103 @@
+import threading
+from pathlib import Path
+from typing import Any, List
+
+import aiohttp
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+
+from unifi_assist.mock_controller import MockController
+from unifi_assist.snapshots import Snapshot, SnapshotStore
+from unifi_assist.transport import (
+    RecordTransport,
+    ReplayTransport,
+    Transport,
+    capture_key,
+)
+
+
+def test_capture_keys() -> None:
+    """Test that endpoints map to the capture script's names."""
+    base = "proxy/network/integration/v1"
+
+    assert capture_key(f"{base}/sites") == ("sites", None)
+    assert capture_key(f"{base}/sites/s1/devices") == ("devices", "s1")
+    assert capture_key(f"{base}/sites/s1/devices/d1") == ("device_details_d1", "s1")
+    assert capture_key(f"{base}/sites/s1/devices/d1/statistics/latest") == (
+        "device_stats_d1",
+        "s1",
+    )
+    assert capture_key(f"{base}/sites/s1/devices/d1/actions") is None
+
+
+def test_transports_must_implement_send() -> None:
+    """Test that an incomplete transport fails when it is created."""
+
+    class Incomplete(Transport):
+        pass
+
+    with pytest.raises(TypeError, match="send"):
+        Incomplete()  # type: ignore[abstract]
+
+
+@pytest.mark.asyncio
+async def test_record_then_replay_crawl(tmp_path: Path) -> None:
+    """Test that a recorded crawl replays identically without a controller."""
+    with SnapshotStore(tmp_path) as store:
+        async with MockController(sites=2, devices=30, clients=5) as mock:
+            async with mock.client(transport=RecordTransport(store)) as client:
+                live = [record async for record in client.crawl_inventory()]
+            async with mock.client(transport=ReplayTransport(store)) as client:
+                replayed = [record async for record in client.crawl_inventory()]
+                requests = sum(mock.stats.requests.values())
+                devices = [d async for d in client.iter_devices("site-0001", 7)]
+                streamed = [
+                    d async for d in client.iter_devices("site-0001", 7, stream=True)
+                ]
+
+    def responses(records: list) -> dict:
+        return {(r.kind, r.site_id, r.device_id): r.data for r in records}
+
+    assert all(record.ok for record in replayed)
+    assert responses(replayed) == responses(live)
+    assert requests == sum(mock.stats.requests.values())
+    assert len(devices) == 30 and streamed == devices
+
+
+@pytest.mark.asyncio
+async def test_captures_are_written_off_the_event_loop(
+    tmp_path: Path, monkeypatch: MonkeyPatch
+) -> None:
+    """Test that the store is written from a worker thread."""
+    writers: List[threading.Thread] = []
+    with SnapshotStore(tmp_path) as store:
+        put = store.put
+
+        def recording_put(*args: Any, **kwargs: Any) -> Snapshot:
+            writers.append(threading.current_thread())
+            return put(*args, **kwargs)
+
+        monkeypatch.setattr(store, "put", recording_put)
+        async with MockController(sites=1, devices=3) as mock:
+            async with mock.client(transport=RecordTransport(store)) as client:
+                await client.get_sites()
+                await client.get_devices("site-0000")
+
+        assert store.get("devices", site="site-0000") is not None
+
+    assert len(writers) == 2
+    assert threading.main_thread() not in writers
+
+
+@pytest.mark.asyncio
+async def test_replay_misses_fail_like_http(tmp_path: Path) -> None:
+    """Test that uncaptured requests fail with 404."""
+    with SnapshotStore(tmp_path) as store:
+        store.put("sites", {"data": [{"id": "s1"}]})
+        async with MockController() as mock:
+            async with mock.client(transport=ReplayTransport(store)) as client:
+                assert (await client.get_sites())["data"] == [{"id": "s1"}]
+                with pytest.raises(aiohttp.ClientResponseError) as error:
+                    await client.get_system_info()
+
+    assert error.value.status == 404